@@ -234,6 +234,76 @@ def _dataarray_coards_to_netcdf(dset, lat_name="lat", lon_name="lon"):
     return dset
 
 
+def _grid_kdtree(accessor):
+    """KD-tree of the grid cell centers of ``accessor._obj``.
+
+    Built on first use and cached on the accessor, so repeated point
+    lookups on the same object do not rebuild it.
+
+    Returns
+    -------
+    tuple
+        (``scipy.spatial.cKDTree``, grid shape, grid dims)
+    """
+    cached = getattr(accessor, "_kdtree", None)
+    if cached is None:
+        from .util.interp_util import sphere_kdtree
+
+        dset = _dataset_to_monet(accessor._obj)
+        lat = dset.latitude
+        tree = sphere_kdtree(longitude=dset.longitude.values, latitude=lat.values)
+        cached = (tree, lat.shape, lat.dims)
+        accessor._kdtree = cached
+    return cached
+
+
+def _nearest_ij(accessor, lat, lon, radius_of_influence=1e6):
+    """Find the x, y indices of the grid cells nearest to the given point(s).
+
+    Returns scalars for scalar `lat`/`lon`, else arrays;
+    ``-1`` where no cell is within `radius_of_influence` (m).
+    """
+    from .util.interp_util import query_sphere_kdtree
+
+    tree, shape, _ = _grid_kdtree(accessor)
+    scalar = np.ndim(lat) == 0 and np.ndim(lon) == 0
+    _, index = query_sphere_kdtree(
+        tree,
+        longitude=np.atleast_1d(lon),
+        latitude=np.atleast_1d(lat),
+        radius_of_influence=radius_of_influence,
+    )
+    missing = index < 0
+    y, x = np.unravel_index(np.where(missing, 0, index), shape)
+    x = np.where(missing, -1, x)
+    y = np.where(missing, -1, y)
+    if scalar:
+        return int(x[0]), int(y[0])
+    return x.reshape(np.shape(lon)), y.reshape(np.shape(lat))
+
+
+def _extract_points(accessor, lat, lon, siteid=None, radius_of_influence=1e6):
+    """Select the grid cells nearest to the given points along a new ``site`` dimension."""
+    _, _, dims = _grid_kdtree(accessor)
+    x, y = _nearest_ij(
+        accessor, np.ravel(lat), np.ravel(lon), radius_of_influence=radius_of_influence
+    )
+    missing = x < 0
+    d = _dataset_to_monet(accessor._obj)
+    out = d.isel(
+        {
+            dims[0]: xr.DataArray(np.where(missing, 0, y), dims="site"),
+            dims[1]: xr.DataArray(np.where(missing, 0, x), dims="site"),
+        }
+    )
+    if missing.any():
+        out = out.where(xr.DataArray(~missing, dims="site"))
+    out.coords["site"] = np.arange(x.size)
+    if siteid is not None:
+        out.coords["siteid"] = ("site", np.asarray(siteid))
+    return out
+
+
 @pd.api.extensions.register_dataframe_accessor("monet")
 class MONETAccessorPandas:
     def __init__(self, pandas_obj):
@@ -833,49 +903,63 @@ class MONETAccessor:
                 out = resample_xesmf(self._obj, output, **kwargs)
                 return _rename_latlon(out)
 
-    def nearest_ij(self, lat=None, lon=None, **kwargs):
-        """Uses pyresample to interpolate to find the i, j index of grid with respect to the given lat lon.
+    def nearest_ij(self, lat=None, lon=None, radius_of_influence=1e6, **kwargs):
+        """Find the i, j index of grid with respect to the given lat lon.
+
+        The grid cell centers are put in a KD-tree on first use, which is
+        cached on the accessor; `lat` and `lon` can be arrays of many points.
 
         Parameters
         ----------
-        lat : float
-            latitude in question
-        lon : float
-            longitude in question
+        lat : float or array-like
+            latitude(s) in question
+        lon : float or array-like
+            longitude(s) in question
+        radius_of_influence : float
+            Maximum distance (meters) to a grid cell center.
         **kwargs : dict
-            pyresample kwargs for nearest neighbor interpolation
+            Ignored, for backward compatibility.
 
         Returns
         -------
         i,j
-            Returns the i (x index) and j (y index) of the given latitude longitude value
+            Returns the i (x index) and j (y index) of the given latitude longitude value.
+            Arrays (of the shape of `lat`) if arrays are given,
+            ``-1`` where no grid cell is within `radius_of_influence`.
 
         """
-        try:
-            from pyresample import utils
-
-            from .util.interp_util import lonlat_to_swathdefinition as llsd
-            from .util.interp_util import nearest_point_swathdefinition as npsd
-
-            has_pyresample = True
-        except ImportError:
-            has_pyresample = False
-            print("requires pyresample to be installed")
-
         try:
             if lat is None or lon is None:
                 raise RuntimeError
         except RuntimeError:
             print("Must provide latitude and longitude")
 
-        if has_pyresample:
-            dset = _dataset_to_monet(self._obj)
-            lons, lats = utils.check_and_wrap(dset.longitude.values, dset.latitude.values)
-            swath = llsd(longitude=lons, latitude=lats)
-            pswath = npsd(longitude=float(lon), latitude=float(lat))
-            row, col = utils.generate_nearest_neighbour_linesample_arrays(swath, pswath, float(1e6))
-            y, x = row[0][0], col[0][0]
-            return x, y
+        return _nearest_ij(self, lat, lon, radius_of_influence=radius_of_influence)
+
+    def extract_points(self, lat=None, lon=None, siteid=None, radius_of_influence=1e6):
+        """Extract the nearest grid cells to many points at once.
+
+        Parameters
+        ----------
+        lat : array-like
+            Point latitudes.
+        lon : array-like
+            Point longitudes.
+        siteid : array-like, optional
+            Point identifiers, added as a ``siteid`` coordinate.
+        radius_of_influence : float
+            Maximum distance (meters) to a grid cell center.
+            Points with no cell within it are NaN.
+
+        Returns
+        -------
+        xarray.DataArray
+            With the grid dims replaced by a ``site`` dimension
+            (e.g. points by time).
+        """
+        return _extract_points(
+            self, lat, lon, siteid=siteid, radius_of_influence=radius_of_influence
+        )
 
     def nearest_latlon(self, lat=None, lon=None, cleanup=True, esmf=False, **kwargs):
         """Uses xesmf to interpolate to a given latitude and longitude.  Note
@@ -893,10 +977,7 @@ class MONETAccessor:
         xarray.Dataset
         """
         try:
-            from pyresample import utils
-
-            # from .util.interp_util import lonlat_to_swathdefinition as llsd
-            from .util.interp_util import nearest_point_swathdefinition as npsd
+            import pyresample  # noqa: F401
 
             has_pyresample = True
         except ImportError:
@@ -913,11 +994,12 @@ class MONETAccessor:
 
         d = _dataset_to_monet(self._obj)
         if has_pyresample:
-            lons, lats = utils.check_and_wrap(d.longitude.values, d.latitude.values)
-            swath = self._get_CoordinateDefinition(d)
-            pswath = npsd(longitude=float(lon), latitude=float(lat))
-            row, col = utils.generate_nearest_neighbour_linesample_arrays(swath, pswath, **kwargs)
-            y, x = row[0][0], col[0][0]
+            radius_of_influence = kwargs.get("radius_of_influence", 1e6)
+            if np.ndim(lat) > 0 or np.ndim(lon) > 0:
+                return self.extract_points(
+                    lat=lat, lon=lon, radius_of_influence=radius_of_influence
+                )
+            x, y = self.nearest_ij(lat=lat, lon=lon, radius_of_influence=radius_of_influence)
             return d.isel(x=x, y=y)
         elif has_xesmf:
             kwargs = self._check_kwargs_and_set_defaults(**kwargs)
@@ -941,15 +1023,13 @@ class MONETAccessor:
         dict
             With defaults added if not already set.
             Note modified in place.
+            Weights are reused through the cache of
+            :func:`~monet.util.resample.get_regridder`.
         """
-        if "reuse_weights" not in kwargs:
-            kwargs["reuse_weights"] = False
         if "method" not in kwargs:
             kwargs["method"] = "bilinear"
         if "periodic" not in kwargs:
             kwargs["periodic"] = False
-        if "filename" not in kwargs:
-            kwargs["filename"] = "monet_xesmf_regrid_file.nc"
         return kwargs
 
     def quick_imshow(self, map_kws=None, roll_dateline=False, **kwargs):
@@ -1190,7 +1270,7 @@ class MONETAccessor:
             g = geo.CoordinateDefinition(lats=self._obj.latitude, lons=self._obj.longitude)
         return g
 
-    def remap_nearest(self, data, **kwargs):
+    def remap_nearest(self, data, plan=None, num_threads=None, **kwargs):
         """Remap `data` from another grid to the current self grid using pyresample
         nearest-neighbor interpolation.
 
@@ -1200,6 +1280,12 @@ class MONETAccessor:
         ----------
         data : xarray.DataArray or xarray.Dataset
             Data to be interpolated to nearest points in self.
+        plan : monet.util.resample.NearestRemapPlan, optional
+            Precomputed neighbor lookup (see :meth:`nearest_remap_plan`).
+            If given, the KD-tree search is skipped and `kwargs` are ignored.
+        num_threads : int, optional
+            Thread pool size for gathering the variables of a Dataset
+            (see :meth:`monet.util.resample.NearestRemapPlan.apply`).
         radius_of_influence : float
             Radius of influence (meters), used by ``pyresample.kd_tree``.
 
@@ -1210,9 +1296,13 @@ class MONETAccessor:
         """
         from pyresample import kd_tree
 
+        from .util.resample import NearestRemapPlan
+
         # from .grids import get_generic_projection_from_proj4
         # check to see if grid is supplied
         source_data = _dataset_to_monet(data)
+        if plan is not None:
+            return plan.apply(source_data, num_threads=num_threads)
         target_data = _dataset_to_monet(self._obj)
         source = self._get_CoordinateDefinition(data=source_data)
         target = self._get_CoordinateDefinition(data=target_data)
@@ -1224,17 +1314,38 @@ class MONETAccessor:
             result["latitude"] = target_data.latitude
 
         elif isinstance(source_data, xr.Dataset):
-            results = {}
-            for i in source_data.data_vars.keys():
-                results[i] = r.get_sample_from_neighbour_info(source_data[i])
-            result = xr.Dataset(results)
-            if bool(source_data.attrs):
-                result.attrs = source_data.attrs
-            result.coords["latitude"] = target_data.latitude
-            result.coords["longitude"] = target_data.longitude
+            # all variables share the neighbor lookup: gather them in one fused pass
+            plan = NearestRemapPlan.from_resampler(r)
+            result = plan.apply(source_data, num_threads=num_threads)
 
         return result
 
+    def nearest_remap_plan(self, data, radius_of_influence=1e6, **kwargs):
+        """Precompute the nearest-neighbor lookup from the grid of `data`
+        to the current self grid.
+
+        The returned plan can be saved with its ``save`` method and passed as
+        ``plan=`` to :meth:`remap_nearest` for any data on the same source grid.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+            Data on the source grid.
+        radius_of_influence : float
+            Radius of influence (meters), used by ``pyresample.kd_tree``.
+        kwargs : dict
+            Passed on to ``pyresample.kd_tree.get_neighbour_info``.
+
+        Returns
+        -------
+        monet.util.resample.NearestRemapPlan
+        """
+        from .util.resample import NearestRemapPlan
+
+        return NearestRemapPlan.from_data(
+            data, self._obj, radius_of_influence=radius_of_influence, **kwargs
+        )
+
     def remap_xesmf(self, data, **kwargs):
         """Remap `data` from another grid to the current grid of self using xESMF.
 
@@ -1264,7 +1375,7 @@ class MONETAccessor:
         else:
             print("xesmf unavailable. Try `import xesmf` and check the failure message.")
 
-    def combine_point(self, data, suffix=None, pyresample=True, **kwargs):
+    def combine_point(self, data, suffix=None, pyresample=True, method="nearest", **kwargs):
         """Combine self data with point data in dataframe `data`.
 
         Parameters
@@ -1274,6 +1385,9 @@ class MONETAccessor:
             Used to rename new data array(s) if using xemsf.
         pyresample : bool
             Use pyresample (:func:`~monet.util.combinetool.combine_da_to_df`).
+        method : {'nearest', 'bilinear', 'idw', 'gaussian'}
+            Other than ``'nearest'``, interpolate with weights computed once per site
+            (:class:`~monet.util.resample.WeightedRemapPlan`, no xESMF needed).
         kwargs : dict
             Passed on to
             :func:`~monet.util.combinetool.combine_da_to_df`
@@ -1284,13 +1398,15 @@ class MONETAccessor:
         -------
         pandas.DataFrame
         """
-        if has_pyresample:
-            from .util.combinetool import combine_da_to_df
+        from .util.combinetool import combine_da_to_df
+
         if has_xesmf:
             from .util.combinetool import combine_da_to_df_xesmf
         # point source data
         da = _dataset_to_monet(self._obj)
         if isinstance(data, pd.DataFrame):
+            if method != "nearest":
+                return combine_da_to_df(da, data, method=method, **kwargs)
             if has_pyresample and pyresample:
                 return combine_da_to_df(da, data, **kwargs)
             else:  # xesmf resample
@@ -1449,26 +1565,33 @@ class MONETAccessorDataset:
         else:
             print("xesmf unavailable. Try `import xesmf` and check the failure message.")
 
-    def _remap_xesmf_dataset(self, dset, filename="monet_xesmf_regrid_file.nc", **kwargs):
+    def _remap_xesmf_dataset(self, dset, method="bilinear", **kwargs):
+        """Resample all variables of the Dataset to the dataset object,
+        building the regridder once.
+
+        Parameters
+        ----------
+        dset : xarray.Dataset
+
+        Returns
+        -------
+        xarray.Dataset
+        """
+        from .util import resample
+
         skip_keys = ["lat", "lon", "time", "TFLAG"]
-        vars = pd.Series(list(dset.variables))
-        loop_vars = vars.loc[~vars.isin(skip_keys)]
-        dataarray = dset[loop_vars[0]]
-        da = self._remap_xesmf_dataarray(dataarray, filename=filename, **kwargs)
-        self._obj[da.name] = da
+        loop_vars = [name for name in dset.data_vars if name not in skip_keys]
+        regridder = resample.get_regridder(dset, self._obj, method=method, **kwargs)
+        out = resample.regrid_dataset(regridder, dset[loop_vars])
         das = {}
-        das[da.name] = da
-        for i in loop_vars[1:]:
-            dataarray = dset[i]
-            tmp = self._remap_xesmf_dataarray(
-                dataarray, filename=filename, reuse_weights=True, **kwargs
-            )
-            das[tmp.name] = tmp.copy()
+        for name, da in out.data_vars.items():
+            if name in self._obj.variables:
+                name = name + "_y"
+            self._obj[name] = da
+            das[name] = da
         return xr.Dataset(das)
 
-    def _remap_xesmf_dataarray(
-        self, dataarray, method="bilinear", filename="monet_xesmf_regrid_file.nc", **kwargs
-    ):
+    def _remap_xesmf_dataarray(self, dataarray, method="bilinear", **kwargs):
         """Resample the DataArray to the dataset object.
 
         Parameters
@@ -1482,7 +1605,7 @@ class MONETAccessorDataset:
         from .util import resample
 
         target = self._obj
-        out = resample.resample_xesmf(dataarray, target, method=method, filename=filename, **kwargs)
+        out = resample.resample_xesmf(dataarray, target, method=method, **kwargs)
         if out.name in self._obj.variables:
             out.name = out.name + "_y"
         self._obj[out.name] = out
@@ -1503,7 +1626,7 @@ class MONETAccessorDataset:
             g = geo.CoordinateDefinition(lats=self._obj.latitude, lons=self._obj.longitude)
         return g
 
-    def remap_nearest(self, data, radius_of_influence=1e6):
+    def remap_nearest(self, data, radius_of_influence=1e6, plan=None, num_threads=None):
         """Remap `data` from another grid to the current self grid using pyresample
         nearest-neighbor interpolation.
 
@@ -1514,6 +1637,12 @@ class MONETAccessorDataset:
             Must include lat/lon coordinates.
         radius_of_influence : float
             Radius of influence (meters), used by ``pyresample.kd_tree``.
+        plan : monet.util.resample.NearestRemapPlan, optional
+            Precomputed neighbor lookup (see :meth:`nearest_remap_plan`).
+            If given, the KD-tree search is skipped.
+        num_threads : int, optional
+            Thread pool size for gathering the variables of a Dataset
+            (see :meth:`monet.util.resample.NearestRemapPlan.apply`).
 
         Returns
         -------
@@ -1522,6 +1651,8 @@ class MONETAccessorDataset:
         """
         from pyresample import kd_tree
 
+        from .util.resample import NearestRemapPlan
+
         # from .grids import get_generic_projection_from_proj4
         # check to see if grid is supplied
         try:
@@ -1535,6 +1666,8 @@ class MONETAccessorDataset:
         except TypeError:
             print("data must be either an Xarray.DataArray or Xarray.Dataset")
         source_data = _dataset_to_monet(data)
+        if plan is not None:
+            return plan.apply(source_data, num_threads=num_threads)
         target_data = _dataset_to_monet(self._obj)
         source = self._get_CoordinateDefinition(source_data)
         target = self._get_CoordinateDefinition(target_data)
@@ -1546,34 +1679,66 @@ class MONETAccessorDataset:
             result["latitude"] = target_data.latitude
 
         elif isinstance(source_data, xr.Dataset):
-            results = {}
-            for i in source_data.data_vars.keys():
-                results[i] = r.get_sample_from_neighbour_info(source_data[i])
-            result = xr.Dataset(results)
-            if bool(source_data.attrs):
-                result.attrs = source_data.attrs
-            result.coords["latitude"] = target_data.latitude
-            result.coords["longitude"] = target_data.longitude
+            # all variables share the neighbor lookup: gather them in one fused pass
+            plan = NearestRemapPlan.from_resampler(r)
+            result = plan.apply(source_data, num_threads=num_threads)
 
         return result
 
+    def nearest_remap_plan(self, data, radius_of_influence=1e6, **kwargs):
+        """Precompute the nearest-neighbor lookup from the grid of `data`
+        to the current self grid.
+
+        The returned plan can be saved with its ``save`` method and passed as
+        ``plan=`` to :meth:`remap_nearest` for any data on the same source grid.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+            Data on the source grid.
+        radius_of_influence : float
+            Radius of influence (meters), used by ``pyresample.kd_tree``.
+        kwargs : dict
+            Passed on to ``pyresample.kd_tree.get_neighbour_info``.
+
+        Returns
+        -------
+        monet.util.resample.NearestRemapPlan
+        """
+        from .util.resample import NearestRemapPlan
+
+        return NearestRemapPlan.from_data(
+            data, self._obj, radius_of_influence=radius_of_influence, **kwargs
+        )
+
     # Add nearest function for unstructured grid
-    def remap_nearest_unstructured(self, data):
+    def remap_nearest_unstructured(self, data, k=1, power=2.0, radius_of_influence=None):
         """Find the closest model data (`data`) to the observation (self)
         for unstructured grid model data.
 
-        Based on model grid cell center locations.
+        Based on model grid cell center locations. All sites are looked up at
+        once in a KD-tree of the cell centers on the unit sphere, so the
+        neighbors are the great-circle nearest cells. All model levels are kept.
 
         Parameters
         ----------
         data : xarray.Dataset
             Data to be interpolated, including lat/lon coordinates.
+        k : int
+            Number of nearest cells to use. If greater than one,
+            the values are inverse-distance weighted.
+        power : float
+            Inverse-distance weighting power (used if ``k > 1``).
+        radius_of_influence : float, optional
+            Maximum distance (m) to a model cell. Sites with no cell within
+            this distance are set to NaN. Unlimited by default.
 
         Returns
         -------
         xarray.Dataset
             Data on self grid.
         """
+        from .util.interp_util import query_sphere_kdtree, sphere_kdtree
 
         try:
             check_error = False
@@ -1589,99 +1754,127 @@ class MONETAccessorDataset:
         model_data = data
         obs_data = self._obj
 
-        site_indices = []
         site_latitudes = obs_data["latitude"].values[0, :]
         site_longitudes = obs_data["longitude"].values[0, :]
         model_latitudes = model_data["latitude"].values
         model_longitudes = model_data["longitude"].values
-
-        for siteii in np.arange(len(obs_data["siteid"][0])):
-            # ==== Needed to be updated in the future =====
-            # currently based on center lon & lat
-            # lon_tmp = d2['longitude'].values[0,siteii]
-            # if lon_tmp < -0.:
-            #    lon_tmp += 360.
-            #
-            # site_indices.append( get_site_index( lon_tmp,
-            #                                     d2['latitude'].values[0,siteii],
-            #                                     scrip_file=d1.monet.scrip, check_N=20 ) )
-            site_indices.append(
-                np.argmin(
-                    np.abs(site_latitudes[siteii] - model_latitudes)
-                    + np.abs(site_longitudes[siteii] - model_longitudes)
-                )
-            )
+        cell_dim = model_data["latitude"].dims[0]
+
+        tree = sphere_kdtree(longitude=model_longitudes, latitude=model_latitudes)
+        distance, site_indices = query_sphere_kdtree(
+            tree,
+            longitude=site_longitudes,
+            latitude=site_latitudes,
+            k=k,
+            radius_of_influence=radius_of_influence,
+        )
+        if k == 1:
+            distance = distance[:, np.newaxis]
+            site_indices = site_indices[:, np.newaxis]
+        nsites = len(site_latitudes)
+        valid = site_indices >= 0
+        if k == 1:
+            weights = valid.astype(float)
+        else:
+            with np.errstate(divide="ignore"):
+                weights = np.where(valid, 1.0 / distance**power, 0.0)
+            # a site on top of a cell center takes that cell's value
+            exact = valid & (distance == 0)
+            weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), weights)
+
+        indexer = xr.DataArray(
+            np.where(valid, site_indices, 0).reshape(1, nsites, k), dims=["y", "x", "monet_k"]
+        )
+        w = xr.DataArray(weights.reshape(1, nsites, k), dims=["y", "x", "monet_k"])
 
         dict_data = {}
         for dvar in model_data.data_vars:
-            if dvar in ["latitude", "longitude"]:
+            if dvar in ["latitude", "longitude"] or cell_dim not in model_data[dvar].dims:
                 continue
+            gathered = model_data[dvar].drop_vars(["latitude", "longitude"], errors="ignore")
+            gathered = gathered.isel({cell_dim: indexer})
+            if k == 1:
+                out = gathered.squeeze("monet_k", drop=True).where(w.squeeze("monet_k") > 0)
             else:
-                dict_data[dvar] = (
-                    ["time", "z", "y", "x"],
-                    model_data[dvar][:, 0, np.array(site_indices)].values.reshape(
-                        len(model_data["time"]), 1, 1, len(site_indices)
-                    ),
-                )
+                wv = w.where(gathered.notnull(), 0.0)
+                out = (gathered.fillna(0) * wv).sum("monet_k") / wv.sum("monet_k")
+            dict_data[dvar] = out.drop_vars(cell_dim, errors="ignore")
 
+        nearest = np.where(valid[:, 0], site_indices[:, 0], 0)
         dict_coords = {
             "time": (["time"], model_data["time"].values),
-            "x": (["x"], np.arange(len(site_indices))),
+            "x": (["x"], np.arange(nsites)),
             "longitude": (
                 ["y", "x"],
-                model_longitudes[np.array(site_indices)].reshape(1, len(site_indices)),
+                np.where(valid[:, 0], model_longitudes[nearest], np.nan).reshape(1, nsites),
             ),
             "latitude": (
                 ["y", "x"],
-                model_latitudes[np.array(site_indices)].reshape(1, len(site_indices)),
+                np.where(valid[:, 0], model_latitudes[nearest], np.nan).reshape(1, nsites),
             ),
         }
 
-        result = xr.Dataset(data_vars=dict_data, coords=dict_coords)
+        result = xr.Dataset(data_vars=dict_data).assign_coords(dict_coords)
 
         return result
 
-    def nearest_ij(self, lat=None, lon=None, **kwargs):
-        """Uses pyresample to interpolate to find the i, j index of grid with respect to the given lat lon.
+    def nearest_ij(self, lat=None, lon=None, radius_of_influence=1e6, **kwargs):
+        """Find the i, j index of grid with respect to the given lat lon.
+
+        The grid cell centers are put in a KD-tree on first use, which is
+        cached on the accessor; `lat` and `lon` can be arrays of many points.
 
         Parameters
         ----------
-        lat : float
-            latitude in question
-        lon : float
-            longitude in question
+        lat : float or array-like
+            latitude(s) in question
+        lon : float or array-like
+            longitude(s) in question
+        radius_of_influence : float
+            Maximum distance (meters) to a grid cell center.
         **kwargs : dict
-            pyresample kwargs for nearest neighbor interpolation
+            Ignored, for backward compatibility.
 
         Returns
         -------
         i,j
-            Returns the i (x index) and j (y index) of the given latitude longitude value
-        """
-        try:
-            from pyresample import utils
-
-            has_pyresample = True
-        except ImportError:
-            has_pyresample = False
-            print("requires pyresample to be installed")
-        from .util.interp_util import lonlat_to_swathdefinition as llsd
-        from .util.interp_util import nearest_point_swathdefinition as npsd
+            Returns the i (x index) and j (y index) of the given latitude longitude value.
+            Arrays (of the shape of `lat`) if arrays are given,
+            ``-1`` where no grid cell is within `radius_of_influence`.
 
+        """
         try:
             if lat is None or lon is None:
                 raise RuntimeError
         except RuntimeError:
             print("Must provide latitude and longitude")
 
-        if has_pyresample:
-            dset = _dataset_to_monet(self._obj)
-            lons, lats = utils.check_and_wrap(dset.longitude.values, dset.latitude.values)
-            swath = llsd(longitude=lons, latitude=lats)
-            pswath = npsd(longitude=float(lon), latitude=float(lat))
-            row, col = utils.generate_nearest_neighbour_linesample_arrays(swath, pswath, float(1e6))
-            y, x = row[0][0], col[0][0]
-            return x, y
+        return _nearest_ij(self, lat, lon, radius_of_influence=radius_of_influence)
+
+    def extract_points(self, lat=None, lon=None, siteid=None, radius_of_influence=1e6):
+        """Extract the nearest grid cells to many points at once.
+
+        Parameters
+        ----------
+        lat : array-like
+            Point latitudes.
+        lon : array-like
+            Point longitudes.
+        siteid : array-like, optional
+            Point identifiers, added as a ``siteid`` coordinate.
+        radius_of_influence : float
+            Maximum distance (meters) to a grid cell center.
+            Points with no cell within it are NaN.
+
+        Returns
+        -------
+        xarray.Dataset
+            With the grid dims replaced by a ``site`` dimension
+            (e.g. points by time).
+        """
+        return _extract_points(
+            self, lat, lon, siteid=siteid, radius_of_influence=radius_of_influence
+        )
 
     def nearest_latlon(self, lat=None, lon=None, cleanup=True, esmf=False, **kwargs):
         """Uses xesmf to interpolate to a given latitude and longitude.  Note
@@ -1699,10 +1892,7 @@ class MONETAccessorDataset:
         xarray.Dataset
         """
         try:
-            from pyresample import utils
-
-            from .util.interp_util import lonlat_to_swathdefinition as llsd
-            from .util.interp_util import nearest_point_swathdefinition as npsd
+            import pyresample  # noqa: F401
 
             has_pyresample = True
         except ImportError:
@@ -1717,16 +1907,15 @@ class MONETAccessorDataset:
         except RuntimeError:
             print("Must provide latitude and longitude")
 
-        # d = _dataset_to_monet(self._obj)
+        d = _dataset_to_monet(self._obj)
         if has_pyresample:
-            dset = _dataset_to_monet(self._obj)
-            # print(dset)
-            lons, lats = utils.check_and_wrap(dset.longitude.values, dset.latitude.values)
-            swath = llsd(longitude=lons, latitude=lats)
-            pswath = npsd(longitude=float(lon), latitude=float(lat))
-            row, col = utils.generate_nearest_neighbour_linesample_arrays(swath, pswath, float(1e6))
-            y, x = row[0][0], col[0][0]
-            return dset.isel(x=x).isel(y=y)
+            radius_of_influence = kwargs.get("radius_of_influence", 1e6)
+            if np.ndim(lat) > 0 or np.ndim(lon) > 0:
+                return self.extract_points(
+                    lat=lat, lon=lon, radius_of_influence=radius_of_influence
+                )
+            x, y = self.nearest_ij(lat=lat, lon=lon, radius_of_influence=radius_of_influence)
+            return d.isel(x=x).isel(y=y)
         elif has_xesmf:
             kwargs = self._check_kwargs_and_set_defaults(**kwargs)
             self._obj = _rename_latlon(self._obj)
@@ -1749,15 +1938,13 @@ class MONETAccessorDataset:
         dict
             With defaults added if not already set.
             Note modified in place.
+            Weights are reused through the cache of
+            :func:`~monet.util.resample.get_regridder`.
         """
-        if "reuse_weights" not in kwargs:
-            kwargs["reuse_weights"] = False
         if "method" not in kwargs:
             kwargs["method"] = "bilinear"
         if "periodic" not in kwargs:
             kwargs["periodic"] = False
-        if "filename" not in kwargs:
-            kwargs["filename"] = "monet_xesmf_regrid_file.nc"
         return kwargs
 
     def interp_constant_lat(self, lat=None, lat_name="latitude", lon_name="longitude", **kwargs):
@@ -1934,7 +2121,7 @@ class MONETAccessorDataset:
         except ImportError:
             print("Window functionality is unavailable without pyresample")
 
-    def combine_point(self, data, suffix=None, pyresample=True, **kwargs):
+    def combine_point(self, data, suffix=None, pyresample=True, method="nearest", **kwargs):
         """Combine self data with point data in dataframe `data`.
 
         Parameters
@@ -1944,6 +2131,9 @@ class MONETAccessorDataset:
             Used to rename new data array(s) if using xemsf.
         pyresample : bool
             Use pyresample (:func:`~monet.util.combinetool.combine_da_to_df`).
+        method : {'nearest', 'bilinear', 'idw', 'gaussian'}
+            Other than ``'nearest'``, interpolate with weights computed once per site
+            (:class:`~monet.util.resample.WeightedRemapPlan`, no xESMF needed).
         kwargs : dict
             Passed on to
             :func:`~monet.util.combinetool.combine_da_to_df`
@@ -1954,13 +2144,15 @@ class MONETAccessorDataset:
         -------
         pandas.DataFrame
         """
-        if has_pyresample:
-            from .util.combinetool import combine_da_to_df
+        from .util.combinetool import combine_da_to_df
+
         if has_xesmf:
             from .util.combinetool import combine_da_to_df_xesmf
         # point source data
         da = _dataset_to_monet(self._obj)
         if isinstance(data, pd.DataFrame):
+            if method != "nearest":
+                return combine_da_to_df(da, data, method=method, **kwargs)
             if has_pyresample and pyresample:
                 return combine_da_to_df(da, data, **kwargs)
             else:  # xesmf resample
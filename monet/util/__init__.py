@@ -2,11 +2,20 @@ import numpy as np
 
 # __name__ = 'util'
 # For backward compatibility
-from . import combinetool, interp_util, resample
+from . import categorical, combinetool, fusedstats, interp_util, resample
 from . import stats as mystats
 from . import tools
 
-__all__ = ["stats", "mystats", "tools", "interp_util", "resample", "combinetool"]
+__all__ = [
+    "stats",
+    "mystats",
+    "tools",
+    "interp_util",
+    "resample",
+    "combinetool",
+    "fusedstats",
+    "categorical",
+]
 
 
 def nearest(items, pivot):
@@ -61,17 +70,24 @@ def _force_forder(x):
         return (x, False)
 
 
-def kolmogorov_zurbenko_filter(df, window, iterations):
+def kolmogorov_zurbenko_filter(df, window, iterations, freq=None):
+    """KZ filter of a pandas Series or of every column of a DataFrame.
+
+    With a DatetimeIndex the values are placed on a regular time axis (step
+    `freq`, by default the smallest step of the index) first, so gaps count
+    as missing values; otherwise the rows are taken as regularly spaced.
+    See :func:`monet.util.tools.kz_filter`.
+    """
     import pandas as pd
 
-    """KZ filter implementation
-        series is a pandas series
-        window is the filter window m in the units of the data (m = 2q+1)
-        iterations is the number of times the moving average is evaluated
-        """
-    z = df.copy()
-    for i in range(iterations):
-        z = pd.rolling_mean(z, window=window, min_periods=1, center=True)
+    z = df.astype(float)
+    if not isinstance(z.index, pd.DatetimeIndex) or z.index.hasnans:
+        z.iloc[:] = tools.kz_filter(z.values, window, iterations, axis=0)
+        return z
+    pos = tools._regular_positions(z.index.values, np.zeros(len(z), dtype=np.int64), freq)
+    dense = np.full((pos.max() + 1 if pos.size else 0,) + z.shape[1:], np.nan)
+    dense[pos] = z.values
+    z.iloc[:] = tools.kz_filter(dense, window, iterations, axis=0)[pos]
     return z
 
 
@@ -83,15 +99,9 @@ def wsdir2uv(ws, wdir):
     return u, v
 
 
-def long_to_wide(df):
-    from pandas import merge
-
-    w = df.pivot_table(values="obs", index=["time", "siteid"], columns="variable").reset_index()
-    g = df.groupby("variable")
-    for name, group in g:
-        w[name + "_unit"] = group.units.unique()[0]
-    # mergeon = hstack((index.values, df.variable.unique()))
-    return merge(w, df, on=["siteid", "time"])
+def long_to_wide(df, merge=True):
+    """See :func:`monet.util.tools.long_to_wide`."""
+    return tools.long_to_wide(df, merge=merge)
 
 
 def calc_8hr_rolling_max(df, col=None, window=None):
@@ -273,19 +283,8 @@ def get_giorgi_region_bounds(index=None, acronym=None):
 
 
 def get_giorgi_region_df(df):
-    df.loc[:, "GIORGI_INDEX"] = None
-    df.loc[:, "GIORGI_ACRO"] = None
-    for i in range(22):
-        latmin, lonmin, latmax, lonmax, acro = get_giorgi_region_bounds(index=int(i + 1))
-        con = (
-            (df.longitude <= lonmax)
-            & (df.longitude >= lonmin)
-            & (df.latitude <= latmax)
-            & (df.latitude >= latmin)
-        )
-        df.loc[con, "GIORGI_INDEX"] = i + 1
-        df.loc[con, "GIORGI_ACRO"] = acro
-    return df
+    """See :func:`monet.util.tools.get_giorgi_region_df`."""
+    return tools.get_giorgi_region_df(df)
 
 
 def calc_13_category_usda_soil_type(clay, sand, silt):
@@ -0,0 +1,57 @@
+"""numba-compiled kernel of :func:`monet.util.fusedstats.wind_direction_stats`.
+
+Only imported on first use, so that importing :mod:`monet` does not import
+numba. The pure-Python :func:`~monet.util.fusedstats._wd_rows` and
+:func:`~monet.util.fusedstats._cb` are the reference for these loops.
+"""
+
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True)
+def _cb(b):
+    """Compiled :func:`monet.util.fusedstats._cb`."""
+    if b > 180:
+        b -= 360
+    if b < -180:
+        b += 360
+    return b
+
+
+@numba.njit(parallel=True, cache=True)
+def _wd_rows(o, m, out):
+    """Compiled :func:`monet.util.fusedstats._wd_rows`, parallel over the rows."""
+    for i in numba.prange(o.shape[0]):
+        n = 0
+        so = 0.0
+        for k in range(o.shape[1]):
+            if np.isfinite(o[i, k]) and np.isfinite(m[i, k]):
+                n += 1
+                so += o[i, k]
+        if n == 0:
+            for j in range(out.shape[1]):
+                out[i, j] = np.nan
+            continue
+        c = so / n
+        scb = sacb = scbb = swioa = swac = swacm = swaco = 0.0
+        for k in range(o.shape[1]):
+            ok = o[i, k]
+            mk = m[i, k]
+            if not (np.isfinite(ok) and np.isfinite(mk)):
+                continue
+            b = _cb(mk - ok)
+            bh = _cb(mk - c)
+            oh = _cb(ok - c)
+            scb += b
+            sacb += abs(b)
+            scbb += b * b
+            swioa += (abs(bh) + abs(oh)) ** 2
+            swac += bh * oh
+            swacm += bh * bh
+            swaco += oh * oh
+        out[i, 0] = scb / n
+        out[i, 1] = sacb / n
+        out[i, 2] = np.sqrt(scbb / n)
+        out[i, 3] = 1.0 - scbb / swioa if swioa > 0 else np.nan
+        out[i, 4] = swac / np.sqrt(swacm * swaco) if swacm * swaco > 0 else np.nan
@@ -0,0 +1,161 @@
+"""Categorical (threshold exceedance) verification scores.
+
+The contingency table of every threshold is counted at once: each value
+is binned once against the sorted thresholds, and the number of values
+above each threshold follows from a reversed cumulative sum of the bin
+counts. A pair is a hit when both values exceed the threshold, i.e. when
+their minimum does.
+
+Counts follow :func:`monet.util.stats.scores`: ``a`` hits, ``b`` misses
+(observed but not modeled), ``c`` false alarms (modeled but not
+observed) and ``d`` correct negatives.
+"""
+
+import numpy as np
+
+#: scores of :func:`categorical_scores`
+SCORES = ("POD", "FAR", "CSI", "ETS", "HSS", "BIAS", "PSS")
+
+
+def _exceedance_counts(values, thresholds, codes, ngroups):
+    """Number of `values` above each threshold, per group: ``(ngroups, nthresh)``."""
+    nt = len(thresholds)
+    # number of thresholds strictly below each value
+    idx = np.searchsorted(thresholds, values, side="left")
+    hist = np.bincount(codes * (nt + 1) + idx, minlength=ngroups * (nt + 1))
+    hist = hist.reshape(ngroups, nt + 1)
+    # values with idx > j exceed threshold j
+    return np.cumsum(hist[:, ::-1], axis=1)[:, ::-1][:, 1:]
+
+
+def contingency_table(obs, mod, thresholds, codes=None, ngroups=None):
+    """Contingency table counts for many thresholds at once.
+
+    An event is a value above the threshold. Pairs where either `obs`
+    or `mod` is masked or NaN are skipped.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values.
+    thresholds : array-like
+        Event thresholds.
+    codes : array-like of int, optional
+        Group code (``0 <= code < ngroups``) of each pair, -1 to skip the pair.
+    ngroups : int, optional
+        Number of groups (default ``codes.max() + 1``).
+
+    Returns
+    -------
+    a, b, c, d : numpy.ndarray
+        Hits, misses, false alarms and correct negatives, shaped like
+        `thresholds` (``(ngroups, len(thresholds))`` with `codes`).
+    """
+    o = np.ma.filled(np.ma.asarray(obs, dtype=float), np.nan).ravel()
+    m = np.ma.filled(np.ma.asarray(mod, dtype=float), np.nan).ravel()
+    thresholds = np.asarray(thresholds, dtype=float)
+    order = np.argsort(thresholds.ravel(), kind="stable")
+    t = thresholds.ravel()[order]
+    keep = np.isfinite(o) & np.isfinite(m)
+    if codes is None:
+        grouped = False
+        codes = np.zeros(o.size, dtype=np.intp)
+        ngroups = 1
+    else:
+        grouped = True
+        codes = np.asarray(codes, dtype=np.intp).ravel()
+        keep &= codes >= 0
+        if ngroups is None:
+            ngroups = int(codes.max()) + 1 if codes.size else 0
+    o, m, codes = o[keep], m[keep], codes[keep]
+
+    n = np.bincount(codes, minlength=ngroups)[:, None]
+    obs_yes = _exceedance_counts(o, t, codes, ngroups)
+    mod_yes = _exceedance_counts(m, t, codes, ngroups)
+    a = _exceedance_counts(np.minimum(o, m), t, codes, ngroups)
+    b = obs_yes - a
+    c = mod_yes - a
+    d = n - a - b - c
+
+    # back to the order (and shape) of `thresholds`
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(order.size)
+    shape = thresholds.shape if not grouped else (ngroups,) + thresholds.shape
+    return tuple(x[:, inverse].reshape(shape) for x in (a, b, c, d))
+
+
+def scores_from_table(a, b, c, d):
+    """Categorical scores from contingency table counts.
+
+    Parameters
+    ----------
+    a, b, c, d : array-like
+        Hits, misses, false alarms and correct negatives.
+
+    Returns
+    -------
+    dict
+        ``POD`` (probability of detection), ``FAR`` (false alarm ratio),
+        ``CSI`` (critical success index), ``ETS`` (equitable threat score),
+        ``HSS`` (Heidke skill score), ``BIAS`` (frequency bias) and
+        ``PSS`` (Peirce skill score); NaN where undefined.
+    """
+    a, b, c, d = (np.asarray(x, dtype=float) for x in (a, b, c, d))
+    n = a + b + c + d
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ar = (a + b) * (a + c) / n
+        return {
+            "POD": a / (a + b),
+            "FAR": c / (a + c),
+            "CSI": a / (a + b + c),
+            "ETS": (a - ar) / (a + b + c - ar),
+            "HSS": 2 * (a * d - b * c) / ((a + c) * (c + d) + (a + b) * (b + d)),
+            "BIAS": (a + c) / (a + b),
+            "PSS": a / (a + b) - c / (c + d),
+        }
+
+
+def categorical_scores(obs, mod, thresholds, groups=None):
+    """Contingency table and categorical scores for many thresholds
+    (and groups) at once.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values.
+        Pairs where either is masked or NaN are skipped.
+    thresholds : array-like
+        Event thresholds (an event is a value above the threshold).
+    groups : array-like or list of array-like, optional
+        Group key(s) of each pair, as for
+        :func:`monet.util.fusedstats.grouped_stats`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (group and) threshold, with the group key column(s),
+        ``threshold``, the counts ``hits``, ``misses``, ``false_alarms``,
+        ``correct_negatives`` and the scores of :data:`SCORES`.
+    """
+    from pandas import DataFrame
+
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    out = {}
+    if groups is None:
+        a, b, c, d = contingency_table(obs, mod, thresholds)
+        out["threshold"] = thresholds
+    else:
+        from .fusedstats import _group_codes
+
+        codes, labels, names = _group_codes(groups)
+        ngroups = len(labels[0])
+        a, b, c, d = (x.ravel() for x in contingency_table(obs, mod, thresholds, codes, ngroups))
+        for name, label in zip(names, labels):
+            out[name] = np.repeat(label, thresholds.size)
+        out["threshold"] = np.tile(thresholds, ngroups)
+    out["hits"] = a
+    out["misses"] = b
+    out["false_alarms"] = c
+    out["correct_negatives"] = d
+    out.update(scores_from_table(a, b, c, d))
+    return DataFrame(out)
@@ -1,32 +1,19 @@
 import xarray as xr
-from pandas import Series, merge_asof
+from pandas import Index, Series, Timedelta, merge_asof
 
 
-def combine_da_to_df(da, df, *, merge=True, **kwargs):
-    """Combine xarray data array `da` with spatial information
-    point observations in dataframe `df`, returning a new dataframe.
-
-    Uses pyresample via ``.monet.remap_nearest``.
-
-    Parameters
-    ----------
-    da : xarray.DataArray or xarray.Dataset
-        Data to be interpolated to target grid points.
-        Can be unstructured-grid data
-        (detected by checking ``'mio_has_unstructured_grid'`` attribute).
-    df : pandas.DataFrame
-        Data on target points.
-    merge : bool
-        Merge interpolated `df` data with `da` data.
-        Otherwise, return interpolated `da` data only.
-    kwargs : dict
-        Passed to :meth:`~monet.monet_accessor.MONETAccessor.remap_nearest`
-        (if `da` is not unstructured-grid data).
+def _remap_da_to_sites(da, df, method="nearest", **kwargs):
+    """Lazily remap `da` to the unique sites in `df`.
 
     Returns
     -------
-    pandas.DataFrame
+    target_da : pandas.DataFrame
+        One row per site.
+    da_interped : xarray.DataArray or xarray.Dataset
+        `da` on the sites (not computed).
     """
+    from ..monet_accessor import _dataset_to_monet
+
     target_da = df.drop_duplicates(subset=["siteid"]).dropna(
         subset=["latitude", "longitude", "siteid"]
     )
@@ -34,10 +21,23 @@ def combine_da_to_df(da, df, *, merge=True, **kwargs):
 
     # Add if statement for unstructured grid output
     if da.attrs.get("mio_has_unstructured_grid", False):
-        da_interped = target_data_da.monet.remap_nearest_unstructured(da).compute()
+        da_interped = target_data_da.monet.remap_nearest_unstructured(da)
+        # pair with the lowest model level only
+        level_dims = [d for d in da_interped.dims if d not in ("time", "y", "x")]
+        da_interped = da_interped.isel({d: 0 for d in level_dims}, drop=True)
+    elif method == "nearest":
+        da_interped = target_data_da.monet.remap_nearest(da, **kwargs)
     else:
-        da_interped = target_data_da.monet.remap_nearest(da, **kwargs).compute()
+        from .resample import WeightedRemapPlan
 
+        plan = WeightedRemapPlan.from_data(da, target_data_da, method=method, **kwargs)
+        da_interped = plan.apply(_dataset_to_monet(da))
+    return target_da, da_interped
+
+
+def _interped_to_df(da_interped, target_da, da, df):
+    """Convert remapped site data to a long dataframe, renaming variables
+    that clash with columns of `df`."""
     da_interped["siteid"] = (("x"), target_da.siteid)
     da_interped_df = da_interped.to_dataframe().reset_index()
     cols = Series(da_interped_df.columns)
@@ -52,13 +52,461 @@ def combine_da_to_df(da, df, *, merge=True, **kwargs):
         if len(dup_names) > 0:
             for name in dup_names:
                 da_interped_df.rename(columns={name: name + "_new"}, inplace=True)
+    return da_interped_df
+
+
+def _time_indexer(model_times, obs_times, time_match="exact", tolerance=None):
+    """Locate `obs_times` in the sorted `model_times`.
+
+    Returns
+    -------
+    i0, i1 : numpy.ndarray
+        Bracketing model time indices for each obs time.
+    w : numpy.ndarray
+        Weight of ``i1`` (0 unless ``time_match='linear'``).
+    valid : numpy.ndarray of bool
+        Obs times that could be matched.
+    """
+    import numpy as np
+
+    n = len(model_times)
+    obs_times = np.asarray(obs_times)
+    if np.issubdtype(model_times.dtype, np.datetime64):
+        obs_times = obs_times.astype(model_times.dtype)
+    pos = np.searchsorted(model_times, obs_times, side="left")
+    i1 = np.clip(pos, 0, n - 1)
+    w = np.zeros(len(obs_times))
+    if time_match == "exact":
+        valid = model_times[i1] == obs_times
+        return i1, i1, w, valid
+    i0 = np.clip(pos - 1, 0, n - 1)
+    if time_match == "nearest":
+        d0 = np.abs(obs_times - model_times[i0])
+        d1 = np.abs(model_times[i1] - obs_times)
+        idx = np.where(d0 < d1, i0, i1)
+        valid = ~np.isnat(obs_times) if obs_times.dtype.kind == "M" else ~np.isnan(obs_times)
+        if tolerance is not None:
+            if obs_times.dtype.kind == "M":
+                tolerance = Timedelta(tolerance).to_timedelta64()
+            valid &= np.minimum(d0, d1) <= tolerance
+        return idx, idx, w, valid
+    if time_match == "linear":
+        exact = model_times[i1] == obs_times
+        i0 = np.where(exact, i1, i0)
+        valid = exact | ((pos > 0) & (pos < n))
+        span = model_times[i1] - model_times[i0]
+        inside = valid & ~exact
+        w[inside] = (obs_times[inside] - model_times[i0][inside]) / span[inside]
+        return i0, i1, w, valid
+    raise ValueError("`time_match` must be 'exact', 'nearest' or 'linear'")
+
+
+def _join_to_obs(da_interped, target_da, da, df, time_match="exact", tolerance=None):
+    """Attach the remapped site data to the rows of `df` by indexed lookup.
+
+    Sites are integer-encoded against ``target_da.siteid`` and obs times
+    located in the sorted model times with :func:`numpy.searchsorted`, so
+    no hash merge on object columns is needed. For ``time_match='exact'``
+    the result matches ``df.merge(..., on=['time', 'siteid'], how='left')``.
+
+    Returns ``None`` if a variable has dimensions other than time and site
+    (e.g. several levels), which the caller then merges the old way.
+    """
+    import numpy as np
+
+    ds = da_interped.to_dataset() if isinstance(da_interped, xr.DataArray) else da_interped
+    if any(set(v.dims) - {"time", "y", "x"} for v in ds.data_vars.values()):
+        return None
+    names = [da.name] if isinstance(da, xr.DataArray) else list(da.data_vars)
+    names = {k: (k + "_new" if k in names and k in df.columns else k) for k in ds.data_vars}
+
+    sites = np.asarray(df["siteid"].values)
+    site_code = Index(target_da["siteid"].values).get_indexer(sites)
+    has_site = site_code >= 0
+    site_code = np.where(has_site, site_code, 0)
+    if "time" in ds.dims:
+        model_times = ds["time"].values
+        order = np.argsort(model_times, kind="stable")
+        i0, i1, w, valid = _time_indexer(
+            model_times[order], df["time"].values, time_match=time_match, tolerance=tolerance
+        )
+        i0, i1 = order[i0], order[i1]
+        valid &= has_site
+    else:
+        valid = has_site
+
+    out = df.reset_index(drop=True)
+    new = {}
+    for k, v in ds.data_vars.items():
+        dims = [d for d in ("time", "y", "x") if d in v.dims]
+        values = v.transpose(*dims).values.reshape(-1, v.sizes.get("x", 1))
+        if "time" not in v.dims:
+            col = values[0, site_code]
+        elif time_match == "linear":
+            col = values[i0, site_code] * (1 - w) + values[i1, site_code] * w
+        else:
+            col = values[i0, site_code]
+        if not valid.all():
+            col = col.astype(np.result_type(col.dtype, np.float32))
+            col[~valid] = np.nan
+        new[names[k]] = col
+    for k, col in new.items():
+        out[k] = col
+    return out
+
+
+def _pair_remapped(da_interped, target_da, da, df, merge=True, time_match="exact", tolerance=None):
+    """Pair the computed site data `da_interped` with the rows of `df`
+    (or, if not `merge`, convert it to a long dataframe)."""
+    if not merge:
+        return _interped_to_df(da_interped, target_da, da, df)
+    paired = _join_to_obs(
+        da_interped, target_da, da, df, time_match=time_match, tolerance=tolerance
+    )
+    if paired is None:
+        if time_match != "exact":
+            raise ValueError("`time_match` other than 'exact' needs data without levels")
+        da_interped_df = _interped_to_df(da_interped, target_da, da, df)
+        paired = df.reset_index(drop=True).merge(da_interped_df, on=["time", "siteid"], how="left")
+    return paired
+
+
+def combine_da_to_df(
+    da, df, *, merge=True, method="nearest", time_match="exact", tolerance=None, **kwargs
+):
+    """Combine xarray data array `da` with spatial information
+    point observations in dataframe `df`, returning a new dataframe.
+
+    Uses pyresample via ``.monet.remap_nearest``, or interpolation weights
+    computed once per site (:class:`~monet.util.resample.WeightedRemapPlan`).
+
+    Parameters
+    ----------
+    da : xarray.DataArray or xarray.Dataset
+        Data to be interpolated to target grid points.
+        Can be unstructured-grid data
+        (detected by checking ``'mio_has_unstructured_grid'`` attribute).
+    df : pandas.DataFrame
+        Data on target points.
+    merge : bool
+        Merge interpolated `df` data with `da` data.
+        Otherwise, return interpolated `da` data only.
+    method : {'nearest', 'bilinear', 'idw', 'gaussian'}
+        Pairing method (ignored for unstructured-grid data).
+    time_match : {'exact', 'nearest', 'linear'}
+        How obs times are matched to model times when merging:
+        equal times only, the closest model time (within `tolerance`),
+        or linear interpolation between the bracketing model times.
+        Obs rows that cannot be matched get NaN.
+    tolerance : str or pandas.Timedelta, optional
+        Largest allowed time difference for ``time_match='nearest'``.
+    kwargs : dict
+        Passed to :meth:`~monet.monet_accessor.MONETAccessor.remap_nearest`
+        for ``method='nearest'``, else to
+        :meth:`~monet.util.resample.WeightedRemapPlan.from_data`
+        (if `da` is not unstructured-grid data).
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    See Also
+    --------
+    combine_da_to_df_chunks : the same pairing, one block of model times at a time.
+    """
+    target_da, da_interped = _remap_da_to_sites(da, df, method=method, **kwargs)
+    return _pair_remapped(
+        da_interped.compute(), target_da, da, df, merge, time_match=time_match, tolerance=tolerance
+    )
+
+
+def combine_da_to_df_chunks(
+    da, df, *, time_chunk=24, merge=True, time_match="exact", tolerance=None, **kwargs
+):
+    """Pair `da` with the point observations in `df` one block of model
+    times at a time, yielding a dataframe per block.
+
+    The remapping to the sites is set up once (lazily); each block of
+    `time_chunk` model times is then computed and merged with the
+    observation rows that fall in that block, so peak memory is bounded
+    by the block size instead of the length of the run.
+    Concatenating the yielded frames gives the same rows as
+    :func:`combine_da_to_df` (grouped by block).
+
+    Parameters
+    ----------
+    da : xarray.DataArray or xarray.Dataset
+        Data to be interpolated to target grid points, with a sorted
+        ``time`` dimension. Best opened with dask chunks along ``time``.
+    df : pandas.DataFrame
+        Data on target points.
+    time_chunk : int
+        Number of model times per block.
+    merge : bool
+        Merge interpolated `df` data with `da` data.
+        Otherwise, yield interpolated `da` data only.
+    time_match : {'exact', 'nearest', 'linear'}
+        How obs times are matched to model times, see :func:`combine_da_to_df`.
+        For ``'nearest'`` and ``'linear'`` each block also computes the first
+        model time of the next block, so obs times between two blocks are
+        matched as in :func:`combine_da_to_df`.
+    tolerance : str or pandas.Timedelta, optional
+        Largest allowed time difference for ``time_match='nearest'``.
+    kwargs : dict
+        Passed on to the remapping (``method=`` and e.g. ``plan=``),
+        see :func:`combine_da_to_df`.
+
+    Yields
+    ------
+    pandas.DataFrame
+    """
+    import numpy as np
+
+    if time_match not in {"exact", "nearest", "linear"}:
+        raise ValueError("`time_match` must be 'exact', 'nearest' or 'linear'")
+    target_da, da_interped = _remap_da_to_sites(da, df, **kwargs)
+    if "time" not in da_interped.dims:
+        # nothing to split: pair the remapped data as a whole
+        yield _pair_remapped(da_interped.compute(), target_da, da, df, merge, time_match, tolerance)
+        return
+    ntime = da_interped.sizes["time"]
+    starts = np.arange(0, ntime, time_chunk)
+
     if merge:
-        df.reset_index(drop=True)
-        da_interped_df.reset_index(drop=True)
-        final_df = df.merge(da_interped_df, on=["time", "siteid"], how="left")
-        return final_df
+        # assign every obs row to one block (rows outside the model times
+        # go to the first/last block) and sort once so each block is a slice
+        block_start_times = da_interped["time"].values[starts]
+        obs_times = df["time"].values.astype(block_start_times.dtype)
+        block = np.searchsorted(block_start_times, obs_times, side="right") - 1
+        block = np.clip(block, 0, len(starts) - 1)
+        order = np.argsort(block, kind="stable")
+        bounds = np.searchsorted(block[order], np.arange(len(starts) + 1))
+
+    # the next block's first time brackets the obs at the end of a block
+    overlap = 0 if time_match == "exact" else 1
+    for i, start in enumerate(starts):
+        if merge:
+            chunk = da_interped.isel(time=slice(start, start + time_chunk + overlap)).compute()
+            obs = df.iloc[order[bounds[i] : bounds[i + 1]]]
+            yield _pair_remapped(chunk, target_da, da, obs, True, time_match, tolerance)
+        else:
+            chunk = da_interped.isel(time=slice(start, start + time_chunk)).compute()
+            yield _interped_to_df(chunk, target_da, da, df)
+
+
+def write_combine_da_to_df(da, df, path, *, fmt="parquet", time_chunk=24, **kwargs):
+    """Pair `da` with the point observations in `df` block by block
+    (see :func:`combine_da_to_df_chunks`), writing each block to its own
+    file in directory `path` as it is computed.
+
+    Parameters
+    ----------
+    da : xarray.DataArray or xarray.Dataset
+        Data to be interpolated to target grid points.
+    df : pandas.DataFrame
+        Data on target points.
+    path : str or path-like
+        Output directory (created if needed). The parts can be read back with
+        ``pandas.read_parquet(path)`` or
+        ``xarray.open_mfdataset(f"{path}/*.nc", combine="nested", concat_dim="index")``.
+    fmt : {'parquet', 'netcdf'}
+        Output format. Parquet requires ``pyarrow`` (or ``fastparquet``).
+    time_chunk : int
+        Number of model times per block/file.
+    kwargs : dict
+        Passed on to :func:`combine_da_to_df_chunks`.
+
+    Returns
+    -------
+    list of pathlib.Path
+        The files written, in order.
+    """
+    from pathlib import Path
+
+    if fmt not in {"parquet", "netcdf"}:
+        raise ValueError("`fmt` must be 'parquet' or 'netcdf'")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i, part in enumerate(combine_da_to_df_chunks(da, df, time_chunk=time_chunk, **kwargs)):
+        files.append(_write_part(part, path, i, fmt))
+    return files
+
+
+def _write_part(part, path, i, fmt):
+    """Write one paired block as ``part-<i>.parquet`` or ``part-<i>.nc`` in `path`."""
+    part = part.reset_index(drop=True)
+    if fmt == "parquet":
+        fname = path / f"part-{i:05d}.parquet"
+        part.to_parquet(fname)
+    else:
+        fname = path / f"part-{i:05d}.nc"
+        part.to_xarray().to_netcdf(fname)
+    return fname
+
+
+def _process_pool(max_workers):
+    """Process pool whose workers are spawned, not forked: forked workers
+    can deadlock on locks or threads held by the parent (HDF5, dask, numba)."""
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"))
+
+
+def _pair_file(fname, sites, obs, plan, opener, open_kwargs, variables, join_kwargs, out):
+    """Pair the model file `fname` with the obs rows `obs` (worker for
+    :func:`combine_files_to_df`)."""
+    with opener(fname, **open_kwargs) as da:
+        if variables is not None:
+            da = da[variables]
+        target_da, da_interped = _remap_da_to_sites(da, sites, plan=plan)
+        paired = _pair_remapped(da_interped.compute(), target_da, da, obs, True, **join_kwargs)
+    if out is not None:
+        return _write_part(paired, *out)
+    return paired
+
+
+def combine_files_to_df(
+    files,
+    df,
+    *,
+    opener=None,
+    open_kwargs=None,
+    variables=None,
+    radius_of_influence=1e6,
+    max_workers=None,
+    ordered=True,
+    path=None,
+    fmt="parquet",
+    time_match="exact",
+    tolerance=None,
+):
+    """Pair a model run stored as many files (e.g. one per day) with the
+    point observations in `df`, one file per worker process.
+
+    The nearest-neighbor index from the model grid to the sites is computed
+    once (:class:`~monet.util.resample.NearestRemapPlan`) and shared by all
+    workers, so every file must be on the same grid. Each obs row is paired
+    with exactly one file: the last file starting at or before its time
+    (rows before the first file go to the first file).
+
+    Parameters
+    ----------
+    files : str or list of str
+        Glob pattern or list of model files.
+    df : pandas.DataFrame
+        Data on target points, with ``time``, ``siteid``, ``latitude``
+        and ``longitude`` columns.
+    opener : callable, optional
+        ``opener(fname, **open_kwargs)`` returns the model data of one file
+        (with ``latitude``/``longitude`` coordinates and a ``time`` dimension),
+        usable as a context manager (closed once the file is paired).
+        Must be picklable (a module-level function).
+        Defaults to :func:`xarray.open_dataset`.
+    open_kwargs : dict, optional
+        Passed on to `opener`.
+    variables : list of str, optional
+        Only pair these variables.
+    radius_of_influence : float
+        Radius of influence (meters), used by ``pyresample.kd_tree``.
+    max_workers : int, optional
+        Size of the process pool; ``1`` pairs the files in this process.
+    ordered : bool
+        Return the pairs in file order (deterministic). Otherwise
+        in the order the workers finish.
+    path : str or path-like, optional
+        If given, write each file's pairs to ``part-<i>.parquet`` (or ``.nc``)
+        in this directory (``i`` is the file's position in time order)
+        instead of concatenating them.
+    fmt : {'parquet', 'netcdf'}
+        Output format when `path` is given.
+    time_match : {'exact', 'nearest', 'linear'}
+        How obs times are matched to model times, see :func:`combine_da_to_df`.
+        Each obs row only sees the times of its own file, so rows after the
+        last time of a file are not matched to the next file.
+    tolerance : str or pandas.Timedelta, optional
+        Largest allowed time difference for ``time_match='nearest'``.
+
+    Returns
+    -------
+    pandas.DataFrame or list of pathlib.Path
+    """
+    from concurrent.futures import as_completed
+    from glob import glob
+    from pathlib import Path
+
+    import numpy as np
+    from pandas import concat
+
+    from .resample import NearestRemapPlan
+
+    if isinstance(files, (str, Path)):
+        files = sorted(glob(str(files)))
+    files = list(files)
+    if len(files) == 0:
+        raise ValueError("no model files to pair")
+    if opener is None:
+        opener = xr.open_dataset
+    open_kwargs = {} if open_kwargs is None else open_kwargs
+    if time_match not in {"exact", "nearest", "linear"}:
+        raise ValueError("`time_match` must be 'exact', 'nearest' or 'linear'")
+    join_kwargs = {"time_match": time_match, "tolerance": tolerance}
+    if path is not None:
+        if fmt not in {"parquet", "netcdf"}:
+            raise ValueError("`fmt` must be 'parquet' or 'netcdf'")
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+    sites = df.drop_duplicates(subset=["siteid"]).dropna(
+        subset=["latitude", "longitude", "siteid"]
+    )[["siteid", "latitude", "longitude"]]
+
+    # file start times (metadata only) and the neighbor index, once
+    starts = []
+    for i, fname in enumerate(files):
+        with opener(fname, **open_kwargs) as ds:
+            if i == 0:
+                plan = NearestRemapPlan.from_data(
+                    ds, sites.monet._df_to_da(), radius_of_influence=radius_of_influence
+                )
+            starts.append(ds["time"].values.min())
+    starts = np.asarray(starts)
+    file_order = np.argsort(starts, kind="stable")
+    files = [files[i] for i in file_order]
+    starts = starts[file_order]
+
+    obs_times = df["time"].values.astype(starts.dtype)
+    block = np.clip(np.searchsorted(starts, obs_times, side="right") - 1, 0, len(files) - 1)
+    order = np.argsort(block, kind="stable")
+    bounds = np.searchsorted(block[order], np.arange(len(files) + 1))
+    tasks = [
+        (
+            fname,
+            sites,
+            df.iloc[order[bounds[i] : bounds[i + 1]]],
+            plan,
+            opener,
+            open_kwargs,
+            variables,
+            join_kwargs,
+            None if path is None else (path, i, fmt),
+        )
+        for i, fname in enumerate(files)
+    ]
+
+    if max_workers == 1:
+        results = [_pair_file(*task) for task in tasks]
     else:
-        return da_interped_df
+        with _process_pool(max_workers) as pool:
+            futures = [pool.submit(_pair_file, *task) for task in tasks]
+            if ordered:
+                results = [f.result() for f in futures]
+            else:
+                results = [f.result() for f in as_completed(futures)]
+    if path is not None:
+        return results
+    return concat(results, ignore_index=True)
 
 
 def combine_da_to_da(source, target, *, merge=True, interp_time=False, **kwargs):
@@ -0,0 +1,1121 @@
+"""Fused evaluation statistics.
+
+The metrics of :mod:`monet.util.stats` are computed from a small set of
+sufficient statistics (counts, means, centered second moments and sums of
+absolute, normalized and wind-direction errors) accumulated in one
+blocked pass over the paired data, instead of one pass (and a set of
+temporaries) per metric.
+
+Metrics whose terms depend on the observation mean (``IOA``, ``d1``,
+``E1``, ``WDIOA``, ``WDAC``) need a second pass once the mean is known,
+and median-based metrics keep the values they need; both are only done
+if such a metric is requested.
+"""
+
+import functools
+
+import numpy as np
+
+from .stats import circlebias_m as _circlebias
+
+#: sums of elementwise terms; non-finite terms (e.g. division by zero) are skipped
+_SUMS = {
+    "sdd": lambda o, m: (m - o) ** 2,
+    "sad": lambda o, m: np.abs(m - o),
+    "snb": lambda o, m: (m - o) / o,
+    "sne": lambda o, m: np.abs(m - o) / o,
+    "sfb": lambda o, m: (m - o) / (m + o),
+    "sfe": lambda o, m: np.abs(m - o) / (m + o),
+    "srm": lambda o, m: o / m,
+    "scb": lambda o, m: _circlebias(m - o),
+    "sacb": lambda o, m: np.abs(_circlebias(m - o)),
+    "scbb": lambda o, m: _circlebias(m - o) ** 2,
+}
+
+#: number of finite terms, for the sums that can skip pairs
+_COUNTS = {"snb": "nnb", "sne": "nnb", "sfb": "nfb", "sfe": "nfb", "srm": "nrm"}
+
+_MAXES = {
+    "omax": lambda o, m: o,
+    "mmax": lambda o, m: m,
+}
+
+#: sums of terms centered on the observation mean ``c`` (second pass)
+_CENTERED = {
+    "sioa": lambda o, m, c: (np.abs(m - c) + np.abs(o - c)) ** 2,
+    "sd1": lambda o, m, c: np.abs(m - c) + np.abs(o - c),
+    "se1": lambda o, m, c: np.abs(o - c),
+    "swioa": lambda o, m, c: (np.abs(_circlebias(m - c)) + np.abs(_circlebias(o - c))) ** 2,
+    "swac": lambda o, m, c: _circlebias(m - c) * _circlebias(o - c),
+    "swacm": lambda o, m, c: _circlebias(m - c) ** 2,
+    "swaco": lambda o, m, c: _circlebias(o - c) ** 2,
+}
+
+_MEDIANS = {
+    "mdno": lambda o, m: o,
+    "mdnp": lambda o, m: m,
+    "mdnb": lambda o, m: m - o,
+    "mdne": lambda o, m: np.abs(m - o),
+    "mdnnb": lambda o, m: (m - o) / o,
+    "mdnne": lambda o, m: np.abs(m - o) / o,
+    "mdnrm": lambda o, m: o / m,
+    "mdnwb": lambda o, m: _circlebias(m - o),
+    "mdnwe": lambda o, m: np.abs(_circlebias(m - o)),
+}
+
+
+def _slope(s):
+    return s["com"] / s["coo"]
+
+
+def _rmses(s):
+    a = _slope(s)
+    return np.sqrt((a - 1) ** 2 * s["coo"] / s["n"] + (s["mm"] - s["mo"]) ** 2)
+
+
+def _ac(s):
+    return s["com"] / np.sqrt((s["cmm"] + s["n"] * (s["mm"] - s["mo"]) ** 2) * s["coo"])
+
+
+# name: (statistics needed besides the moments, function of the statistics)
+_METRICS = {
+    "STDO": ((), lambda s: np.sqrt(s["coo"] / s["n"])),
+    "STDP": ((), lambda s: np.sqrt(s["cmm"] / s["n"])),
+    "MNB": (("snb", "nnb"), lambda s: s["snb"] / s["nnb"] * 100.0),
+    "MNE": (("sne", "nnb"), lambda s: s["sne"] / s["nnb"] * 100.0),
+    "MdnNB": (("mdnnb",), lambda s: s["mdnnb"] * 100.0),
+    "MdnNE": (("mdnne",), lambda s: s["mdnne"] * 100.0),
+    "NMdnGE": (("sad",), lambda s: s["sad"] / s["n"] / s["mo"] * 100.0),
+    "NO": ((), lambda s: s["n"]),
+    "NOP": ((), lambda s: s["n"]),
+    "NP": ((), lambda s: s["n"]),
+    "MO": ((), lambda s: s["mo"]),
+    "MP": ((), lambda s: s["mm"]),
+    "MdnO": (("mdno",), lambda s: s["mdno"]),
+    "MdnP": (("mdnp",), lambda s: s["mdnp"]),
+    "RM": (("srm", "nrm"), lambda s: s["srm"] / s["nrm"]),
+    "RMdn": (("mdnrm",), lambda s: s["mdnrm"]),
+    "MB": ((), lambda s: s["mm"] - s["mo"]),
+    "MdnB": (("mdnb",), lambda s: s["mdnb"]),
+    "WDMB": (("scb",), lambda s: s["scb"] / s["n"]),
+    "WDMdnB": (("mdnwb",), lambda s: s["mdnwb"]),
+    "NMB": ((), lambda s: (s["mm"] - s["mo"]) / s["mo"] * 100.0),
+    "NMB_ABS": ((), lambda s: (s["mm"] - s["mo"]) / np.abs(s["mo"]) * 100.0),
+    "NMdnB": (("mdnb", "mdno"), lambda s: s["mdnb"] / s["mdno"] * 100.0),
+    "FB": (("sfb", "nfb"), lambda s: s["sfb"] / s["nfb"] * 2.0 * 100.0),
+    "ME": (("sad",), lambda s: s["sad"] / s["n"]),
+    "MdnE": (("mdne",), lambda s: s["mdne"]),
+    "WDME": (("sacb",), lambda s: s["sacb"] / s["n"]),
+    "WDMdnE": (("mdnwe",), lambda s: s["mdnwe"]),
+    "NME": (("sad",), lambda s: s["sad"] / (s["n"] * s["mo"]) * 100.0),
+    "NME_m_ABS": (("sad",), lambda s: s["sad"] / np.abs(s["n"] * s["mo"]) * 100.0),
+    "NMdnE": (("mdne", "mdno"), lambda s: s["mdne"] / s["mdno"] * 100.0),
+    "FE": (("sfe", "nfb"), lambda s: s["sfe"] / s["nfb"] * 2.0 * 100.0),
+    "USUTPB": (("omax", "mmax"), lambda s: (s["mmax"] - s["omax"]) / s["omax"] * 100.0),
+    "USUTPE": (
+        ("omax", "mmax"),
+        lambda s: np.abs(s["mmax"] - s["omax"]) / s["omax"] * 100.0,
+    ),
+    "R": ((), lambda s: s["com"] / np.sqrt(s["coo"] * s["cmm"])),
+    "R2": ((), lambda s: s["com"] ** 2 / (s["coo"] * s["cmm"])),
+    "RMSE": (("sdd",), lambda s: np.sqrt(s["sdd"] / s["n"])),
+    "WDRMSE": (("scbb",), lambda s: np.sqrt(s["scbb"] / s["n"])),
+    "RMSEs": ((), _rmses),
+    "RMSEu": ((), lambda s: np.sqrt((s["cmm"] - s["com"] ** 2 / s["coo"]) / s["n"])),
+    "d1": (("sad", "sd1"), lambda s: 1.0 - s["sad"] / s["sd1"]),
+    "E1": (("sad", "se1"), lambda s: 1.0 - s["sad"] / s["se1"]),
+    "IOA": (("sdd", "sioa"), lambda s: 1.0 - s["sdd"] / s["sioa"]),
+    "WDIOA": (("scbb", "swioa"), lambda s: 1.0 - s["scbb"] / s["swioa"]),
+    "AC": ((), _ac),
+    "WDAC": (
+        ("swac", "swacm", "swaco"),
+        lambda s: s["swac"] / np.sqrt(s["swacm"] * s["swaco"]),
+    ),
+}
+
+#: names of the metrics :func:`compute_stats` knows
+METRICS = tuple(_METRICS)
+
+
+def _required(metrics):
+    """Split the statistics needed for `metrics` by kind."""
+    if metrics is None:
+        metrics = METRICS
+    elif isinstance(metrics, str):
+        metrics = [metrics]
+    unknown = [name for name in metrics if name not in _METRICS]
+    if unknown:
+        raise ValueError(f"unknown metrics {unknown}, choose from {list(METRICS)}")
+    keys = {k for name in metrics for k in _METRICS[name][0]}
+    return (
+        list(metrics),
+        [k for k in _SUMS if k in keys],
+        [k for k in _MAXES if k in keys],
+        [k for k in _CENTERED if k in keys],
+        [k for k in _MEDIANS if k in keys],
+    )
+
+
+def _as_float(obs, mod):
+    """Broadcast float views of `obs` and `mod` (masked values as NaN).
+
+    Float ndarrays are not copied.
+    """
+    o = np.ma.filled(np.ma.asarray(obs, dtype=float), np.nan)
+    m = np.ma.filled(np.ma.asarray(mod, dtype=float), np.nan)
+    return np.broadcast_arrays(o, m)
+
+
+def _mask_pair(o, m):
+    """Copies of `o` and `m` with NaN wherever either is missing."""
+    valid = np.isfinite(o) & np.isfinite(m)
+    return np.where(valid, o, np.nan), np.where(valid, m, np.nan)
+
+
+def _as_pair(obs, mod):
+    """Float arrays of `obs` and `mod` with NaN wherever either is missing."""
+    return _mask_pair(*_as_float(obs, mod))
+
+
+def _expand(x, axis):
+    return x if axis is None else np.expand_dims(x, axis)
+
+
+def _block_stats(o, m, sums=(), maxes=(), medians=(), axis=None):
+    """Moments and the requested sums/maxima/medians of one block of pairs
+    (``o``, ``m`` from :func:`_as_pair`), reduced over `axis`.
+
+    Empty reductions have ``n = 0`` and zero means.
+    """
+    s = {}
+    valid = np.isfinite(o)
+    n = valid.sum(axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mo = np.where(n > 0, np.nansum(o, axis=axis) / n, 0.0)
+        mm = np.where(n > 0, np.nansum(m, axis=axis) / n, 0.0)
+    do = o - _expand(mo, axis)
+    dm = m - _expand(mm, axis)
+    s["n"] = n
+    s["mo"] = mo
+    s["mm"] = mm
+    s["coo"] = np.nansum(do * do, axis=axis)
+    s["cmm"] = np.nansum(dm * dm, axis=axis)
+    s["com"] = np.nansum(do * dm, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in sums:
+            t = _SUMS[k](o, m)
+            finite = np.isfinite(t)
+            s[k] = np.where(finite, t, 0.0).sum(axis=axis)
+            if k in _COUNTS:
+                s[_COUNTS[k]] = finite.sum(axis=axis)
+        for k in maxes:
+            s[k] = np.where(valid, _MAXES[k](o, m), -np.inf).max(axis=axis)
+        for k in medians:
+            t = _MEDIANS[k](o, m)
+            s[k] = np.nanmedian(np.where(np.isfinite(t), t, np.nan), axis=axis)
+    return s
+
+
+def _centered_stats(o, m, center, keys, axis=None):
+    """Sums of the `keys` terms of :data:`_CENTERED` around `center`."""
+    c = _expand(center, axis)
+    s = {}
+    with np.errstate(invalid="ignore"):
+        for k in keys:
+            s[k] = np.nansum(_CENTERED[k](o, m, c), axis=axis)
+    return s
+
+
+def _merge_stats(a, b):
+    """Combine the statistics of two disjoint sets of pairs.
+
+    Means and centered moments are merged with the pairwise update of
+    Chan et al. (1979); sums and counts add and maxima take the larger.
+    Medians cannot be merged and are dropped.
+    """
+    na, nb = a["n"], b["n"]
+    n = na + nb
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fb = np.where(n > 0, nb / n, 0.0)
+        w = np.where(n > 0, na * nb / n, 0.0)
+    do = b["mo"] - a["mo"]
+    dm = b["mm"] - a["mm"]
+    s = {
+        "n": n,
+        "mo": a["mo"] + do * fb,
+        "mm": a["mm"] + dm * fb,
+        "coo": a["coo"] + b["coo"] + do * do * w,
+        "cmm": a["cmm"] + b["cmm"] + dm * dm * w,
+        "com": a["com"] + b["com"] + do * dm * w,
+    }
+    for k in a:
+        if k in s or k in _MEDIANS or k not in b:
+            continue
+        s[k] = np.maximum(a[k], b[k]) if k in _MAXES else a[k] + b[k]
+    return s
+
+
+def sufficient_stats(obs, mod, metrics=None, axis=None, block_size=2**20):
+    """Accumulate the sufficient statistics for `metrics`.
+
+    Pairs where either `obs` or `mod` is masked or NaN are skipped.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values (masked arrays are accepted).
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+    axis : int, optional
+        Reduce along this axis only; by default over all values, in blocks
+        of `block_size` pairs to bound the size of the temporaries (float
+        inputs are masked block by block, never copied whole).
+    block_size : int
+        Number of pairs per block when `axis` is None.
+
+    Returns
+    -------
+    dict
+        Statistic name to value (array if `axis` is given), for
+        :func:`stats_from_sufficient`.
+    """
+    metrics, sums, maxes, centered, medians = _required(metrics)
+    if axis is not None:
+        o, m = _as_pair(obs, mod)
+        s = _block_stats(o, m, sums, maxes, medians, axis=axis)
+        if centered:
+            s.update(_centered_stats(o, m, s["mo"], centered, axis=axis))
+        return s
+
+    # only the current block is masked, so float inputs are never copied whole
+    o, m = (x.ravel() for x in _as_float(obs, mod))
+    blocks = [slice(i, i + block_size) for i in range(0, max(o.size, 1), block_size)]
+    s = None
+    values = {k: [] for k in medians}
+    for b in blocks:
+        ob, mb = _mask_pair(o[b], m[b])
+        bs = _block_stats(ob, mb, sums, maxes, axis=None)
+        s = bs if s is None else _merge_stats(s, bs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k in medians:
+                t = _MEDIANS[k](ob, mb)
+                values[k].append(t[np.isfinite(t)])
+    for k in medians:
+        t = np.concatenate(values[k])
+        s[k] = np.median(t) if t.size else np.nan
+    if centered:
+        c = {k: 0.0 for k in centered}
+        for b in blocks:
+            bc = _centered_stats(*_mask_pair(o[b], m[b]), s["mo"], centered)
+            c = {k: c[k] + bc[k] for k in centered}
+        s.update(c)
+    return s
+
+
+def stats_from_sufficient(s, metrics=None):
+    """Finalize `metrics` from the statistics of :func:`sufficient_stats`.
+
+    Parameters
+    ----------
+    s : dict
+        Sufficient statistics.
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+
+    Returns
+    -------
+    dict
+        Metric name to value.
+    """
+    metrics = _required(metrics)[0]
+    s = dict(s)
+    empty = s["n"] == 0
+    s["mo"] = np.where(empty, np.nan, s["mo"])
+    s["mm"] = np.where(empty, np.nan, s["mm"])
+    for k in _MAXES:
+        if k in s:
+            s[k] = np.where(empty, np.nan, s[k])
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name in metrics:
+            value = _METRICS[name][1](s)
+            out[name] = value[()] if isinstance(value, np.ndarray) else value
+    return out
+
+
+def compute_stats(obs, mod, metrics=None, axis=None):
+    """Compute several evaluation metrics in one pass over the data.
+
+    Gives the same values as the functions of the same name in
+    :mod:`monet.util.stats` (for paired data), e.g.
+    ``compute_stats(obs, mod, ["MB", "RMSE", "IOA"])``.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values (masked arrays are accepted).
+        Pairs where either is masked or NaN are skipped.
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+    axis : int, optional
+        Compute along this axis only.
+
+    Returns
+    -------
+    dict
+        Metric name to value (array if `axis` is given).
+    """
+    return stats_from_sufficient(sufficient_stats(obs, mod, metrics, axis=axis), metrics)
+
+
+def _group_codes(groups):
+    """Combine one or more group key arrays into dense codes.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        Flat group code per pair (-1 where a key is missing).
+    labels : list of numpy.ndarray
+        Key values of each group code, one array per key.
+    names : list of str
+    """
+    from pandas import factorize
+
+    if not isinstance(groups, (list, tuple)):
+        groups = [groups]
+    names = []
+    codes = []
+    uniques = []
+    for i, g in enumerate(groups):
+        name = getattr(g, "name", None)
+        names.append(name if name is not None else ("group" if len(groups) == 1 else f"group{i}"))
+        g = np.asarray(g).ravel()
+        if np.issubdtype(g.dtype, np.integer) and g.size and g.min() >= 0:
+            # integer codes: use as they are
+            u, c = np.unique(g, return_inverse=True)
+        else:
+            c, u = factorize(g, sort=True)
+        codes.append(np.asarray(c, dtype=np.int64))
+        uniques.append(np.asarray(u))
+    shape = tuple(len(u) for u in uniques)
+    missing = np.any([c < 0 for c in codes], axis=0)
+    flat = np.ravel_multi_index([np.where(missing, 0, c) for c in codes], shape)
+    flat[missing] = -1
+    observed, flat[~missing] = np.unique(flat[~missing], return_inverse=True)
+    labels = [u[i] for u, i in zip(uniques, np.unravel_index(observed, shape))]
+    return flat, labels, names
+
+
+def _grouped_medians(t, seg, starts):
+    """Median of the finite values of `t` in each contiguous segment."""
+    t = np.where(np.isfinite(t), t, np.inf)
+    t = t[np.lexsort((t, seg))]
+    k = np.add.reduceat(np.isfinite(t).astype(np.intp), starts)
+    lo = starts + np.maximum(k - 1, 0) // 2
+    hi = starts + k // 2
+    with np.errstate(invalid="ignore"):
+        return np.where(k > 0, 0.5 * (t[lo] + t[hi]), np.nan)
+
+
+def grouped_sufficient_stats(obs, mod, codes, ngroups, metrics=None):
+    """Sufficient statistics for `metrics` of every group at once.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values.
+    codes : numpy.ndarray of int
+        Group code (``0 <= code < ngroups``) of each pair, -1 to skip the pair.
+    ngroups : int
+        Number of groups.
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+
+    Returns
+    -------
+    dict
+        Statistic name to array of length `ngroups`, for
+        :func:`stats_from_sufficient`.
+    """
+    metrics, sums, maxes, centered, medians = _required(metrics)
+    o, m = _as_pair(obs, mod)
+    o, m = o.ravel(), m.ravel()
+    codes = np.asarray(codes).ravel()
+    keep = np.isfinite(o) & (codes >= 0)
+    o, m, codes = o[keep], m[keep], codes[keep]
+
+    # sort once so that every group is a contiguous segment
+    order = np.argsort(codes, kind="stable")
+    o, m, gid = o[order], m[order], codes[order]
+    n = np.bincount(gid, minlength=ngroups)
+    present = np.flatnonzero(n)
+    starts = np.concatenate([[0], np.cumsum(n[present])[:-1]]).astype(np.intp)
+    seg = np.repeat(np.arange(len(present)), n[present])
+
+    def segsum(t):
+        out = np.zeros(ngroups)
+        if len(present):
+            out[present] = np.add.reduceat(t, starts)
+        return out
+
+    s = {"n": n}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s["mo"] = np.where(n > 0, segsum(o) / n, 0.0)
+        s["mm"] = np.where(n > 0, segsum(m) / n, 0.0)
+        do = o - s["mo"][gid]
+        dm = m - s["mm"][gid]
+        s["coo"] = segsum(do * do)
+        s["cmm"] = segsum(dm * dm)
+        s["com"] = segsum(do * dm)
+        for k in sums:
+            t = _SUMS[k](o, m)
+            finite = np.isfinite(t)
+            s[k] = segsum(np.where(finite, t, 0.0))
+            if k in _COUNTS:
+                s[_COUNTS[k]] = segsum(finite.astype(float))
+        for k in maxes:
+            s[k] = np.full(ngroups, -np.inf)
+            if len(present):
+                s[k][present] = np.maximum.reduceat(_MAXES[k](o, m), starts)
+        for k in medians:
+            s[k] = np.full(ngroups, np.nan)
+            if len(present):
+                s[k][present] = _grouped_medians(_MEDIANS[k](o, m), seg, starts)
+        for k in centered:
+            s[k] = segsum(_CENTERED[k](o, m, s["mo"][gid]))
+    return s
+
+
+def grouped_stats(obs, mod, groups, metrics=None):
+    """Compute `metrics` for every group of pairs at once.
+
+    All groups are evaluated together with segment reductions over the
+    sorted pairs, instead of calling the metric functions once per group.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values.
+        Pairs where either is masked or NaN are skipped.
+    groups : array-like or list of array-like
+        Group key(s) of each pair, e.g. integer site codes, or
+        ``[df.siteid, df.time.dt.hour]`` for groups by site and hour.
+        Pairs with a missing key are skipped.
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per combination of keys present: the group key column(s)
+        (named after the keys if they are named Series), then one
+        column per metric.
+    """
+    from pandas import DataFrame
+
+    metrics = _required(metrics)[0]
+    codes, labels, names = _group_codes(groups)
+    ngroups = len(labels[0])
+    s = grouped_sufficient_stats(obs, mod, codes, ngroups, metrics)
+    out = DataFrame(dict(zip(names, labels)))
+    for name, value in stats_from_sufficient(s, metrics).items():
+        out[name] = value
+    return out
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a relative-error guarantee.
+
+    Values are counted in logarithmically spaced buckets
+    (DDSketch, Masson et al., 2019): a value ``x`` goes to bucket
+    ``ceil(log(|x|) / log(gamma))`` with ``gamma = (1 + a) / (1 - a)``,
+    ``a`` the relative accuracy. Any quantile returned is within a
+    relative error ``a`` of the exact value at that rank
+    (``|q_est - q| <= a * |q|``; values with ``|x| < min_value`` count
+    as 0). Sketches with the same accuracy merge exactly by adding the
+    bucket counts; memory grows with the log of the range of the values,
+    not with their number.
+
+    Parameters
+    ----------
+    relative_accuracy : float
+        Relative accuracy ``a`` (0.01 for 1%).
+    min_value : float
+        Smallest magnitude kept apart from zero.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-12):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("`relative_accuracy` must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._keys = {1: np.zeros(0, np.int64), -1: np.zeros(0, np.int64)}
+        self._counts = {1: np.zeros(0, np.int64), -1: np.zeros(0, np.int64)}
+        self.zero_count = 0
+        self.count = 0
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(relative_accuracy={self.relative_accuracy}, "
+            f"count={self.count})"
+        )
+
+    def _add(self, sign, keys, counts):
+        k = np.concatenate([self._keys[sign], keys])
+        c = np.concatenate([self._counts[sign], counts])
+        self._keys[sign], inv = np.unique(k, return_inverse=True)
+        self._counts[sign] = np.bincount(inv, weights=c).astype(np.int64)
+
+    def update(self, values):
+        """Add the finite `values`."""
+        v = np.asarray(values, dtype=float).ravel()
+        v = v[np.isfinite(v)]
+        self.count += v.size
+        self.zero_count += int((np.abs(v) < self.min_value).sum())
+        for sign, sel in ((1, v >= self.min_value), (-1, v <= -self.min_value)):
+            idx = np.ceil(np.log(np.abs(v[sel])) / np.log(self._gamma)).astype(np.int64)
+            self._add(sign, *np.unique(idx, return_counts=True))
+        return self
+
+    def merge(self, other):
+        """Add the counts of `other` (same accuracy) to this sketch."""
+        if (other.relative_accuracy, other.min_value) != (
+            self.relative_accuracy,
+            self.min_value,
+        ):
+            raise ValueError("can only merge sketches with the same accuracy")
+        for sign in (1, -1):
+            self._add(sign, other._keys[sign], other._counts[sign])
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def copy(self):
+        new = QuantileSketch(self.relative_accuracy, self.min_value)
+        return new.merge(self)
+
+    def quantile(self, q):
+        """Estimate the `q` quantile (0 <= q <= 1), interpolating linearly
+        between ranks like :func:`numpy.quantile`."""
+        if self.count == 0:
+            return np.nan
+        g = self._gamma
+        pos = 2 * g ** self._keys[1].astype(float) / (g + 1)
+        neg = -2 * g ** self._keys[-1][::-1].astype(float) / (g + 1)
+        values = np.concatenate([neg, [0.0], pos])
+        counts = np.concatenate([self._counts[-1][::-1], [self.zero_count], self._counts[1]])
+        cum = np.cumsum(counts)
+        rank = q * (self.count - 1)
+        lo, hi = np.floor(rank), np.ceil(rank)
+        v_lo = values[np.searchsorted(cum, lo, side="right")]
+        v_hi = values[np.searchsorted(cum, hi, side="right")]
+        return v_lo + (rank - lo) * (v_hi - v_lo)
+
+
+class StatsAccumulator:
+    """Streaming, mergeable accumulator for the metrics of :data:`METRICS`.
+
+    Feed it the data chunk by chunk with :meth:`update`; accumulators
+    filled in other processes (they pickle) combine with :meth:`merge`;
+    :meth:`finalize` computes the metrics. Means, centered moments, sums
+    and maxima merge exactly. Median-based metrics (``MdnB``, ``MdnE``,
+    ``NMdnB``, ``RMdn``, ...) use a :class:`QuantileSketch`, so they are
+    within `relative_accuracy` of the exact medians.
+
+    Metrics whose terms depend on the observation mean (``IOA``, ``d1``,
+    ``E1``, ``WDIOA``, ``WDAC``) need a second pass over the data once the
+    mean is known::
+
+        acc = StatsAccumulator(["MB", "RMSE", "IOA"])
+        for obs, mod in chunks():
+            acc.update(obs, mod)
+        acc = acc.second_pass()
+        for obs, mod in chunks():
+            acc.update(obs, mod)
+        acc.finalize()
+
+    Parameters
+    ----------
+    metrics : list of str, optional
+        Names from :data:`METRICS`; defaults to all.
+    relative_accuracy : float
+        Relative accuracy of the median sketches.
+    """
+
+    def __init__(self, metrics=None, relative_accuracy=0.01):
+        self.metrics, self._sums, self._maxes, self._centered, medians = _required(metrics)
+        self.relative_accuracy = relative_accuracy
+        self.obs_mean = None  # set for the second pass
+        self._stats = {k: 0.0 for k in ("n", "mo", "mm", "coo", "cmm", "com")}
+        self._stats["n"] = 0
+        for k in self._sums:
+            self._stats[k] = 0.0
+            if k in _COUNTS:
+                self._stats[_COUNTS[k]] = 0
+        for k in self._maxes:
+            self._stats[k] = -np.inf
+        self._centered_stats = {k: 0.0 for k in self._centered}
+        self._sketches = {k: QuantileSketch(relative_accuracy) for k in medians}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(n={self._stats['n']}, metrics={self.metrics})"
+
+    @property
+    def needs_second_pass(self):
+        """Whether :meth:`finalize` needs a :meth:`second_pass` first."""
+        return bool(self._centered) and self.obs_mean is None
+
+    def update(self, obs, mod):
+        """Accumulate a chunk of paired `obs` and `mod` (any shape)."""
+        o, m = _as_pair(obs, mod)
+        o, m = o.ravel(), m.ravel()
+        if self.obs_mean is not None:
+            c = _centered_stats(o, m, self.obs_mean, self._centered)
+            for k in self._centered:
+                self._centered_stats[k] += c[k]
+            return self
+        self._stats = _merge_stats(self._stats, _block_stats(o, m, self._sums, self._maxes))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k, sketch in self._sketches.items():
+                sketch.update(_MEDIANS[k](o, m))
+        return self
+
+    def merge(self, other):
+        """Combine with an accumulator of the same metrics filled with other data."""
+        if other.metrics != self.metrics or other.obs_mean != self.obs_mean:
+            raise ValueError("can only merge accumulators of the same metrics and pass")
+        if self.obs_mean is not None:
+            for k in self._centered:
+                self._centered_stats[k] += other._centered_stats[k]
+            return self
+        self._stats = _merge_stats(self._stats, other._stats)
+        for k, sketch in self._sketches.items():
+            sketch.merge(other._sketches[k])
+        return self
+
+    def second_pass(self):
+        """Start the second pass for the metrics centered on the obs mean.
+
+        Returns
+        -------
+        StatsAccumulator
+            Holding the statistics of this (first) pass; :meth:`update` it
+            with the same data again, then :meth:`finalize`.
+        """
+        if self.obs_mean is not None:
+            raise ValueError("already in the second pass")
+        new = StatsAccumulator.__new__(StatsAccumulator)
+        new.__dict__.update(self.__dict__)
+        new._stats = dict(self._stats)
+        new._sketches = {k: s.copy() for k, s in self._sketches.items()}
+        new._centered_stats = {k: 0.0 for k in self._centered}
+        new.obs_mean = float(self._stats["mo"]) if self._stats["n"] > 0 else np.nan
+        return new
+
+    def finalize(self):
+        """Compute the metrics.
+
+        Returns
+        -------
+        dict
+            Metric name to value.
+        """
+        if self.needs_second_pass:
+            raise ValueError(
+                f"{self._centered} need the obs mean: run a second pass over the data "
+                "(see StatsAccumulator.second_pass)"
+            )
+        s = dict(self._stats)
+        s.update(self._centered_stats)
+        for k, sketch in self._sketches.items():
+            s[k] = sketch.quantile(0.5)
+        return stats_from_sufficient(s, self.metrics)
+
+
+#: wind-direction metrics of :func:`wind_direction_stats`, in kernel output order
+WD_METRICS = ("WDMB", "WDME", "WDRMSE", "WDIOA", "WDAC")
+
+
+def _wd_rows(o, m, out):
+    """Wind-direction metrics of each row of the 2-D `o`, `m` into `out`.
+
+    Two loops per row (obs mean, then all the sums) and no temporaries;
+    the reference for the numba kernel of :mod:`monet.util._wd_kernel`.
+    """
+    for i in range(o.shape[0]):
+        n = 0
+        so = 0.0
+        for k in range(o.shape[1]):
+            if np.isfinite(o[i, k]) and np.isfinite(m[i, k]):
+                n += 1
+                so += o[i, k]
+        if n == 0:
+            for j in range(out.shape[1]):
+                out[i, j] = np.nan
+            continue
+        c = so / n
+        scb = sacb = scbb = swioa = swac = swacm = swaco = 0.0
+        for k in range(o.shape[1]):
+            ok = o[i, k]
+            mk = m[i, k]
+            if not (np.isfinite(ok) and np.isfinite(mk)):
+                continue
+            b = _cb(mk - ok)
+            bh = _cb(mk - c)
+            oh = _cb(ok - c)
+            scb += b
+            sacb += abs(b)
+            scbb += b * b
+            swioa += (abs(bh) + abs(oh)) ** 2
+            swac += bh * oh
+            swacm += bh * bh
+            swaco += oh * oh
+        out[i, 0] = scb / n
+        out[i, 1] = sacb / n
+        out[i, 2] = np.sqrt(scbb / n)
+        out[i, 3] = 1.0 - scbb / swioa if swioa > 0 else np.nan
+        out[i, 4] = swac / np.sqrt(swacm * swaco) if swacm * swaco > 0 else np.nan
+
+
+def _cb(b):
+    """Scalar :func:`~monet.util.stats.circlebias`."""
+    if b > 180:
+        b -= 360
+    if b < -180:
+        b += 360
+    return b
+
+
+@functools.lru_cache(maxsize=None)
+def _wd_rows_jit():
+    """:func:`_wd_rows` compiled with numba, or None if numba is not installed.
+
+    numba is imported on first use only, not with :mod:`monet`.
+    """
+    try:
+        from ._wd_kernel import _wd_rows as kernel
+    except ImportError:
+        return None
+    return kernel
+
+
+def wind_direction_stats(obs, mod, axis=None, engine="auto"):
+    """Compute all the wind-direction metrics (:data:`WD_METRICS`) at once.
+
+    Gives the values of :func:`~monet.util.stats.WDMB`,
+    :func:`~monet.util.stats.WDME`, :func:`~monet.util.stats.WDRMSE`,
+    :func:`~monet.util.stats.WDIOA` and :func:`~monet.util.stats.WDAC`
+    for paired data. With numba, one compiled loop (parallel over the
+    slices along `axis`) evaluates them without intermediate arrays;
+    otherwise the NumPy engine of :func:`compute_stats` is used.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Observed and modeled wind direction (degrees).
+        Pairs where either is masked or NaN are skipped.
+    axis : int, optional
+        Compute along this axis only.
+    engine : {'auto', 'numba', 'numpy'}
+        ``'auto'`` uses numba if it is installed.
+
+    Returns
+    -------
+    dict
+        Metric name to value (array if `axis` is given).
+    """
+    if engine not in {"auto", "numba", "numpy"}:
+        raise ValueError("`engine` must be 'auto', 'numba' or 'numpy'")
+    kernel = None if engine == "numpy" else _wd_rows_jit()
+    if engine == "numba" and kernel is None:
+        raise ImportError("engine='numba' requires numba")
+    if kernel is None:
+        return compute_stats(obs, mod, WD_METRICS, axis=axis)
+
+    o, m = _as_pair(obs, mod)
+    if axis is None:
+        o, m = o.reshape(1, -1), m.reshape(1, -1)
+        shape = ()
+    else:
+        o, m = np.moveaxis(o, axis, -1), np.moveaxis(m, axis, -1)
+        shape = o.shape[:-1]
+        o, m = o.reshape(-1, o.shape[-1]), m.reshape(-1, m.shape[-1])
+    out = np.empty((o.shape[0], len(WD_METRICS)))
+    kernel(np.ascontiguousarray(o), np.ascontiguousarray(m), out)
+    out = out.reshape(shape + (len(WD_METRICS),))
+    return {name: out[..., j][()] for j, name in enumerate(WD_METRICS)}
+
+
+def _raw_terms(o, m, sums, center):
+    """Per-pair terms whose sums give the statistics of :func:`_stats_from_raw`.
+
+    The moments are taken about `center` (obs, mod) to keep the
+    conversion to centered moments accurate.
+    """
+    do = o - center[0]
+    dm = m - center[1]
+    cols = [np.ones_like(o), do, dm, do * do, dm * dm, do * dm]
+    keys = ["n", "so", "sm", "soo", "smm", "som"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in sums:
+            t = _SUMS[k](o, m)
+            finite = np.isfinite(t)
+            cols.append(np.where(finite, t, 0.0))
+            keys.append(k)
+            if k in _COUNTS and _COUNTS[k] not in keys:
+                cols.append(finite.astype(float))
+                keys.append(_COUNTS[k])
+    return np.stack(cols, axis=-1), keys
+
+
+def _stats_from_raw(t, keys, center):
+    """Sufficient statistics from sums of :func:`_raw_terms` (last axis)."""
+    r = {k: t[..., i] for i, k in enumerate(keys)}
+    n = r["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = {
+            "n": n,
+            "mo": center[0] + r["so"] / n,
+            "mm": center[1] + r["sm"] / n,
+            "coo": r["soo"] - r["so"] ** 2 / n,
+            "cmm": r["smm"] - r["sm"] ** 2 / n,
+            "com": r["som"] - r["so"] * r["sm"] / n,
+        }
+    s.update({k: r[k] for k in keys[6:]})
+    return s
+
+
+def _bootstrap_replicates(prefix, n, block_length, nrep, seed):
+    """Summed terms of `nrep` moving-block bootstrap resamples of `n` pairs.
+
+    `prefix` holds the cumulative sums of the per-pair terms (with a leading
+    row of zeros), so each block costs one subtraction instead of a sum.
+    """
+    rng = np.random.default_rng(seed)
+    nblocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(nrep, nblocks))
+    lengths = np.full(nblocks, block_length)
+    lengths[-1] = n - block_length * (nblocks - 1)
+    return prefix[starts + lengths].sum(axis=1) - prefix[starts].sum(axis=1)
+
+
+def _interval(estimate, reps, jack, ci, method):
+    """Percentile or BCa interval of the bootstrap replicates `reps`."""
+    from scipy.stats import norm
+
+    reps = reps[np.isfinite(reps)]
+    if reps.size == 0 or not np.isfinite(estimate):
+        return np.nan, np.nan
+    alpha = np.array([(1 - ci) / 2, (1 + ci) / 2])
+    if method == "bca":
+        z0 = norm.ppf(np.mean(reps < estimate))
+        d = np.nanmean(jack) - jack
+        d = d[np.isfinite(d)]
+        denom = 6.0 * np.sum(d**2) ** 1.5
+        accel = np.sum(d**3) / denom if denom > 0 else 0.0
+        z = norm.ppf(alpha)
+        alpha = norm.cdf(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+        if not np.all(np.isfinite(alpha)):
+            return np.nan, np.nan
+    lower, upper = np.quantile(reps, alpha)
+    return lower, upper
+
+
+def bootstrap_ci(
+    obs,
+    mod,
+    metrics=("NMB", "NME", "R", "RMSE"),
+    groups=None,
+    n_boot=1000,
+    block_length=1,
+    ci=0.95,
+    method="percentile",
+    seed=None,
+    max_workers=1,
+):
+    """Bootstrap confidence intervals of metrics, optionally per group.
+
+    The pairs are reduced once to cumulative sums of their sufficient
+    statistic terms, so a (moving-block) resample costs one gather per
+    block and the metrics of all replicates are finalized together.
+
+    Parameters
+    ----------
+    obs, mod : array-like
+        Paired observations and model values, in time order within each
+        group. Pairs where either is masked or NaN are dropped first.
+    metrics : list of str
+        Names from :data:`METRICS` that depend only on sums (not
+        ``IOA``-like, median or peak metrics).
+    groups : array-like or list of array-like, optional
+        Group key(s) of each pair (see :func:`grouped_stats`),
+        e.g. sites or regions.
+    n_boot : int
+        Number of bootstrap replicates.
+    block_length : int
+        Length of the moving blocks; use more than 1 for autocorrelated
+        series (e.g. 24 for hourly data). 1 is the ordinary bootstrap.
+    ci : float
+        Confidence level.
+    method : {'percentile', 'bca'}
+        Percentile interval, or bias-corrected and accelerated interval
+        (acceleration from a delete-one-block jackknife).
+    seed : int, optional
+        Seed; the results do not depend on `max_workers`.
+    max_workers : int, optional
+        Process pool size for the replicates; 1 (default) runs them here.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (group and) metric: the group key column(s),
+        ``metric``, ``estimate``, ``lower`` and ``upper``.
+    """
+    from pandas import DataFrame
+
+    from .combinetool import _process_pool
+
+    metrics, sums, maxes, centered, medians = _required(metrics)
+    if maxes or centered or medians:
+        raise ValueError("bootstrap_ci only supports metrics computed from sums")
+    if method not in {"percentile", "bca"}:
+        raise ValueError("`method` must be 'percentile' or 'bca'")
+    o, m = _as_pair(obs, mod)
+    o, m = o.ravel(), m.ravel()
+    if groups is None:
+        codes, labels, names = np.zeros(o.size, dtype=np.int64), [], []
+        ngroups = 1
+    else:
+        codes, labels, names = _group_codes(groups)
+        ngroups = len(labels[0])
+    keep = np.isfinite(o) & (codes >= 0)
+    o, m, codes = o[keep], m[keep], codes[keep]
+    order = np.argsort(codes, kind="stable")
+    o, m, codes = o[order], m[order], codes[order]
+    bounds = np.searchsorted(codes, np.arange(ngroups + 1))
+
+    chunk = 64
+    seeds = np.random.SeedSequence(seed).spawn(ngroups)
+    setup, tasks = [], []
+    for g in range(ngroups):
+        og, mg = o[bounds[g] : bounds[g + 1]], m[bounds[g] : bounds[g + 1]]
+        n = og.size
+        if n == 0:
+            setup.append(None)
+            continue
+        center = (og.mean(), mg.mean())
+        terms, keys = _raw_terms(og, mg, sums, center)
+        prefix = np.concatenate([np.zeros((1, terms.shape[1])), np.cumsum(terms, axis=0)])
+        length = min(block_length, n)
+        setup.append((n, length, prefix, keys, center))
+        for i, ss in enumerate(seeds[g].spawn(-(-n_boot // chunk))):
+            nrep = min(chunk, n_boot - i * chunk)
+            tasks.append((g, (prefix, n, length, nrep, ss)))
+
+    if max_workers == 1:
+        results = [_bootstrap_replicates(*args) for _, args in tasks]
+    else:
+        with _process_pool(max_workers) as pool:
+            futures = [pool.submit(_bootstrap_replicates, *args) for _, args in tasks]
+            results = [f.result() for f in futures]
+    replicates = {g: [] for g in range(ngroups)}
+    for (g, _), r in zip(tasks, results):
+        replicates[g].append(r)
+
+    rows = []
+    for g in range(ngroups):
+        key = [label[g] for label in labels]
+        if setup[g] is None:
+            rows.extend(key + [name, np.nan, np.nan, np.nan] for name in metrics)
+            continue
+        n, length, prefix, keys, center = setup[g]
+        total = prefix[-1]
+        estimate = stats_from_sufficient(_stats_from_raw(total, keys, center), metrics)
+        reps = stats_from_sufficient(
+            _stats_from_raw(np.concatenate(replicates[g]), keys, center), metrics
+        )
+        jack = {}
+        if method == "bca":
+            # delete-one-block jackknife over non-overlapping blocks
+            edges = np.append(np.arange(0, n, length), n)
+            blocks = prefix[edges[1:]] - prefix[edges[:-1]]
+            jack = stats_from_sufficient(_stats_from_raw(total - blocks, keys, center), metrics)
+        for name in metrics:
+            lower, upper = _interval(estimate[name], reps[name], jack.get(name), ci, method)
+            rows.append(key + [name, estimate[name], lower, upper])
+    return DataFrame(rows, columns=names + ["metric", "estimate", "lower", "upper"])
+
+
+def stats_report(
+    df,
+    obs="obs",
+    mod="model",
+    metrics=("MO", "MP", "MB", "NMB", "NME", "RMSE", "R", "IOA"),
+    by=None,
+    thresholds=None,
+    scores=("POD", "FAR", "CSI"),
+):
+    """Evaluation table of a paired DataFrame, per group, in one grouped pass.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Paired data.
+    obs : str
+        Observation column.
+    mod : str or list of str
+        Model column(s); with several, the table gets a ``model`` column
+        and one block of rows per model column.
+    metrics : list of str
+        Names from :data:`METRICS`.
+    by : str or list of str, optional
+        Columns to group by (e.g. ``["siteid"]`` or ``["epa_region", "hour"]``).
+    thresholds : list of float, optional
+        Event thresholds for the categorical `scores`
+        (see :mod:`monet.util.categorical`).
+    scores : list of str
+        Names from :data:`monet.util.categorical.SCORES`, reported per
+        threshold as ``<score>_<threshold>`` columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per group (and model column) with the `by` columns,
+        ``N`` (number of pairs) and one numeric column per metric/score,
+        ready for :meth:`pandas.DataFrame.to_parquet`.
+    """
+    from pandas import DataFrame, concat
+
+    from .categorical import contingency_table, scores_from_table
+
+    metrics = _required(metrics)[0]
+    mods = [mod] if isinstance(mod, str) else list(mod)
+    if by is None:
+        codes, labels, names = np.zeros(len(df), dtype=np.int64), [], []
+        ngroups = 1
+    else:
+        by = [by] if isinstance(by, str) else list(by)
+        codes, labels, names = _group_codes([df[c] for c in by])
+        ngroups = len(labels[0])
+    o = df[obs].to_numpy(dtype=float, na_value=np.nan)
+
+    frames = []
+    for col in mods:
+        m = df[col].to_numpy(dtype=float, na_value=np.nan)
+        s = grouped_sufficient_stats(o, m, codes, ngroups, metrics)
+        out = {name: label for name, label in zip(names, labels)}
+        if len(mods) > 1:
+            out["model"] = np.full(ngroups, col, dtype=object)
+        out["N"] = s["n"]
+        out.update(stats_from_sufficient(s, metrics))
+        if thresholds is not None:
+            table = contingency_table(o, m, thresholds, codes, ngroups)
+            values = scores_from_table(*table)
+            for j, t in enumerate(thresholds):
+                for name in scores:
+                    out[f"{name}_{t:g}"] = values[name][:, j]
+        frames.append(DataFrame(out, index=np.arange(ngroups)))
+    result = concat(frames, ignore_index=True)
+    result.attrs.update(obs=obs, mod=mods)
+    return result
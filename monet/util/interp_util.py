@@ -186,3 +186,90 @@ def constant_lon_swathdefition(longitude=None, latitude=None):
     if isinstance(lats, DataArray):
         lons.name = "lons"
     return geometry.SwathDefinition(lons=lons, lats=lats)
+
+
+EARTH_RADIUS = 6.371e6  # mean Earth radius (m)
+
+
+def lonlat_to_xyz(longitude=None, latitude=None):
+    """Convert longitude/latitude (degrees) to 3-D Cartesian (ECEF) coordinates
+    on the unit sphere.
+
+    Parameters
+    ----------
+    longitude : numpy.array
+        Longitude in degrees.
+    latitude : numpy.array
+        Latitude in degrees, same shape as `longitude`.
+
+    Returns
+    -------
+    numpy.array
+        Array of shape ``(longitude.size, 3)``.
+    """
+    import numpy as np
+
+    lon = np.deg2rad(np.asarray(longitude, dtype=float).ravel())
+    lat = np.deg2rad(np.asarray(latitude, dtype=float).ravel())
+    coslat = np.cos(lat)
+    return np.column_stack([coslat * np.cos(lon), coslat * np.sin(lon), np.sin(lat)])
+
+
+def sphere_kdtree(longitude=None, latitude=None):
+    """Build a KD-tree of grid points on the unit sphere.
+
+    Nearest neighbors in 3-D chord distance are also nearest in
+    great-circle distance, so the tree gives true geodesic neighbors
+    with no special handling of the dateline or the poles.
+
+    Parameters
+    ----------
+    longitude : numpy.array or xarray.DataArray
+        Grid longitude in degrees, any shape (flattened in C order).
+    latitude : numpy.array or xarray.DataArray
+        Grid latitude in degrees, same shape as `longitude`.
+
+    Returns
+    -------
+    scipy.spatial.cKDTree
+    """
+    from scipy.spatial import cKDTree
+
+    return cKDTree(lonlat_to_xyz(longitude=longitude, latitude=latitude))
+
+
+def query_sphere_kdtree(tree, longitude=None, latitude=None, k=1, radius_of_influence=None):
+    """Find the `k` nearest tree points to each given point.
+
+    Parameters
+    ----------
+    tree : scipy.spatial.cKDTree
+        Tree from :func:`sphere_kdtree`.
+    longitude : numpy.array
+        Query longitude in degrees.
+    latitude : numpy.array
+        Query latitude in degrees, same shape as `longitude`.
+    k : int
+        Number of neighbors.
+    radius_of_influence : float, optional
+        Maximum great-circle distance (m). Points with no neighbor within
+        this distance get index ``-1`` and distance ``inf``.
+
+    Returns
+    -------
+    distance, index : numpy.array
+        Great-circle distance (m) and flat index into the tree points,
+        with shape ``(n,)`` if ``k == 1`` else ``(n, k)``.
+    """
+    import numpy as np
+
+    xyz = lonlat_to_xyz(longitude=longitude, latitude=latitude)
+    if radius_of_influence is None:
+        chord_max = np.inf
+    else:
+        chord_max = 2 * np.sin(min(radius_of_influence / EARTH_RADIUS, np.pi) / 2)
+    chord, index = tree.query(xyz, k=k, distance_upper_bound=chord_max, workers=-1)
+    miss = ~np.isfinite(chord)
+    index = np.where(miss, -1, index)
+    distance = np.where(miss, np.inf, 2 * EARTH_RADIUS * np.arcsin(np.clip(chord / 2, 0, 1)))
+    return distance, index
@@ -1,3 +1,11 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
 try:
     from pyresample.geometry import AreaDefinition, SwathDefinition
     from pyresample.kd_tree import XArrayResamplerNN  # noqa: F401
@@ -106,23 +114,1072 @@ def resample_stratify(da, levels, vertical, axis=1):
     return out
 
 
-def resample_xesmf(source_da, target_da, cleanup=False, **kwargs):
+xesmf_cache_options = {
+    # directory for weight files; None (the default) disables the on-disk cache
+    "cache_dir": os.environ.get("MONET_XESMF_CACHE_DIR"),
+    # weight files kept on disk (least recently used are removed first)
+    "max_files": 32,
+    # Regridder objects kept in memory
+    "max_regridders": 8,
+}
+
+_regridders = OrderedDict()
+_regridders_lock = Lock()
+
+# coordinate variables xESMF builds the weights from
+_GRID_VARIABLES = ("lat", "lon", "lat_b", "lon_b", "latitude", "longitude", "mask")
+
+
+def set_xesmf_cache_options(**kwargs):
+    """Configure the xESMF weight cache used by :func:`resample_xesmf`.
+
+    Parameters
+    ----------
+    cache_dir : str or None
+        Directory for the weight files, e.g. ``~/.cache/monet/xesmf``.
+        ``None`` disables the on-disk cache. Defaults to
+        ``$MONET_XESMF_CACHE_DIR`` if set, else ``None``.
+    max_files : int
+        Number of weight files kept on disk; the least recently used
+        are removed first.
+    max_regridders : int
+        Number of ``xesmf.Regridder`` objects memoized in this process.
+        ``0`` disables the memoization.
+    """
+    unknown = set(kwargs) - set(xesmf_cache_options)
+    if unknown:
+        raise ValueError(f"unknown xESMF cache options: {sorted(unknown)}")
+    xesmf_cache_options.update(kwargs)
+    with _regridders_lock:
+        while len(_regridders) > max(xesmf_cache_options["max_regridders"], 0):
+            _regridders.popitem(last=False)
+
+
+def clear_xesmf_cache(disk=False):
+    """Drop the memoized ``xesmf.Regridder`` objects and, if `disk`,
+    the cached weight files."""
+    with _regridders_lock:
+        _regridders.clear()
+    cache_dir = xesmf_cache_options["cache_dir"]
+    if disk and cache_dir is not None and os.path.isdir(cache_dir):
+        for f in os.listdir(cache_dir):
+            if f.startswith("monet_xesmf_") and f.endswith(".nc"):
+                os.remove(os.path.join(cache_dir, f))
+
+
+def grid_fingerprint(obj):
+    """Hash of the horizontal grid of `obj`.
+
+    Computed from the names, shapes, dtypes and values of the coordinate
+    variables xESMF uses (``lat``, ``lon``, cell bounds ``lat_b``/``lon_b``
+    and ``mask``), so data on the same grid gives the same fingerprint.
+
+    Parameters
+    ----------
+    obj : xarray.DataArray or xarray.Dataset
+
+    Returns
+    -------
+    str
+        Hex digest.
+    """
+    import xarray as xr
+
+    variables = obj.variables if isinstance(obj, xr.Dataset) else obj.coords
+    h = hashlib.sha1()
+    for name in _GRID_VARIABLES:
+        if name in variables:
+            values = np.ascontiguousarray(np.asarray(variables[name].values))
+            h.update(f"{name}{values.shape}{values.dtype.str}".encode())
+            h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def _regridder_key(source, target, method, kwargs):
+    extra = ",".join(f"{k}={kwargs[k]!r}" for k in sorted(kwargs))
+    h = hashlib.sha1(
+        f"{grid_fingerprint(source)}|{grid_fingerprint(target)}|{method}|{extra}".encode()
+    )
+    return h.hexdigest()
+
+
+def _trim_weight_files(cache_dir, max_files):
+    """Remove the least recently used weight files beyond `max_files`."""
+    files = []
+    for f in os.listdir(cache_dir):
+        if f.startswith("monet_xesmf_") and f.endswith(".nc"):
+            path = os.path.join(cache_dir, f)
+            try:
+                files.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:  # removed by another process
+                continue
+    files.sort()
+    for _, path in files[: max(len(files) - max_files, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_regridder(source, target, method="bilinear", **kwargs):
+    """Get an ``xesmf.Regridder`` for `source` -> `target`, reusing weights.
+
+    Regridders are memoized in-process, keyed by the fingerprints of both
+    grids, the method and the other Regridder options. If a cache directory
+    is set (see :func:`set_xesmf_cache_options`), their weights are also
+    cached on disk. Weight files are written to a temporary file and
+    atomically renamed, so concurrent jobs sharing a cache directory never
+    read a partial file.
+
+    Parameters
+    ----------
+    source, target : xarray.DataArray or xarray.Dataset
+        Source and target grids, with ``lat``/``lon`` coordinates.
+    method : str
+        xESMF regridding method.
+    kwargs : dict
+        Passed on to ``xesmf.Regridder``. The legacy ``filename`` and
+        ``reuse_weights`` options are ignored (superseded by the cache).
+
+    Returns
+    -------
+    xesmf.Regridder
+    """
+    import xesmf as xe
+
+    kwargs.pop("filename", None)
+    kwargs.pop("reuse_weights", None)
+    key = _regridder_key(source, target, method, kwargs)
+    max_regridders = xesmf_cache_options["max_regridders"]
+    with _regridders_lock:
+        if key in _regridders:
+            _regridders.move_to_end(key)
+            return _regridders[key]
+
+    cache_dir = xesmf_cache_options["cache_dir"]
+    regridder = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"monet_xesmf_{key}.nc")
+        if os.path.exists(path):
+            try:
+                regridder = xe.Regridder(source, target, method, weights=path, **kwargs)
+                os.utime(path)  # mark as recently used
+            except (OSError, ValueError, KeyError):
+                regridder = None  # unreadable file, rebuild it
+        if regridder is None:
+            regridder = xe.Regridder(source, target, method, **kwargs)
+            fd, tmp = tempfile.mkstemp(prefix=".monet_xesmf_", suffix=".nc.tmp", dir=cache_dir)
+            os.close(fd)
+            try:
+                regridder.to_netcdf(tmp)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            _trim_weight_files(cache_dir, xesmf_cache_options["max_files"])
+    else:
+        regridder = xe.Regridder(source, target, method, **kwargs)
+
+    if max_regridders > 0:
+        with _regridders_lock:
+            _regridders[key] = regridder
+            while len(_regridders) > max_regridders:
+                _regridders.popitem(last=False)
+    return regridder
+
+
+def _horizontal_dims(regridder, dset):
+    """Dimensions the regridder maps (those of the lat/lon coordinates)."""
+    dims = getattr(regridder, "in_horiz_dims", None)
+    if dims:
+        return set(dims)
+    dims = set()
+    for lat, lon in (("lat", "lon"), ("latitude", "longitude")):
+        if lat in dset.variables and lon in dset.variables:
+            dims.update(dset[lat].dims + dset[lon].dims)
+            break
+    return dims
+
+
+def regrid_dataset(regridder, dset, stack=True):
+    """Apply an ``xesmf.Regridder`` to all data variables of `dset`.
+
+    Variables sharing dims and dtype are stacked along a temporary dimension
+    so the sparse weights are applied to all of them in one product.
+    Stacking copies the variables of each group into one new array (lazily
+    for dask-backed data); use ``stack=False`` to regrid them one by one
+    without that copy. Variables without the horizontal dimensions are
+    passed through unchanged.
+
+    Parameters
+    ----------
+    regridder : xesmf.Regridder
+    dset : xarray.Dataset
+    stack : bool
+        Regrid variables of the same dims and dtype in one product.
+
+    Returns
+    -------
+    xarray.Dataset
+        With the attributes of `dset` and of each variable.
+    """
+    import xarray as xr
+
+    horizontal = _horizontal_dims(regridder, dset)
+    groups = {}
+    das = {}
+    for name, da in dset.data_vars.items():
+        if horizontal and not horizontal <= set(da.dims):
+            das[name] = da
+        elif stack:
+            groups.setdefault((da.dims, da.dtype), []).append(name)
+        else:
+            groups[name] = [name]
+    for names in groups.values():
+        if len(names) == 1:
+            das[names[0]] = regridder(dset[names[0]])
+        else:
+            stacked = xr.concat(
+                [dset[name].reset_coords(drop=True) for name in names], dim="monet_variable"
+            )
+            out = regridder(stacked)
+            for i, name in enumerate(names):
+                das[name] = out.isel(monet_variable=i, drop=True)
+        for name in names:
+            das[name] = das[name].rename(name)
+            das[name].attrs = dict(dset[name].attrs)
+    ds = xr.Dataset({name: das[name] for name in dset.data_vars})
+    ds.attrs = dset.attrs
+    return ds
+
+
+def resample_xesmf(source_da, target_da, cleanup=False, cache=True, **kwargs):
+    """Regrid `source_da` to the grid of `target_da` with xESMF.
+
+    Parameters
+    ----------
+    source_da : xarray.DataArray or xarray.Dataset
+        Data to regrid, with ``lat``/``lon`` coordinates.
+    target_da : xarray.DataArray or xarray.Dataset
+        Target grid, with ``lat``/``lon`` coordinates.
+    cleanup : bool
+        Remove the weight file afterwards (uncached regridders only).
+    cache : bool
+        Reuse weights through :func:`get_regridder`. If false, a new
+        ``xesmf.Regridder`` is built from `kwargs` as is.
+    kwargs : dict
+        Passed on to ``xesmf.Regridder``. ``method`` defaults to ``'bilinear'``.
+
+    Returns
+    -------
+    xarray.DataArray or xarray.Dataset
+    """
     if has_xesmf:
         import xarray as xr
         import xesmf as xe
 
-        regridder = xe.Regridder(source_da, target_da, **kwargs)
-        if cleanup:
-            regridder.clean_weight_file()
+        if cache:
+            method = kwargs.pop("method", "bilinear")
+            regridder = get_regridder(source_da, target_da, method=method, **kwargs)
+        else:
+            regridder = xe.Regridder(source_da, target_da, **kwargs)
+            if cleanup and hasattr(regridder, "clean_weight_file"):
+                regridder.clean_weight_file()
         if isinstance(source_da, xr.Dataset):
-            das = {}
-            for name, i in source_da.data_vars.items():
-                das[name] = regridder(i)
-            ds = xr.Dataset(das)
-            ds.attrs = source_da.attrs
-            return ds
+            return regrid_dataset(regridder, source_da)
         else:
             da = regridder(source_da)
             if da.name is None:
                 da.name = source_da.name
             return da
+
+
+class NearestRemapPlan:
+    """Precomputed nearest-neighbor lookup from a source grid to a target grid.
+
+    The KD-tree search is done once (by ``pyresample.kd_tree.get_neighbour_info``)
+    and the resulting flat source indices are kept, so the plan can be applied
+    to any number of DataArrays/Datasets on the same source grid as a cheap gather.
+    Plans can be saved to and loaded from ``.npz`` files.
+
+    Parameters
+    ----------
+    index : numpy.ndarray
+        Flat (C-order) index into the source grid for each target point,
+        ``-1`` where no source point is within the radius of influence.
+        Shape of the target grid.
+    source_shape : tuple of int
+        Shape of the source grid.
+    source_dims : tuple of str
+        Names of the source grid dimensions, e.g. ``('y', 'x')``.
+    target_dims : tuple of str
+        Names of the target grid dimensions.
+    target_latitude, target_longitude : numpy.ndarray
+        Target grid coordinates, same shape as `index`.
+    distance : numpy.ndarray, optional
+        Distance (m) to the nearest source point for each target point.
+    radius_of_influence : float, optional
+        Radius of influence (m) used to build the plan.
+    """
+
+    def __init__(
+        self,
+        index,
+        source_shape,
+        source_dims,
+        target_dims,
+        target_latitude,
+        target_longitude,
+        distance=None,
+        radius_of_influence=None,
+    ):
+        self.index = np.asarray(index, dtype=np.int64)
+        self.source_shape = tuple(int(i) for i in source_shape)
+        self.source_dims = tuple(str(d) for d in source_dims)
+        self.target_dims = tuple(str(d) for d in target_dims)
+        self.target_latitude = np.asarray(target_latitude)
+        self.target_longitude = np.asarray(target_longitude)
+        self.distance = None if distance is None else np.asarray(distance)
+        self.radius_of_influence = radius_of_influence
+        if self.index.ndim != len(self.target_dims):
+            raise ValueError("`index` must have one dimension per target dimension")
+        if len(self.source_shape) != len(self.source_dims):
+            raise ValueError("`source_shape` and `source_dims` must have the same length")
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(source={dict(zip(self.source_dims, self.source_shape))}, "
+            f"target={dict(zip(self.target_dims, self.index.shape))}, "
+            f"radius_of_influence={self.radius_of_influence})"
+        )
+
+    @property
+    def valid(self):
+        """numpy.ndarray of bool : True where a target point has a source neighbor."""
+        return self.index >= 0
+
+    @classmethod
+    def from_definitions(
+        cls,
+        source,
+        target,
+        radius_of_influence=1e6,
+        source_dims=("y", "x"),
+        target_dims=("y", "x"),
+        **kwargs,
+    ):
+        """Build a plan from pyresample geometry definitions.
+
+        Parameters
+        ----------
+        source, target : pyresample.geometry.CoordinateDefinition
+            Source and target grid definitions.
+        radius_of_influence : float
+            Radius of influence (meters), used by ``pyresample.kd_tree``.
+        source_dims, target_dims : tuple of str
+            Grid dimension names, used if the definitions do not carry
+            :class:`xarray.DataArray` lats.
+        kwargs : dict
+            Passed on to ``pyresample.kd_tree.get_neighbour_info``.
+
+        Returns
+        -------
+        NearestRemapPlan
+        """
+        from pyresample import kd_tree
+
+        kwargs["neighbours"] = 1
+        valid_in, valid_out, index_array, distance = kd_tree.get_neighbour_info(
+            source, target, radius_of_influence, **kwargs
+        )
+        return cls._from_neighbour_info(
+            source,
+            target,
+            valid_in,
+            valid_out,
+            index_array,
+            distance,
+            radius_of_influence,
+            source_dims,
+            target_dims,
+        )
+
+    @classmethod
+    def from_resampler(cls, resampler, source_dims=("y", "x"), target_dims=("y", "x")):
+        """Build a plan from a ``pyresample.kd_tree.XArrayResamplerNN`` whose
+        ``get_neighbour_info`` has already been run.
+
+        Parameters
+        ----------
+        resampler : pyresample.kd_tree.XArrayResamplerNN
+        source_dims, target_dims : tuple of str
+            Grid dimension names, used if the geometry definitions do not carry
+            :class:`xarray.DataArray` lats.
+
+        Returns
+        -------
+        NearestRemapPlan
+        """
+        import dask
+
+        if resampler.index_array is None:
+            raise ValueError("run `get_neighbour_info()` on the resampler first")
+        valid_in, valid_out, index_array, distance = dask.compute(
+            resampler.valid_input_index,
+            resampler.valid_output_index,
+            resampler.index_array,
+            resampler.distance_array,
+        )
+        if distance is not None:
+            distance = np.asarray(distance)[..., 0]
+        return cls._from_neighbour_info(
+            resampler.source_geo_def,
+            resampler.target_geo_def,
+            valid_in,
+            valid_out,
+            np.asarray(index_array)[..., 0],
+            distance,
+            resampler.radius_of_influence,
+            source_dims,
+            target_dims,
+        )
+
+    @classmethod
+    def _from_neighbour_info(
+        cls,
+        source,
+        target,
+        valid_in,
+        valid_out,
+        index_array,
+        distance,
+        radius_of_influence,
+        source_dims,
+        target_dims,
+    ):
+        """Convert pyresample neighbor info (indices into the valid source
+        points) to flat indices into the full source grid."""
+        source_lats = source.lats
+        target_lats = target.lats
+        if hasattr(source_lats, "dims"):
+            source_dims = source_lats.dims
+        if hasattr(target_lats, "dims"):
+            target_dims = target_lats.dims
+
+        valid_in_flat = np.flatnonzero(np.ravel(valid_in))
+        index_array = np.ravel(index_array)
+        miss = (index_array < 0) | (index_array >= valid_in_flat.size) | ~np.ravel(valid_out)
+        index = np.full(index_array.shape, -1, dtype=np.int64)
+        index[~miss] = valid_in_flat[index_array[~miss]]
+        if distance is not None:
+            distance = np.where(miss, np.nan, np.ravel(distance)).reshape(target.shape)
+
+        target_shape = target.shape
+        return cls(
+            index.reshape(target_shape),
+            source.shape,
+            source_dims,
+            target_dims,
+            np.asarray(target.lats).reshape(target_shape),
+            np.asarray(target.lons).reshape(target_shape),
+            distance=distance,
+            radius_of_influence=radius_of_influence,
+        )
+
+    @classmethod
+    def from_data(cls, source, target, radius_of_influence=1e6, **kwargs):
+        """Build a plan from xarray objects with ``latitude``/``longitude`` coordinates.
+
+        Parameters
+        ----------
+        source : xarray.DataArray or xarray.Dataset
+            Data on the source grid.
+        target : xarray.DataArray or xarray.Dataset
+            Data on the target grid.
+        radius_of_influence : float
+            Radius of influence (meters), used by ``pyresample.kd_tree``.
+        kwargs : dict
+            Passed on to ``pyresample.kd_tree.get_neighbour_info``.
+
+        Returns
+        -------
+        NearestRemapPlan
+        """
+        from ..monet_accessor import _dataset_to_monet
+        from .interp_util import latlon_xarray_to_CoordinateDefinition as llcd
+
+        source = _dataset_to_monet(source)
+        target = _dataset_to_monet(target)
+        s = llcd(longitude=source.longitude, latitude=source.latitude)
+        t = llcd(longitude=target.longitude, latitude=target.latitude)
+        return cls.from_definitions(s, t, radius_of_influence=radius_of_influence, **kwargs)
+
+    def save(self, filename):
+        """Save the plan to a NumPy ``.npz`` file.
+
+        Parameters
+        ----------
+        filename : str or path-like
+        """
+        np.savez(
+            filename,
+            index=self.index,
+            source_shape=np.asarray(self.source_shape, dtype=np.int64),
+            source_dims=np.asarray(self.source_dims),
+            target_dims=np.asarray(self.target_dims),
+            target_latitude=self.target_latitude,
+            target_longitude=self.target_longitude,
+            distance=self.distance if self.distance is not None else np.array([]),
+            radius_of_influence=np.asarray(
+                np.nan if self.radius_of_influence is None else self.radius_of_influence
+            ),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """Load a plan written by :meth:`save`.
+
+        Parameters
+        ----------
+        filename : str or path-like
+
+        Returns
+        -------
+        NearestRemapPlan
+        """
+        with np.load(filename) as f:
+            distance = f["distance"]
+            radius = float(f["radius_of_influence"])
+            return cls(
+                f["index"],
+                tuple(f["source_shape"]),
+                tuple(f["source_dims"]),
+                tuple(f["target_dims"]),
+                f["target_latitude"],
+                f["target_longitude"],
+                distance=distance if distance.size > 0 else None,
+                radius_of_influence=None if np.isnan(radius) else radius,
+            )
+
+    def _prepare(self, da):
+        """Check `da` is on the source grid and move the grid dims together
+        (to the position of the first one, as pyresample does).
+
+        Returns the transposed DataArray and the non-grid dims before/after the grid dims.
+        """
+        src_dims = self.source_dims
+        if not set(src_dims).issubset(da.dims):
+            raise ValueError(f"{da.name!r} does not have the source grid dimensions {src_dims}")
+        shape = tuple(da.sizes[d] for d in src_dims)
+        if shape != self.source_shape:
+            raise ValueError(
+                f"{da.name!r} has source grid shape {shape}, plan expects {self.source_shape}"
+            )
+        first = min(da.dims.index(d) for d in src_dims)
+        other = [d for d in da.dims if d not in src_dims]
+        lead, trail = tuple(other[:first]), tuple(other[first:])
+        return da.transpose(*lead, *src_dims, *trail), lead, trail
+
+    def _gather(self, data, n_lead):
+        """Take the neighbor points from the (numpy or dask) array `data`
+        whose grid axes start at axis `n_lead`."""
+        nsrc = len(self.source_dims)
+        data = data.reshape(data.shape[:n_lead] + (-1,) + data.shape[n_lead + nsrc :])
+        index = np.where(self.valid, self.index, 0).ravel()
+        out = data[(slice(None),) * n_lead + (index,)]
+        return out.reshape(out.shape[:n_lead] + self.index.shape + out.shape[n_lead + 1 :])
+
+    def _wrap(self, out, da, lead, trail, fill_value):
+        import xarray as xr
+
+        src_dims = self.source_dims
+        coords = {
+            k: v
+            for k, v in da.coords.items()
+            if not set(v.dims).intersection(src_dims + self.target_dims)
+        }
+        dims = lead + self.target_dims + trail
+        result = xr.DataArray(out, dims=dims, coords=coords, name=da.name, attrs=da.attrs)
+        valid = self.valid
+        if not valid.all():
+            result = result.where(xr.DataArray(valid, dims=self.target_dims), fill_value)
+        result.coords["latitude"] = (self.target_dims, self.target_latitude)
+        result.coords["longitude"] = (self.target_dims, self.target_longitude)
+        return result
+
+    def _apply_dataarray(self, da, fill_value=np.nan):
+        da, lead, trail = self._prepare(da)
+        out = self._gather(da.data, len(lead))
+        return self._wrap(out, da, lead, trail, fill_value)
+
+    def _apply_dataset(self, dset, fill_value=np.nan, num_threads=None):
+        """Gather all variables on the source grid, fused per group of
+        variables sharing dims and dtype.
+
+        Dask-backed groups are stacked along a new leading axis and gathered
+        in one indexing operation (one graph instead of one per variable).
+        In-memory groups are not stacked, which would copy every full field;
+        their per-variable takes (which release the GIL) run on a thread pool.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        import dask.array as dsa
+        from dask.base import is_dask_collection
+
+        groups = {}
+        for name, da in dset.data_vars.items():
+            if set(self.source_dims).issubset(da.dims):
+                groups.setdefault((da.dims, da.dtype), []).append(name)
+
+        results = {}
+        lazy = []
+        eager = []
+        for names in groups.values():
+            prepared = [self._prepare(dset[name]) for name in names]
+            if len(names) > 1 and all(is_dask_collection(p[0].data) for p in prepared):
+                lazy.append(prepared)
+            else:
+                eager.extend(prepared)
+
+        for prepared in lazy:
+            lead, trail = prepared[0][1], prepared[0][2]
+            stacked = dsa.stack([p[0].data for p in prepared])
+            out = self._gather(stacked, len(lead) + 1)
+            for i, (da, lead, trail) in enumerate(prepared):
+                results[da.name] = self._wrap(out[i], da, lead, trail, fill_value)
+
+        def gather(p):
+            return self._gather(p[0].data, len(p[1]))
+
+        if num_threads == 1 or len(eager) < 2:
+            outs = map(gather, eager)
+        else:
+            with ThreadPoolExecutor(max_workers=num_threads) as pool:
+                outs = list(pool.map(gather, eager))
+        for (da, lead, trail), out in zip(eager, outs):
+            results[da.name] = self._wrap(out, da, lead, trail, fill_value)
+
+        # keep the original variable order
+        return {name: results[name] for name in dset.data_vars if name in results}
+
+    def apply(self, data, fill_value=np.nan, num_threads=None):
+        """Sample `data` on the target grid using the precomputed neighbors.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+            Data on the source grid. Dask-backed data stays lazy.
+        fill_value : float
+            Value for target points without a source neighbor.
+        num_threads : int, optional
+            Size of the thread pool used to gather in-memory Dataset variables.
+            ``1`` gathers serially; by default the
+            :class:`concurrent.futures.ThreadPoolExecutor` default is used.
+
+        Returns
+        -------
+        xarray.DataArray or xarray.Dataset
+            Data on the target grid.
+        """
+        import xarray as xr
+
+        if isinstance(data, xr.DataArray):
+            return self._apply_dataarray(data, fill_value=fill_value)
+        elif isinstance(data, xr.Dataset):
+            results = self._apply_dataset(data, fill_value=fill_value, num_threads=num_threads)
+            result = xr.Dataset(results)
+            if bool(data.attrs):
+                result.attrs = data.attrs
+            result.coords["latitude"] = (self.target_dims, self.target_latitude)
+            result.coords["longitude"] = (self.target_dims, self.target_longitude)
+            return result
+        else:
+            raise TypeError("data must be an xarray.DataArray or xarray.Dataset")
+
+
+def _bilinear_stencils(grid_lon, grid_lat, lon, lat, j, i):
+    """Bilinear stencils of points on a curvilinear grid.
+
+    For each point, the four grid quads having the nearest cell center
+    ``(j, i)`` as a corner are tried, and the bilinear map of the first quad
+    containing the point is inverted in a local tangent plane.
+
+    Returns
+    -------
+    index : numpy.ndarray
+        Flat grid indices of the quad corners, shape ``(n, 4)``.
+    weights : numpy.ndarray
+        Bilinear weights, shape ``(n, 4)``.
+    found : numpy.ndarray of bool
+        Whether a containing quad was found.
+    """
+    ny, nx = grid_lon.shape
+    n = lon.size
+    coslat = np.cos(np.deg2rad(lat))
+    index = np.zeros((n, 4), dtype=np.int64)
+    weights = np.zeros((n, 4))
+    found = np.zeros(n, dtype=bool)
+    eps = 1e-9
+    for dj, di in [(-1, -1), (-1, 0), (0, -1), (0, 0)]:
+        j0 = j + dj
+        i0 = i + di
+        ok = ~found & (j0 >= 0) & (i0 >= 0) & (j0 < ny - 1) & (i0 < nx - 1)
+        j0 = np.clip(j0, 0, ny - 2)
+        i0 = np.clip(i0, 0, nx - 2)
+        corners = [(j0, i0), (j0, i0 + 1), (j0 + 1, i0 + 1), (j0 + 1, i0)]
+        # corner positions relative to the point (degrees, lon scaled by cos(lat))
+        xy = [
+            (
+                ((grid_lon[c] - lon + 180) % 360 - 180) * coslat,
+                grid_lat[c] - lat,
+            )
+            for c in corners
+        ]
+        (ax, ay), (bx, by), (cx, cy), (dx, dy) = xy
+        ex, ey = bx - ax, by - ay
+        fx, fy = dx - ax, dy - ay
+        gx, gy = ax - bx + cx - dx, ay - by + cy - dy
+        hx, hy = -ax, -ay
+        k2 = gx * fy - gy * fx
+        k1 = ex * fy - ey * fx + hx * gy - hy * gx
+        k0 = hx * ey - hy * ex
+        with np.errstate(divide="ignore", invalid="ignore"):
+            linear = np.abs(k2) < eps * np.maximum(np.abs(k1), eps)
+            disc = np.sqrt(np.where(linear, 0.0, k1 * k1 - 4 * k0 * k2))
+            roots = [
+                np.where(linear, -k0 / k1, (-k1 - disc) / (2 * k2)),
+                np.where(linear, -k0 / k1, (-k1 + disc) / (2 * k2)),
+            ]
+            for v in roots:
+                denx, deny = ex + gx * v, ey + gy * v
+                u = np.where(
+                    np.abs(denx) >= np.abs(deny), (hx - fx * v) / denx, (hy - fy * v) / deny
+                )
+                tol = 1e-6
+                inside = (
+                    ok
+                    & ~found
+                    & np.isfinite(u)
+                    & np.isfinite(v)
+                    & (u >= -tol)
+                    & (u <= 1 + tol)
+                    & (v >= -tol)
+                    & (v <= 1 + tol)
+                )
+                u = np.clip(u, 0, 1)
+                vv = np.clip(v, 0, 1)
+                w = np.stack([(1 - u) * (1 - vv), u * (1 - vv), u * vv, (1 - u) * vv], axis=1)
+                idx = np.stack([jj * nx + ii for jj, ii in corners], axis=1)
+                index[inside] = idx[inside]
+                weights[inside] = w[inside]
+                found |= inside
+    return index, weights, found
+
+
+class WeightedRemapPlan:
+    """Precomputed interpolation weights from a (curvilinear) source grid to target points.
+
+    Each target point gets a small stencil of source cells and weights
+    (bilinear, inverse-distance or Gaussian), stored as a sparse matrix.
+    Applying the plan is one sparse matrix product over all other dims
+    (e.g. every time step and level at once); no ESMF is needed.
+    Missing (NaN) source values are left out and the remaining weights
+    renormalized.
+
+    Parameters
+    ----------
+    index : numpy.ndarray
+        Flat (C-order) source grid indices, shape of the target grid plus
+        a stencil dimension; ``-1`` pads unused stencil entries.
+    weights : numpy.ndarray
+        Weights, same shape as `index` (0 for padding).
+    source_shape : tuple of int
+        Shape of the source grid.
+    source_dims : tuple of str
+        Names of the source grid dimensions.
+    target_dims : tuple of str
+        Names of the target grid dimensions.
+    target_latitude, target_longitude : numpy.ndarray
+        Target grid coordinates.
+    method : str, optional
+        Method used to build the weights.
+    """
+
+    methods = ("bilinear", "idw", "gaussian")
+
+    def __init__(
+        self,
+        index,
+        weights,
+        source_shape,
+        source_dims,
+        target_dims,
+        target_latitude,
+        target_longitude,
+        method=None,
+    ):
+        from scipy import sparse
+
+        self.index = np.asarray(index, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=float)
+        self.source_shape = tuple(int(i) for i in source_shape)
+        self.source_dims = tuple(str(d) for d in source_dims)
+        self.target_dims = tuple(str(d) for d in target_dims)
+        self.target_latitude = np.asarray(target_latitude)
+        self.target_longitude = np.asarray(target_longitude)
+        self.method = method
+        if self.index.shape != self.weights.shape:
+            raise ValueError("`index` and `weights` must have the same shape")
+        if self.index.ndim != len(self.target_dims) + 1:
+            raise ValueError("`index` must have the target grid dims plus a stencil dim")
+
+        npoints = int(np.prod(self.index.shape[:-1]))
+        k = self.index.shape[-1]
+        use = (self.index >= 0).reshape(npoints, k) & (self.weights.reshape(npoints, k) != 0)
+        rows = np.repeat(np.arange(npoints), k).reshape(npoints, k)
+        self.matrix = sparse.csr_matrix(
+            (
+                self.weights.reshape(npoints, k)[use],
+                (rows[use], self.index.reshape(npoints, k)[use]),
+            ),
+            shape=(npoints, int(np.prod(self.source_shape))),
+        )
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(method={self.method!r}, "
+            f"source={dict(zip(self.source_dims, self.source_shape))}, "
+            f"target={dict(zip(self.target_dims, self.index.shape[:-1]))})"
+        )
+
+    @classmethod
+    def from_data(
+        cls,
+        source,
+        target,
+        method="bilinear",
+        k=4,
+        power=2.0,
+        sigma=None,
+        radius_of_influence=1e6,
+    ):
+        """Compute interpolation weights from the grid of `source` to the points of `target`.
+
+        Parameters
+        ----------
+        source : xarray.DataArray or xarray.Dataset
+            Data on the source grid, with 2-D ``latitude``/``longitude``.
+        target : xarray.DataArray or xarray.Dataset
+            Target points, with ``latitude``/``longitude``
+            (e.g. from ``df.monet._df_to_da()``).
+        method : {'bilinear', 'idw', 'gaussian'}
+            ``'bilinear'`` interpolates within the grid quad containing the
+            point (falling back to the nearest cell outside the grid);
+            ``'idw'`` and ``'gaussian'`` weight the `k` nearest cells.
+        k : int
+            Number of neighbors for ``'idw'``/``'gaussian'``.
+        power : float
+            Inverse-distance weighting power.
+        sigma : float, optional
+            Gaussian kernel width (m). Defaults to half the median distance
+            to the `k`-th neighbor.
+        radius_of_influence : float
+            Points with no cell center within this distance (m) get NaN.
+
+        Returns
+        -------
+        WeightedRemapPlan
+        """
+        from ..monet_accessor import _dataset_to_monet
+        from .interp_util import query_sphere_kdtree, sphere_kdtree
+
+        if method not in cls.methods:
+            raise ValueError(f"`method` must be one of {cls.methods}")
+        source = _dataset_to_monet(source)
+        target = _dataset_to_monet(target)
+        grid_lat = np.asarray(source.latitude.values, dtype=float)
+        grid_lon = np.asarray(source.longitude.values, dtype=float)
+        lat = np.asarray(target.latitude.values, dtype=float)
+        lon = np.asarray(target.longitude.values, dtype=float)
+        tree = sphere_kdtree(longitude=grid_lon, latitude=grid_lat)
+        kk = 1 if method == "bilinear" else k
+        distance, index = query_sphere_kdtree(
+            tree,
+            longitude=lon,
+            latitude=lat,
+            k=kk,
+            radius_of_influence=radius_of_influence,
+        )
+        distance = distance.reshape(lat.size, kk)
+        index = index.reshape(lat.size, kk)
+        valid = index >= 0
+
+        if method == "bilinear":
+            nearest = np.where(valid[:, 0], index[:, 0], 0)
+            j, i = np.unravel_index(nearest, grid_lat.shape)
+            index4, weights, found = _bilinear_stencils(
+                grid_lon, grid_lat, lon.ravel(), lat.ravel(), j, i
+            )
+            # outside the grid: nearest cell
+            index4[~found] = -1
+            index4[~found, 0] = index[~found, 0]
+            weights[~found] = 0
+            weights[~found, 0] = 1
+            miss = ~valid[:, 0]
+            index4[miss] = -1
+            weights[miss] = 0
+            index, weights = index4, weights
+        else:
+            with np.errstate(divide="ignore"):
+                if method == "idw":
+                    weights = np.where(valid, 1.0 / distance**power, 0.0)
+                    exact = valid & (distance == 0)
+                    weights = np.where(exact.any(axis=1, keepdims=True), exact * 1.0, weights)
+                else:
+                    if sigma is None:
+                        kth = distance[:, -1][np.isfinite(distance[:, -1])]
+                        sigma = 0.5 * np.median(kth) if kth.size > 0 else 1.0
+                    weights = np.where(valid, np.exp(-0.5 * (distance / sigma) ** 2), 0.0)
+            weights = weights / np.where(
+                weights.sum(axis=1, keepdims=True) > 0, weights.sum(axis=1, keepdims=True), 1
+            )
+            index = np.where(valid, index, -1)
+
+        target_shape = target.latitude.shape
+        return cls(
+            index.reshape(target_shape + (index.shape[-1],)),
+            weights.reshape(target_shape + (weights.shape[-1],)),
+            grid_lat.shape,
+            source.latitude.dims,
+            target.latitude.dims,
+            lat.reshape(target_shape),
+            lon.reshape(target_shape),
+            method=method,
+        )
+
+    def save(self, filename):
+        """Save the plan to a NumPy ``.npz`` file.
+
+        Parameters
+        ----------
+        filename : str or path-like
+        """
+        np.savez(
+            filename,
+            index=self.index,
+            weights=self.weights,
+            source_shape=np.asarray(self.source_shape, dtype=np.int64),
+            source_dims=np.asarray(self.source_dims),
+            target_dims=np.asarray(self.target_dims),
+            target_latitude=self.target_latitude,
+            target_longitude=self.target_longitude,
+            method=np.asarray("" if self.method is None else self.method),
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """Load a plan written by :meth:`save`.
+
+        Parameters
+        ----------
+        filename : str or path-like
+
+        Returns
+        -------
+        WeightedRemapPlan
+        """
+        with np.load(filename) as f:
+            return cls(
+                f["index"],
+                f["weights"],
+                tuple(f["source_shape"]),
+                tuple(f["source_dims"]),
+                tuple(f["target_dims"]),
+                f["target_latitude"],
+                f["target_longitude"],
+                method=str(f["method"]) or None,
+            )
+
+    def _interp(self, data):
+        """Apply the weights to the trailing (grid) axes of numpy array `data`."""
+        nsrc = len(self.source_dims)
+        lead = data.shape[: data.ndim - nsrc]
+        x = data.reshape((-1, int(np.prod(self.source_shape)))).T
+        good = np.isfinite(x)
+        if good.all():
+            out = self.matrix @ x
+            out[np.asarray(self.matrix.sum(axis=1)).ravel() == 0] = np.nan
+        else:
+            num = self.matrix @ np.where(good, x, 0.0)
+            den = self.matrix @ good.astype(float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out = np.where(den > 0, num / den, np.nan)
+        return out.T.reshape(lead + self.index.shape[:-1])
+
+    def _apply_dataarray(self, da):
+        import xarray as xr
+
+        if not set(self.source_dims).issubset(da.dims):
+            raise ValueError(
+                f"{da.name!r} does not have the source grid dimensions {self.source_dims}"
+            )
+        shape = tuple(da.sizes[d] for d in self.source_dims)
+        if shape != self.source_shape:
+            raise ValueError(
+                f"{da.name!r} has source grid shape {shape}, plan expects {self.source_shape}"
+            )
+        da = da.drop_vars(
+            [k for k, v in da.coords.items() if set(v.dims).intersection(self.source_dims)]
+        )
+        if da.chunks is not None:
+            da = da.chunk({d: -1 for d in self.source_dims})
+        result = xr.apply_ufunc(
+            self._interp,
+            da,
+            input_core_dims=[list(self.source_dims)],
+            output_core_dims=[list(self.target_dims)],
+            exclude_dims=set(self.source_dims),
+            dask="parallelized",
+            output_dtypes=[np.result_type(da.dtype, np.float32)],
+            dask_gufunc_kwargs={"output_sizes": dict(zip(self.target_dims, self.index.shape[:-1]))},
+            keep_attrs=True,
+        )
+        result.coords["latitude"] = (self.target_dims, self.target_latitude)
+        result.coords["longitude"] = (self.target_dims, self.target_longitude)
+        return result
+
+    def apply(self, data, **kwargs):
+        """Interpolate `data` to the target points.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+            Data on the source grid. Dask-backed data stays lazy
+            (the grid dims are put in a single chunk).
+        kwargs : dict
+            Ignored; accepted for compatibility with
+            :meth:`NearestRemapPlan.apply`.
+
+        Returns
+        -------
+        xarray.DataArray or xarray.Dataset
+            Data on the target grid.
+        """
+        import xarray as xr
+
+        if isinstance(data, xr.DataArray):
+            return self._apply_dataarray(data)
+        elif isinstance(data, xr.Dataset):
+            results = {}
+            for name, da in data.data_vars.items():
+                if set(self.source_dims).issubset(da.dims):
+                    results[name] = self._apply_dataarray(da)
+            result = xr.Dataset(results)
+            if bool(data.attrs):
+                result.attrs = data.attrs
+            result.coords["latitude"] = (self.target_dims, self.target_latitude)
+            result.coords["longitude"] = (self.target_dims, self.target_longitude)
+            return result
+        else:
+            raise TypeError("data must be an xarray.DataArray or xarray.Dataset")
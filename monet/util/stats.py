@@ -1,7 +1,107 @@
+"""Model evaluation statistics.
+
+Each metric takes paired observations and model values, as (masked)
+NumPy arrays reduced over `axis`, or as :class:`xarray.DataArray`
+(optionally dask-backed) reduced over the named `dim`, e.g.
+``MB(obs_da, mod_da, dim="time")`` for a bias map.
+"""
+
+import functools
+
 import numpy as np
-from pandas import DataFrame, crosstab
+import xarray as xr
+
+
+def _xarray_metric(func):
+    """Let the metric `func` (``func(obs, mod, axis=None)``) take
+    :class:`xarray.DataArray` input, reducing over the named `dim`.
+
+    NaN is treated as missing (as a mask) for xarray input, and dask-backed
+    arrays stay lazy: the metric is evaluated block by block with
+    :func:`xarray.apply_ufunc`, in parallel over the chunks of the dimensions
+    that are not reduced (the reduced dimensions are rechunked to one chunk).
+    """
+
+    @functools.wraps(func)
+    def wrapper(obs, mod, axis=None, dim=None):
+        if not isinstance(obs, xr.DataArray) and not isinstance(mod, xr.DataArray):
+            if dim is not None:
+                raise TypeError("`dim` needs xarray.DataArray input, use `axis`")
+            return func(obs, mod, axis=axis)
+        if axis is not None:
+            raise TypeError("use `dim` instead of `axis` for xarray.DataArray input")
+        if not isinstance(obs, xr.DataArray) or not isinstance(mod, xr.DataArray):
+            raise TypeError("`obs` and `mod` must both be xarray.DataArray")
+        obs, mod = xr.broadcast(obs, mod)
+        if dim is None:
+            dims = list(obs.dims)
+        elif isinstance(dim, str):
+            dims = [dim]
+        else:
+            dims = list(dim)
+
+        def kernel(o, m):
+            shape = o.shape[: o.ndim - len(dims)] + (-1,)
+            o = np.ma.masked_invalid(o.reshape(shape))
+            m = np.ma.masked_invalid(m.reshape(shape))
+            out = func(o, m, axis=-1)
+            return np.ma.filled(np.ma.asarray(out, dtype=float), np.nan)
+
+        out = xr.apply_ufunc(
+            kernel,
+            obs,
+            mod,
+            input_core_dims=[dims, dims],
+            dask="parallelized",
+            output_dtypes=[float],
+            dask_gufunc_kwargs={"allow_rechunk": True},
+        )
+        return out.rename(func.__name__)
+
+    return wrapper
+
+
+def _xarray_peak_metric(func):
+    """Let the paired space/unpaired time peak metric `func` take
+    :class:`xarray.DataArray` input.
+
+    `dim` names the time dimension the peaks are taken over (by default the
+    first dimension, like ``paxis=0``); all other dimensions are space. The
+    result is a scalar, so dask-backed input is reduced in a single lazy task.
+    """
+
+    @functools.wraps(func)
+    def wrapper(obs, mod, axis=None, dim=None):
+        if not isinstance(obs, xr.DataArray) and not isinstance(mod, xr.DataArray):
+            if dim is not None:
+                raise TypeError("`dim` needs xarray.DataArray input")
+            return func(obs, mod, axis=axis)
+        if not isinstance(obs, xr.DataArray) or not isinstance(mod, xr.DataArray):
+            raise TypeError("`obs` and `mod` must both be xarray.DataArray")
+        obs, mod = xr.broadcast(obs, mod)
+        time = obs.dims[0] if dim is None else dim
+        dims = [time] + [d for d in obs.dims if d != time]
+
+        def kernel(o, m):
+            o = np.ma.masked_invalid(o.reshape(o.shape[0], -1))
+            m = np.ma.masked_invalid(m.reshape(m.shape[0], -1))
+            return np.ma.filled(np.ma.asarray(func(o, m), dtype=float), np.nan)
+
+        out = xr.apply_ufunc(
+            kernel,
+            obs,
+            mod,
+            input_core_dims=[dims, dims],
+            dask="parallelized",
+            output_dtypes=[float],
+            dask_gufunc_kwargs={"allow_rechunk": True},
+        )
+        return out.rename(func.__name__)
+
+    return wrapper
 
 
+@_xarray_metric
 def STDO(obs, mod, axis=None):
     """Standard deviation of Observations
 
@@ -24,6 +124,7 @@ def STDO(obs, mod, axis=None):
     return np.ma.std(obs, axis=axis)
 
 
+@_xarray_metric
 def STDP(obs, mod, axis=None):
     """Standard deviation of Predictions
 
@@ -46,6 +147,7 @@ def STDP(obs, mod, axis=None):
     return np.ma.std(mod, axis=axis)
 
 
+@_xarray_metric
 def MNB(obs, mod, axis=None):
     """Mean Normalized Bias (%)
 
@@ -68,6 +170,7 @@ def MNB(obs, mod, axis=None):
     return np.ma.masked_invalid((mod - obs) / obs).mean(axis=axis) * 100.0
 
 
+@_xarray_metric
 def MNE(obs, mod, axis=None):
     """Mean Normalized Gross Error (%)
 
@@ -90,6 +193,7 @@ def MNE(obs, mod, axis=None):
     return np.ma.masked_invalid(np.ma.abs(mod - obs) / obs).mean(axis=axis) * 100.0
 
 
+@_xarray_metric
 def MdnNB(obs, mod, axis=None):
     """Median Normalized Bias (%)
 
@@ -112,6 +216,7 @@ def MdnNB(obs, mod, axis=None):
     return np.ma.median(np.ma.masked_invalid((mod - obs) / obs), axis=axis) * 100.0
 
 
+@_xarray_metric
 def MdnNE(obs, mod, axis=None):
     """Median Normalized Gross Error (%)
 
@@ -134,6 +239,7 @@ def MdnNE(obs, mod, axis=None):
     return np.ma.median(np.ma.masked_invalid(np.ma.abs(mod - obs) / obs), axis=axis) * 100.0
 
 
+@_xarray_metric
 def NMdnGE(obs, mod, axis=None):
     """Normalized Median Gross Error (%)
 
@@ -156,6 +262,7 @@ def NMdnGE(obs, mod, axis=None):
     return np.ma.masked_invalid(np.ma.abs(mod - obs).mean(axis=axis) / obs.mean(axis=axis)) * 100.0
 
 
+@_xarray_metric
 def NO(obs, mod, axis=None):
     """N Observations (#)
 
@@ -178,6 +285,7 @@ def NO(obs, mod, axis=None):
     return (~np.ma.getmaskarray(obs)).sum(axis=axis)  # True where masked
 
 
+@_xarray_metric
 def NOP(obs, mod, axis=None):
     """N Observations/Prediction Pairs (#)
 
@@ -201,6 +309,7 @@ def NOP(obs, mod, axis=None):
     return (~np.ma.getmaskarray(obsc)).sum(axis=axis)
 
 
+@_xarray_metric
 def NP(obs, mod, axis=None):
     """N Predictions (#)
 
@@ -222,6 +331,7 @@ def NP(obs, mod, axis=None):
     return (~np.ma.getmaskarray(mod)).sum(axis=axis)
 
 
+@_xarray_metric
 def MO(obs, mod, axis=None):
     """Mean Observations (obs unit)
 
@@ -243,6 +353,7 @@ def MO(obs, mod, axis=None):
     return obs.mean(axis=axis)
 
 
+@_xarray_metric
 def MP(obs, mod, axis=None):
     """Mean Predictions (model unit)
 
@@ -264,6 +375,7 @@ def MP(obs, mod, axis=None):
     return mod.mean(axis=axis)
 
 
+@_xarray_metric
 def MdnO(obs, mod, axis=None):
     """Median Observations (obs unit)
 
@@ -285,6 +397,7 @@ def MdnO(obs, mod, axis=None):
     return np.ma.median(obs, axis=axis)
 
 
+@_xarray_metric
 def MdnP(obs, mod, axis=None):
     """Median Predictions (model unit)
 
@@ -307,6 +420,7 @@ def MdnP(obs, mod, axis=None):
     return np.ma.median(mod, axis=axis)
 
 
+@_xarray_metric
 def RM(obs, mod, axis=None):
     """Mean Ratio Observations/Predictions (none)
 
@@ -329,6 +443,7 @@ def RM(obs, mod, axis=None):
     return np.ma.masked_invalid(obs / mod).mean(axis=axis)
 
 
+@_xarray_metric
 def RMdn(obs, mod, axis=None):
     """Median Ratio Observations/Predictions (none)
 
@@ -351,6 +466,7 @@ def RMdn(obs, mod, axis=None):
     return np.ma.median(np.ma.masked_invalid(obs / mod), axis=axis)
 
 
+@_xarray_metric
 def MB(obs, mod, axis=None):
     """Mean Bias
 
@@ -373,6 +489,7 @@ def MB(obs, mod, axis=None):
     return (mod - obs).mean(axis=axis)
 
 
+@_xarray_metric
 def MdnB(obs, mod, axis=None):
     """Median Bias
 
@@ -395,6 +512,7 @@ def MdnB(obs, mod, axis=None):
     return np.ma.median(mod - obs, axis=axis)
 
 
+@_xarray_metric
 def WDMB_m(obs, mod, axis=None):
     """Wind Direction Mean Bias (avoid single block error in np.ma)
 
@@ -417,6 +535,7 @@ def WDMB_m(obs, mod, axis=None):
     return circlebias_m(mod - obs).mean(axis=axis)
 
 
+@_xarray_metric
 def WDMB(obs, mod, axis=None):
     """Wind Direction Mean Bias
 
@@ -439,6 +558,7 @@ def WDMB(obs, mod, axis=None):
     return circlebias(mod - obs).mean(axis=axis)
 
 
+@_xarray_metric
 def WDMdnB(obs, mod, axis=None):
     """Wind Direction Median Bias
 
@@ -461,6 +581,7 @@ def WDMdnB(obs, mod, axis=None):
     return np.ma.median(circlebias(mod - obs), axis=axis)
 
 
+@_xarray_metric
 def NMB(obs, mod, axis=None):
     """Normalized Mean Bias (%)
 
@@ -483,6 +604,7 @@ def NMB(obs, mod, axis=None):
     return (mod - obs).sum(axis=axis) / obs.sum(axis=axis) * 100.0
 
 
+@_xarray_metric
 def WDNMB_m(obs, mod, axis=None):
     """Wind Direction Normalized Mean Bias (%) (avoid single block error in np.ma)
 
@@ -505,6 +627,7 @@ def WDNMB_m(obs, mod, axis=None):
     return circlebias_m(mod - obs).sum(axis=axis) / obs.sum(axis=axis) * 100.0
 
 
+@_xarray_metric
 def NMB_ABS(obs, mod, axis=None):
     """Normalized Mean Bias - Absolute of the denominator (%)
 
@@ -527,6 +650,7 @@ def NMB_ABS(obs, mod, axis=None):
     return (mod - obs).sum(axis=axis) / np.abs(obs.sum(axis=axis)) * 100.0
 
 
+@_xarray_metric
 def NMdnB(obs, mod, axis=None):
     """Normalized Median Bias (%)
 
@@ -549,6 +673,7 @@ def NMdnB(obs, mod, axis=None):
     return np.ma.median(mod - obs, axis=axis) / np.ma.median(obs, axis=axis) * 100.0
 
 
+@_xarray_metric
 def FB(obs, mod, axis=None):
     """Fractional Bias (%)
 
@@ -571,6 +696,7 @@ def FB(obs, mod, axis=None):
     return ((np.ma.masked_invalid((mod - obs) / (mod + obs))).mean(axis=axis) * 2.0) * 100.0
 
 
+@_xarray_metric
 def ME(obs, mod, axis=None):
     """Mean Gross Error (model and obs unit)
 
@@ -593,6 +719,7 @@ def ME(obs, mod, axis=None):
     return np.ma.abs(mod - obs).mean(axis=axis)
 
 
+@_xarray_metric
 def MdnE(obs, mod, axis=None):
     """Median Gross Error (model and obs unit)
 
@@ -615,6 +742,7 @@ def MdnE(obs, mod, axis=None):
     return np.ma.median(np.ma.abs(mod - obs), axis=axis)
 
 
+@_xarray_metric
 def WDME_m(obs, mod, axis=None):
     """Wind Direction Mean Gross Error (model and obs unit)
     (avoid single block error in np.ma)
@@ -638,6 +766,7 @@ def WDME_m(obs, mod, axis=None):
     return np.abs(circlebias_m(mod - obs)).mean(axis=axis)
 
 
+@_xarray_metric
 def WDME(obs, mod, axis=None):
     """Wind Direction Mean Gross Error (model and obs unit)
 
@@ -659,6 +788,7 @@ def WDME(obs, mod, axis=None):
     return np.ma.abs(circlebias(mod - obs)).mean(axis=axis)
 
 
+@_xarray_metric
 def WDMdnE(obs, mod, axis=None):
     """Wind Direction Median Gross Error (model and obs unit)
 
@@ -681,6 +811,7 @@ def WDMdnE(obs, mod, axis=None):
     return np.ma.median(np.ma.abs(cb), axis=axis)
 
 
+@_xarray_metric
 def NME_m(obs, mod, axis=None):
     """Normalized Mean Error (%) (avoid single block error in np.ma)
 
@@ -704,6 +835,7 @@ def NME_m(obs, mod, axis=None):
     return out
 
 
+@_xarray_metric
 def NME_m_ABS(obs, mod, axis=None):
     """Normalized Mean Error (%) - Absolute of the denominator
     (avoid single block error in np.ma)
@@ -728,6 +860,7 @@ def NME_m_ABS(obs, mod, axis=None):
     return out
 
 
+@_xarray_metric
 def NME(obs, mod, axis=None):
     """Normalized Mean Error (%)
 
@@ -751,6 +884,7 @@ def NME(obs, mod, axis=None):
     return out
 
 
+@_xarray_metric
 def NMdnE(obs, mod, axis=None):
     """Normalized Median Error (%)
 
@@ -774,6 +908,7 @@ def NMdnE(obs, mod, axis=None):
     return out
 
 
+@_xarray_metric
 def FE(obs, mod, axis=None):
     """Fractional Error (%)
 
@@ -796,6 +931,7 @@ def FE(obs, mod, axis=None):
     return (np.ma.abs(mod - obs) / (mod + obs)).mean(axis=axis) * 2.0 * 100.0
 
 
+@_xarray_metric
 def USUTPB(obs, mod, axis=None):
     """Unpaired Space/Unpaired Time Peak Bias (%)
 
@@ -818,6 +954,7 @@ def USUTPB(obs, mod, axis=None):
     return ((mod.max(axis=axis) - obs.max(axis=axis)) / obs.max(axis=axis)) * 100.0
 
 
+@_xarray_metric
 def USUTPE(obs, mod, axis=None):
     """Unpaired Space/Unpaired Time Peak Error (%)
 
@@ -1061,6 +1198,7 @@ def NMdnPE(obs, mod, paxis, axis=None):
     )
 
 
+@_xarray_peak_metric
 def PSUTMNPB(obs, mod, axis=None):
     """Paired Space/Unpaired Time Mean Normalized Peak Bias (%)
 
@@ -1083,6 +1221,7 @@ def PSUTMNPB(obs, mod, axis=None):
     return MNPB(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTMdnNPB(obs, mod, axis=None):
     """Paired Space/Unpaired Time Median Normalized Peak Bias (%)
 
@@ -1105,6 +1244,7 @@ def PSUTMdnNPB(obs, mod, axis=None):
     return MdnNPB(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTMNPE(obs, mod, axis=None):
     """Paired Space/Unpaired Time Mean Normalized Peak Error (%)
 
@@ -1127,6 +1267,7 @@ def PSUTMNPE(obs, mod, axis=None):
     return MNPE(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTMdnNPE(obs, mod, axis=None):
     """Paired Space/Unpaired Time Median Normalized Peak Error (%)
 
@@ -1149,6 +1290,7 @@ def PSUTMdnNPE(obs, mod, axis=None):
     return MdnNPE(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTNMPB(obs, mod, axis=None):
     """Paired Space/Unpaired Time Normalized Mean Peak Bias (%)
 
@@ -1171,6 +1313,7 @@ def PSUTNMPB(obs, mod, axis=None):
     return NMPB(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTNMPE(obs, mod, axis=None):
     """Paired Space/Unpaired Time Normalized Mean Peak Error (%)
 
@@ -1193,6 +1336,7 @@ def PSUTNMPE(obs, mod, axis=None):
     return NMPE(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTNMdnPB(obs, mod, axis=None):
     """Paired Space/Unpaired Time Normalized Median Peak Bias (%)
 
@@ -1215,6 +1359,7 @@ def PSUTNMdnPB(obs, mod, axis=None):
     return NMdnPB(obs, mod, paxis=0, axis=None)
 
 
+@_xarray_peak_metric
 def PSUTNMdnPE(obs, mod, axis=None):
     """Paired Space/Unpaired Time Normalized Median Peak Error (%)
 
@@ -1237,34 +1382,242 @@ def PSUTNMdnPE(obs, mod, axis=None):
     return NMdnPE(obs, mod, paxis=0, axis=None)
 
 
+#: peak metrics of :func:`peak_stats`
+PEAK_METRICS = ("MNPB", "MdnNPB", "MNPE", "MdnNPE", "NMPB", "NMdnPB", "NMPE", "NMdnPE")
+
+
+def _as_timeseries(x, dim):
+    """`x` as a :class:`xarray.DataArray` with time dimension `dim`.
+
+    A time-indexed :class:`pandas.Series` becomes 1-D, a time-indexed
+    :class:`pandas.DataFrame` becomes ``(dim, site)`` with one site per column
+    (the site dimension is named after ``columns.name``, default ``"site"``).
+    """
+    import pandas as pd
+
+    if isinstance(x, xr.DataArray):
+        return x
+    if isinstance(x, pd.Series):
+        return xr.DataArray(x.to_numpy(dtype=float), coords={dim: x.index.values}, dims=[dim])
+    if isinstance(x, pd.DataFrame):
+        sites = x.columns.name or "site"
+        return xr.DataArray(
+            x.to_numpy(dtype=float),
+            coords={dim: x.index.values, sites: x.columns.values},
+            dims=[dim, sites],
+        )
+    raise TypeError(f"expected a time-indexed DataArray, Series or DataFrame, got {type(x)}")
+
+
+def _daily_max(da, dim, offset_hours=0):
+    """Daily maximum of `da` over days shifted by `offset_hours` from UTC."""
+    if offset_hours:
+        shift = np.timedelta64(int(round(offset_hours * 3600)), "s")
+        da = da.assign_coords({dim: da[dim] + shift})
+    return da.resample({dim: "1D"}).max()
+
+
+def window_peaks(da, window="daily", gmt_offset=None, dim="time"):
+    """Peak value of each day, without reshaping into (day, hour) blocks.
+
+    Parameters
+    ----------
+    da : xarray.DataArray or pandas.Series or pandas.DataFrame
+        Hourly, time-indexed data (a DataFrame has one column per site).
+    window : {"daily", "8h"}
+        ``"daily"`` takes the daily maximum of the values; ``"8h"`` the daily
+        maximum of the 8-h running means, each assigned to the day of its
+        first hour (at least 6 valid hours per mean).
+    gmt_offset : float or xarray.DataArray or pandas.Series, optional
+        Hours from UTC to local time, to use local days. Either one value,
+        or one value per site (a DataArray along the site dimension, or a
+        Series indexed by site).
+    dim : str
+        Time dimension.
+
+    Returns
+    -------
+    xarray.DataArray
+        Peaks, with `dim` holding the (local) days.
+    """
+    import pandas as pd
+
+    if window not in ("daily", "8h"):
+        raise ValueError(f"window must be 'daily' or '8h', got {window!r}")
+    da = _as_timeseries(da, dim)
+    if window == "8h":
+        # NaN padding keeps the (partial) windows that start near the end
+        n = da.sizes[dim]
+        da = da.pad({dim: (0, 7)}).rolling({dim: 8}, min_periods=6).mean()
+        da = da.shift({dim: -7}).isel({dim: slice(0, n)})
+    if gmt_offset is None or np.isscalar(gmt_offset):
+        return _daily_max(da, dim, gmt_offset or 0)
+
+    if isinstance(gmt_offset, pd.Series):
+        sites = [d for d in da.dims if d != dim]
+        if len(sites) != 1:
+            raise ValueError("a per-site gmt_offset needs data with one site dimension")
+        gmt_offset = xr.DataArray(gmt_offset.values, coords={sites[0]: gmt_offset.index.values})
+    sdim = gmt_offset.dims[0]
+    gmt_offset = gmt_offset.reindex({sdim: da[sdim]})
+    # one resample per distinct offset (a few time zones), not per site
+    parts = []
+    for value in np.unique(gmt_offset.values[np.isfinite(gmt_offset.values)]):
+        idx = np.nonzero(gmt_offset.values == value)[0]
+        parts.append(_daily_max(da.isel({sdim: idx}), dim, value))
+    return xr.concat(parts, dim=sdim, join="outer").reindex({sdim: da[sdim]})
+
+
+def peak_stats(
+    obs, mod, metrics=PEAK_METRICS, window="daily", gmt_offset=None, dim="time", reduce_dim=None
+):
+    """Peak metrics of time-indexed paired data, for every site at once.
+
+    The daily peaks of `obs` and `mod` are taken with :func:`window_peaks`,
+    then each metric (e.g. :func:`MNPB`) compares the paired peaks over
+    `reduce_dim`.
+
+    Parameters
+    ----------
+    obs, mod : xarray.DataArray or pandas.Series or pandas.DataFrame
+        Hourly, time-indexed observations and model values; a DataFrame has
+        one column per site. Only common times and sites are used.
+    metrics : list of str
+        Names from :data:`PEAK_METRICS`.
+    window, gmt_offset, dim
+        As for :func:`window_peaks`.
+    reduce_dim : str or list of str, optional
+        Dimension(s) the metrics reduce over; defaults to `dim`, which gives
+        one value per site.
+
+    Returns
+    -------
+    xarray.Dataset
+        One variable per metric.
+    """
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    unknown = [name for name in metrics if name not in PEAK_METRICS]
+    if unknown:
+        raise ValueError(f"unknown peak metrics {unknown}, choose from {list(PEAK_METRICS)}")
+    obs, mod = xr.align(_as_timeseries(obs, dim), _as_timeseries(mod, dim))
+    po = window_peaks(obs, window, gmt_offset, dim)
+    pm = window_peaks(mod, window, gmt_offset, dim)
+    dims = (
+        [dim]
+        if reduce_dim is None
+        else [reduce_dim] if isinstance(reduce_dim, str) else list(reduce_dim)
+    )
+
+    def kernel(o, m, func):
+        o = o.reshape(o.shape[: o.ndim - len(dims)] + (-1, 1))
+        m = m.reshape(o.shape)
+        missing = ~(np.isfinite(o) & np.isfinite(m))
+        o = np.ma.array(o, mask=missing)
+        m = np.ma.array(m, mask=missing)
+        out = func(o, m, paxis=-1, axis=-1)
+        return np.ma.filled(np.ma.asarray(out, dtype=float), np.nan)
+
+    out = xr.Dataset()
+    for name in metrics:
+        out[name] = xr.apply_ufunc(
+            kernel,
+            po,
+            pm,
+            kwargs={"func": globals()[name]},
+            input_core_dims=[dims, dims],
+            dask="parallelized",
+            output_dtypes=[float],
+            dask_gufunc_kwargs={"allow_rechunk": True},
+        )
+    return out
+
+
+def _paired_moments(obs, mod, axis=None):
+    """Count, means and centered sums of squares/products of the pairs
+    where neither `obs` nor `mod` is masked or NaN, along `axis`."""
+    o = np.ma.filled(np.ma.asarray(obs, dtype=float), np.nan)
+    m = np.ma.filled(np.ma.asarray(mod, dtype=float), np.nan)
+    o, m = np.broadcast_arrays(o, m)
+    valid = np.isfinite(o) & np.isfinite(m)
+    n = valid.sum(axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        obar = np.where(valid, o, 0.0).sum(axis=axis) / n
+        mbar = np.where(valid, m, 0.0).sum(axis=axis) / n
+    if axis is not None:
+        do = np.where(valid, o - np.expand_dims(obar, axis), 0.0)
+        dm = np.where(valid, m - np.expand_dims(mbar, axis), 0.0)
+    else:
+        do = np.where(valid, o - obar, 0.0)
+        dm = np.where(valid, m - mbar, 0.0)
+    return (
+        n,
+        obar,
+        mbar,
+        (do * do).sum(axis=axis),
+        (dm * dm).sum(axis=axis),
+        (do * dm).sum(axis=axis),
+    )
+
+
+def _ma_result(x, axis):
+    return float(x) if axis is None else np.ma.masked_invalid(x)
+
+
+def ols(obs, mod, axis=None):
+    """Ordinary least squares fit ``mod = intercept + slope * obs``
+    along `axis`, in closed form.
+
+    Only pairs where neither `obs` nor `mod` is masked (or NaN) are used.
+
+    Parameters
+    ----------
+    obs : array-like
+        Observations (predictor).
+    mod : array-like
+        Model values (response).
+    axis : int, optional
+        Axis to fit along; all values by default.
+
+    Returns
+    -------
+    slope, intercept, r : float or numpy.ma.MaskedArray
+        Slope, intercept and Pearson correlation, masked where the fit is
+        undefined (fewer than two pairs or no variance).
+    """
+    n, obar, mbar, sxx, syy, sxy = _paired_moments(obs, mod, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = sxy / sxx
+        intercept = mbar - slope * obar
+        r = sxy / np.sqrt(sxx * syy)
+    return _ma_result(slope, axis), _ma_result(intercept, axis), _ma_result(r, axis)
+
+
+@_xarray_metric
 def R2(obs, mod, axis=None):
     """Coefficient of Determination (unit squared)
 
+    Square of the Pearson correlation of the pairs where neither `obs`
+    nor `mod` is masked (see :func:`ols`).
+
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        Observations.
+    mod : array-like
+        Model values.
+    axis : int, optional
+        Axis along which to compute, e.g. time for a correlation map.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.ma.MaskedArray
 
     """
-
-    from scipy.stats import pearsonr
-
-    if axis is None:
-        obsc, modc = matchedcompressed(obs, mod)
-        return pearsonr(obsc, modc)[0] ** 2
-    else:
-        raise ValueError("Not ready yet")
+    r = ols(obs, mod, axis=axis)[2]
+    return r**2
 
 
+@_xarray_metric
 def RMSE(obs, mod, axis=None):
     """Root Mean Square Error (model unit)
 
@@ -1286,6 +1639,7 @@ def RMSE(obs, mod, axis=None):
     return np.ma.sqrt(((mod - obs) ** 2).mean(axis=axis))
 
 
+@_xarray_metric
 def WDRMSE_m(obs, mod, axis=None):
     """Wind Direction Root Mean Square Error (model unit) (avoid single block error in np.ma)
 
@@ -1307,6 +1661,7 @@ def WDRMSE_m(obs, mod, axis=None):
     return np.sqrt(((circlebias_m(mod - obs)) ** 2).mean(axis=axis))
 
 
+@_xarray_metric
 def WDRMSE(obs, mod, axis=None):
     """Wind Direction Root Mean Square Error (model unit)
 
@@ -1328,36 +1683,33 @@ def WDRMSE(obs, mod, axis=None):
     return np.ma.sqrt(((circlebias(mod - obs)) ** 2).mean(axis=axis))
 
 
+@_xarray_metric
 def RMSEs(obs, mod, axis=None):
     """Root Mean Squared Error (obs, mod_hat)
 
+    Systematic RMSE, with ``mod_hat`` the least-squares fit of `mod`
+    on `obs` (see :func:`ols`).
+
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        Observations.
+    mod : array-like
+        Model values.
+    axis : int, optional
+        Axis along which to compute.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.ma.MaskedArray
 
     """
-    if axis is None:
-        try:
-            from scipy.stats import linregress
-
-            obsc, modc = matchedcompressed(obs, mod)
-            m, b, rval, pval, stderr = linregress(obsc, modc)
-            mod_hat = b + m * obs
-            return RMSE(obs, mod_hat)
-        except ValueError:
-            return None
-    else:
-        raise ValueError("Not ready yet")
+    n, obar, mbar, sxx, syy, sxy = _paired_moments(obs, mod, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = sxy / sxx
+        # mean((intercept + slope * obs - obs) ** 2)
+        out = np.sqrt((slope - 1) ** 2 * sxx / n + (mbar - obar) ** 2)
+    return _ma_result(out, axis)
 
 
 def matchmasks(a1, a2):
@@ -1400,38 +1752,34 @@ def matchedcompressed(a1, a2):
     return a1.compressed(), a2.compressed()
 
 
+@_xarray_metric
 def RMSEu(obs, mod, axis=None):
     """Root Mean Squared Error (mod_hat, mod)
 
+    Unsystematic RMSE, with ``mod_hat`` the least-squares fit of `mod`
+    on `obs` (see :func:`ols`).
+
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    axis : type
-        Description of parameter `axis`.
+    obs : array-like
+        Observations.
+    mod : array-like
+        Model values.
+    axis : int, optional
+        Axis along which to compute.
 
     Returns
     -------
-    type
-        Description of returned object.
+    float or numpy.ma.MaskedArray
 
     """
-    if axis is None:
-        try:
-            from scipy.stats import linregress
-
-            obsc, modc = matchedcompressed(obs, mod)
-            m, b, rval, pval, stderr = linregress(obsc, modc)
-            mod_hat = b + m * obs
-            return RMSE(mod_hat, mod)
-        except ValueError:
-            return None
-    else:
-        raise ValueError("Not ready yet")
+    n, obar, mbar, sxx, syy, sxy = _paired_moments(obs, mod, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.sqrt(np.maximum(syy - sxy**2 / sxx, 0.0) / n)
+    return _ma_result(out, axis)
 
 
+@_xarray_metric
 def d1(obs, mod, axis=None):
     """Modified Index of Agreement, d1
 
@@ -1450,14 +1798,16 @@ def d1(obs, mod, axis=None):
         Description of returned object.
 
     """
+    obsmean = obs.mean(axis=axis)
+    if axis is not None:
+        obsmean = np.expand_dims(obsmean, axis=axis)
     return 1.0 - (
         (np.ma.abs(obs - mod)).sum(axis=axis)
-        / (np.ma.abs(mod - obs.mean(axis=axis)) + np.ma.abs(obs - obs.mean(axis=axis))).sum(
-            axis=axis
-        )
+        / (np.ma.abs(mod - obsmean) + np.ma.abs(obs - obsmean)).sum(axis=axis)
     )
 
 
+@_xarray_metric
 def E1(obs, mod, axis=None):
     """Modified Coefficient of Efficiency, E1
 
@@ -1476,12 +1826,13 @@ def E1(obs, mod, axis=None):
         Description of returned object.
 
     """
-    return 1.0 - (
-        (np.ma.abs(obs - mod)).sum(axis=axis)
-        / (np.ma.abs(obs - obs.mean(axis=axis))).sum(axis=axis)
-    )
+    obsmean = obs.mean(axis=axis)
+    if axis is not None:
+        obsmean = np.expand_dims(obsmean, axis=axis)
+    return 1.0 - ((np.ma.abs(obs - mod)).sum(axis=axis) / (np.ma.abs(obs - obsmean)).sum(axis=axis))
 
 
+@_xarray_metric
 def IOA_m(obs, mod, axis=None):
     """Index of Agreement, IOA (avoid single block error in np.ma)
 
@@ -1509,6 +1860,7 @@ def IOA_m(obs, mod, axis=None):
     )
 
 
+@_xarray_metric
 def IOA(obs, mod, axis=None):
     """Index of Agreement, IOA
 
@@ -1574,6 +1926,7 @@ def circlebias(b):
     return b
 
 
+@_xarray_metric
 def WDIOA_m(obs, mod, axis=None):
     """Wind Direction Index of Agreement, IOA (avoid single block error in np.ma)
 
@@ -1606,6 +1959,7 @@ def WDIOA_m(obs, mod, axis=None):
     )
 
 
+@_xarray_metric
 def WDIOA(obs, mod, axis=None):
     """Wind Direction Index of Agreement, IOA
 
@@ -1639,6 +1993,7 @@ def WDIOA(obs, mod, axis=None):
     )
 
 
+@_xarray_metric
 def AC(obs, mod, axis=None):
     """Anomaly Correlation
 
@@ -1665,6 +2020,7 @@ def AC(obs, mod, axis=None):
     return p1 / p2
 
 
+@_xarray_metric
 def WDAC(obs, mod, axis=None):
     """Wind Direction Anomaly Correlation
 
@@ -1716,7 +2072,7 @@ def HSS(obs, mod, minval, maxval):
     """
     a, b, c, d = scores(obs, mod, minval, maxval=maxval)
     hss = 2 * (a * d - b * c) / ((a + c) * (c + d) + (a + b) * (b + d))
-    print("HSS for range " + str(minval) + " --> " + str(maxval) + ": " + hss)
+    print(f"HSS for range {minval} --> {maxval}: {hss}")
     return hss
 
 
@@ -1743,7 +2099,7 @@ def ETS(obs, mod, minval, maxval):
     a, b, c, d = scores(obs, mod, minval, maxval=maxval)
     ar = (a + b) * (a + c) / (a + b + c + d)
     ets = (a - ar) / (a + b + c - ar)
-    print("ETS for range " + str(minval) + " --> " + str(maxval) + ": " + ets)
+    print(f"ETS for range {minval} --> {maxval}: {ets}")
     return ets
 
 
@@ -1768,82 +2124,83 @@ def CSI(obs, mod, minval, maxval):
 
     """
     a, b, c, d = scores(obs, mod, minval, maxval=maxval)
-    csi = a / a + b + c
-    print("CSI for range " + str(minval) + " --> " + str(maxval) + ": " + csi)
+    csi = a / (a + b + c)
+    print(f"CSI for range {minval} --> {maxval}: {csi}")
     return csi
 
 
 def scores(obs, mod, minval, maxval=1.0e5):
-    """Short summary.
+    """Contingency table counts for the event ``minval < value < maxval``.
 
     Parameters
     ----------
-    obs : type
-        Description of parameter `obs`.
-    mod : type
-        Description of parameter `mod`.
-    minval : type
-        Description of parameter `minval`.
-    maxval : type
-        Description of parameter `maxval`.
+    obs : array-like
+        Observations.
+    mod : array-like
+        Model values.
+    minval : float
+        Lower bound of the event (exclusive).
+    maxval : float
+        Upper bound of the event (exclusive).
 
     Returns
     -------
-    type
-        Description of returned object.
+    a, b, c, d : float
+        Hits, misses (observed, not modeled), false alarms (modeled, not
+        observed) and correct negatives. Missing values count as no event.
 
+    See Also
+    --------
+    monet.util.categorical.categorical_scores : scores for many thresholds at once.
     """
-    d = {}
-    d["obs"] = obs
-    d["mod"] = mod
-    df = DataFrame(d)
-    ct = crosstab(
-        (df["mod"] > minval) & (df["mod"] < maxval),
-        (df["obs"] > minval) & (df["obs"] < maxval),
-        margins=True,
-    )
-    #    print ct
-    a = ct[1][1].astype("float")
-    b = ct[1][0].astype("float")
-    c = ct[0][1].astype("float")
-    d = ct[0][0].astype("float")
+    o = np.ma.filled(np.ma.asarray(obs, dtype=float), np.nan)
+    m = np.ma.filled(np.ma.asarray(mod, dtype=float), np.nan)
+    with np.errstate(invalid="ignore"):
+        obs_yes = (o > minval) & (o < maxval)
+        mod_yes = (m > minval) & (m < maxval)
+    a = float(np.count_nonzero(obs_yes & mod_yes))
+    b = float(np.count_nonzero(obs_yes & ~mod_yes))
+    c = float(np.count_nonzero(~obs_yes & mod_yes))
+    d = float(np.count_nonzero(~obs_yes & ~mod_yes))
     return a, b, c, d
 
 
-def stats(df, minval, maxval):
-    """Short summary.
+def stats(df, minval, maxval, obs="Obs", mod="CMAQ"):
+    """Summary statistics of a paired DataFrame.
+
+    A single-row shortcut for :func:`monet.util.fusedstats.stats_report`,
+    which builds the same table for any columns, metrics, groups and
+    thresholds.
 
     Parameters
     ----------
-    df : type
-        Description of parameter `df`.
-    minval : type
-        Description of parameter `minval`.
-    maxval : type
-        Description of parameter `maxval`.
+    df : pandas.DataFrame
+        Paired data.
+    minval, maxval : float
+        Event range of ``POD`` and ``FAR`` (see :func:`scores`).
+    obs, mod : str
+        Observation and model columns.
 
     Returns
     -------
-    type
-        Description of returned object.
+    dict
+        ``N``, ``Obs``, ``Mod``, ``MB``, ``R``, ``IOA``, ``RMSE``, ``NMB``,
+        ``POD`` and ``FAR``. ``Obs`` and ``Mod`` are the means of all values
+        of each column; ``MB``, ``R``, ``IOA``, ``RMSE`` and ``NMB`` use the
+        valid pairs only (they were NaN when any value was missing). ``R``
+        is ``sqrt(R2)``, the absolute value of the correlation coefficient.
 
     """
-    from numpy import sqrt
+    from .fusedstats import stats_report
 
-    dd = {}
-    dd["N"] = df.Obs.dropna().count()
-    dd["Obs"] = df.Obs.mean()
-    dd["Mod"] = df.CMAQ.mean()
-    dd["MB"] = MB(df.Obs.values, df.CMAQ.values)  # mean bias
-    dd["R"] = sqrt(R2(df.Obs.values, df.CMAQ.values))  # pearsonr ** 2
-    dd["IOA"] = IOA(df.Obs.values, df.CMAQ.values)  # Index of Agreement
-    dd["RMSE"] = RMSE(df.Obs.values, df.CMAQ.values)
-    dd["NMB"] = NMB(df.Obs.values, df.CMAQ.values)
-    try:
-        a, b, c, d = scores(df.Obs.values, df.CMAQ.values, 70, 1000)
-        dd["POD"] = a / (a + b)
-        dd["FAR"] = c / (a + c)
-    except Exception:
-        dd["POD"] = 1.0
-        dd["FAR"] = 0.0
+    row = stats_report(df, obs=obs, mod=mod, metrics=["MB", "R", "IOA", "RMSE", "NMB"])
+    dd = {"N": df[obs].dropna().count()}
+    # column means over all values, not only the valid pairs
+    dd["Obs"], dd["Mod"] = df[obs].mean(), df[mod].mean()
+    for name in ["MB", "R", "IOA", "RMSE", "NMB"]:
+        dd[name] = row[name].iloc[0]
+    dd["R"] = abs(dd["R"])
+    a, b, c, d = scores(df[obs].values, df[mod].values, minval, maxval)
+    dd["POD"] = a / (a + b) if a + b else 1.0
+    dd["FAR"] = c / (a + c) if a + c else 0.0
     return dd
@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 
 __author__ = "barry"
@@ -51,25 +53,259 @@ def _force_forder(x):
         return (x, False)
 
 
-def kolmogorov_zurbenko_filter(df, col, window, iterations):
-    """KZ filter implementation
-    series is a pandas series
-    window is the filter window m in the units of the data (m = 2q+1)
-    iterations is the number of times the moving average is evaluated
+def _window_means(x, lo, hi, min_periods):
+    """Means of the valid values of ``x[..., lo:hi]`` for each position, from cumulative sums.
+
+    `lo` and `hi` (exclusive) are clipped to the array; rows are centered
+    first so the sums do not lose precision on long records.
     """
-    df.index = df.time_local
-    z = df.copy()
-    for i in range(iterations):
-        z.index = z.time_local
-        z = (
-            z.groupby("siteid")[col]
-            .rolling(window, center=True, min_periods=1)
-            .mean()
-            .reset_index()
-            .dropna()
-        )
+    n = x.shape[-1]
+    valid = np.isfinite(x)
+    with np.errstate(invalid="ignore"):
+        center = np.nanmean(np.where(valid, x, np.nan), axis=-1, keepdims=True)
+    center = np.where(np.isfinite(center), center, 0.0)
+    zero = np.zeros(x.shape[:-1] + (1,))
+    total = np.concatenate([zero, np.cumsum(np.where(valid, x - center, 0.0), axis=-1)], axis=-1)
+    count = np.concatenate([zero, np.cumsum(valid, axis=-1)], axis=-1)
+    lo = np.broadcast_to(np.clip(lo, 0, n), x.shape)
+    hi = np.broadcast_to(np.clip(hi, 0, n), x.shape)
+    c = np.take_along_axis(count, hi, -1) - np.take_along_axis(count, lo, -1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (np.take_along_axis(total, hi, -1) - np.take_along_axis(total, lo, -1)) / c + center
+    out[c < max(min_periods, 1)] = np.nan
+    return out
+
+
+def _by_rows(func, x, axis, max_workers, *args):
+    """Apply ``func(rows, *args)`` to `x` moved to ``(rows, axis)``, in chunks of rows
+    spread over `max_workers` threads (NumPy releases the GIL in the heavy loops)."""
+    x = np.moveaxis(np.asarray(x, dtype=float), axis, -1)
+    shape = x.shape
+    rows = x.reshape(-1, shape[-1])
+    if max_workers == 1 or rows.shape[0] < 2:
+        out = func(rows, *args)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        max_workers = max_workers or 4
+        chunks = np.array_split(np.arange(rows.shape[0]), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            parts = pool.map(lambda idx: func(rows[idx], *args), [c for c in chunks if c.size])
+            out = np.concatenate(list(parts))
+    return np.moveaxis(out.reshape(shape), -1, axis)
+
+
+def _kz_rows(x, window, iterations, min_periods):
+    t = np.arange(x.shape[-1])
+    left = window // 2
+    for _ in range(iterations):
+        x = _window_means(x, t - left, t + window - left, min_periods)
+    return x
+
+
+def kz_filter(x, window, iterations, min_periods=1, axis=-1, max_workers=1):
+    """Kolmogorov-Zurbenko filter KZ(`window`, `iterations`).
+
+    `iterations` passes of a centered moving average over `window` time
+    steps, each computed from cumulative sums (O(n) whatever the window).
+    Every row (site) is filtered at once.
+
+    Parameters
+    ----------
+    x : array-like
+        Regularly spaced data, e.g. ``(site, time)``; NaN for gaps.
+    window : int
+        Moving average window m (odd, m = 2q + 1, for a centered filter).
+    iterations : int
+        Number of moving averages k.
+    min_periods : int
+        Valid values needed in a window (else the average is NaN), as for
+        :meth:`pandas.Series.rolling`.
+    axis : int
+        Time axis.
+    max_workers : int, optional
+        Threads to spread the rows over (None: 4).
+
+    Returns
+    -------
+    numpy.ndarray
+        Filtered data, shaped like `x`.
+    """
+    return _by_rows(_kz_rows, x, axis, max_workers, int(window), int(iterations), min_periods)
+
+
+def _kza_rows(x, window, iterations, min_size, tol, min_periods):
+    n = x.shape[-1]
+    t = np.arange(n)
+    q = window // 2
+    # changes of the KZ smoothed series over +-q flag breaks
+    z = _kz_rows(x, window, iterations, min_periods)
+    z_ahead = np.take_along_axis(z, np.broadcast_to(np.minimum(t + q, n - 1), z.shape), -1)
+    z_behind = np.take_along_axis(z, np.broadcast_to(np.maximum(t - q, 0), z.shape), -1)
+    d = np.abs(z_ahead - z_behind)
+    d = np.where(np.isfinite(d), d, 0.0)
+    dprime = np.diff(d, axis=-1, append=d[..., -1:])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shrunk = np.floor(q * (1 - d / d.max(axis=-1, keepdims=True)))
+    shrunk = np.where(np.isfinite(shrunk), shrunk, q).astype(np.int64)
+    flat = np.abs(dprime) < tol
+    # shrink the window on the side of the break
+    head = np.where(flat | (dprime > 0), shrunk, q)
+    tail = np.where(flat | (dprime < 0), shrunk, q)
+    head = np.maximum(head, min_size)
+    tail = np.maximum(tail, min_size)
+    for _ in range(iterations):
+        x = _window_means(x, t - tail, t + head + 1, min_periods)
+    return x
+
+
+def kza_filter(
+    x, window, iterations, min_size=None, tol=1.0e-5, min_periods=1, axis=-1, max_workers=1
+):
+    """Adaptive Kolmogorov-Zurbenko filter KZA(`window`, `iterations`).
+
+    Like :func:`kz_filter`, but the window shrinks on the side of sharp
+    changes (breaks) of the KZ smoothed series, so they are not smeared
+    (Zurbenko et al., 1996).
+
+    Parameters
+    ----------
+    x : array-like
+        Regularly spaced data, e.g. ``(site, time)``; NaN for gaps.
+    window : int
+        Moving average window m (odd, m = 2q + 1).
+    iterations : int
+        Number of moving averages k.
+    min_size : int, optional
+        Smallest half window (default 5% of `window`).
+    tol : float
+        Changes of the break measure below `tol` count as flat.
+    min_periods, axis, max_workers
+        As for :func:`kz_filter`.
+
+    Returns
+    -------
+    numpy.ndarray
+        Filtered data, shaped like `x`.
+    """
+    window = int(window)
+    if min_size is None:
+        min_size = int(round(0.05 * window))
+    return _by_rows(
+        _kza_rows, x, axis, max_workers, window, int(iterations), min_size, tol, min_periods
+    )
+
+
+def kz_decompose(x, short=(15, 5), long=(365, 3), min_periods=1, dim="time", max_workers=1):
+    """Split time series into baseline, seasonal and short-term components.
+
+    With ``KZ(m, k)`` of :func:`kz_filter` (Rao and Zurbenko, 1994):
+    ``short_term = x - KZ(*short)``, ``seasonal = KZ(*short) - KZ(*long)``
+    and ``baseline = KZ(*long)``, so the three add up to `x` where the
+    filters are defined.
+
+    Parameters
+    ----------
+    x : xarray.DataArray or array-like
+        Regularly spaced data, e.g. ``(site, time)``; NaN for gaps.
+    short, long : tuple of int
+        ``(window, iterations)`` of the two filters, in time steps; the
+        defaults are for daily data.
+    min_periods : int
+        As for :func:`kz_filter`.
+    dim : str or int
+        Time dimension (the axis for array input).
+    max_workers : int, optional
+        As for :func:`kz_filter`.
+
+    Returns
+    -------
+    xarray.Dataset or dict
+        ``baseline``, ``seasonal`` and ``short_term``; a Dataset for
+        DataArray input, else a dict of arrays.
+    """
+    import xarray as xr
+
+    if isinstance(x, xr.DataArray):
+        values, axis = x.values, x.get_axis_num(dim)
+    else:
+        values, axis = np.asarray(x, dtype=float), (-1 if dim == "time" else dim)
+    fast = kz_filter(values, *short, min_periods=min_periods, axis=axis, max_workers=max_workers)
+    slow = kz_filter(values, *long, min_periods=min_periods, axis=axis, max_workers=max_workers)
+    out = {"baseline": slow, "seasonal": fast - slow, "short_term": values - fast}
+    if isinstance(x, xr.DataArray):
+        return xr.Dataset({k: x.copy(data=v) for k, v in out.items()})
+    return out
+
+
+def _regular_positions(times, codes, freq=None):
+    """Position of each of `times` on a regular time axis that starts at the
+    first time of its group (`codes`).
+
+    The step is `freq`, by default the smallest positive step between the
+    times of a group, so gaps leave empty positions.
+    """
+    import pandas as pd
+
+    order = np.lexsort((times, codes))
+    t, c = times[order], codes[order]
+    first = np.r_[True, c[1:] != c[:-1]]
+    if freq is None:
+        dt = np.diff(t)[~first[1:]]
+        dt = dt[dt > np.timedelta64(0)]
+        step = dt.min() if dt.size else np.timedelta64(1, "h")
+    else:
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq)).to_timedelta64()
+    start = np.maximum.accumulate(np.where(first, np.arange(t.size), 0))
+    pos = np.empty(t.size, dtype=np.int64)
+    pos[order] = (t - t[start]) // step
+    return pos
+
+
+def kolmogorov_zurbenko_filter(df, col, window, iterations, freq=None):
+    """KZ filter of `col` for every site of a long frame.
+
+    The values of each site are placed on a regular time axis first, so
+    the window spans `window` time steps across gaps (which count as
+    missing, with ``min_periods=1``), not `window` rows.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Long frame with ``siteid`` and ``time_local`` columns.
+    col : str
+        Column to filter.
+    window : int
+        Filter window m in time steps (m = 2q + 1).
+    iterations : int
+        Number of moving averages.
+    freq : str or pandas.Timedelta, optional
+        Time step (e.g. ``"h"``); by default the smallest step between the
+        times of a site.
+
+    Returns
+    -------
+    pandas.DataFrame
+        `df` merged on ``siteid`` and ``time_local`` with the filtered
+        values (``<col>_y``; the original values become ``<col>_x``).
+
+    See Also
+    --------
+    kz_filter : the filter of dense (site, time) arrays.
+    """
+    import pandas as pd
+
+    z = df[["siteid", "time_local", col]].reset_index(drop=True)
+    codes, sites = pd.factorize(z["siteid"])
+    times = pd.to_datetime(z["time_local"]).to_numpy()
+    z = z[(codes >= 0) & ~np.isnat(times)]
+    codes, times = codes[z.index], times[z.index]
+    pos = _regular_positions(times, codes, freq)
+    dense = np.full((len(sites), pos.max() + 1 if pos.size else 0), np.nan)
+    dense[codes, pos] = z[col].to_numpy(dtype=float, na_value=np.nan)
+    z = z.assign(**{col: kz_filter(dense, window, iterations, min_periods=1)[codes, pos]})
     df = df.reset_index(drop=True)
-    return df.merge(z, on=["siteid", "time_local"])
+    return df.merge(z.dropna(), on=["siteid", "time_local"])
 
 
 def wsdir2uv(ws, wdir):
@@ -91,14 +327,200 @@ def get_relhum(temp, press, vap):
     return relhum
 
 
-def long_to_wide(df):
-    from pandas import merge
+def long_to_wide(df, merge=True):
+    """Wide (one column per variable) frame of a long observation frame.
+
+    The ``(time, siteid)`` keys are factorized once and the ``obs`` values
+    are scattered into one preallocated column per ``variable`` (the mean
+    where a key and variable repeat), in place of ``pivot_table``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Long frame with ``time``, ``siteid``, ``variable`` and ``obs``
+        (and optionally ``units``) columns.
+    merge : bool
+        Join the wide columns back onto every row of `df` (and add a
+        ``<variable>_unit`` column per variable), as ``merge(wide, df)``
+        did. Otherwise return the compact frame of one row per key.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Sorted by ``time`` and ``siteid``; keys without any valid value
+        are dropped. The units of each variable are in ``attrs["units"]``.
+    """
+    import pandas as pd
+
+    tcodes, times = pd.factorize(df["time"], sort=True)
+    scodes, sites = pd.factorize(df["siteid"], sort=True)
+    vcodes, variables = pd.factorize(df["variable"], sort=True)
+    values = df["obs"].to_numpy(dtype=float, na_value=np.nan)
+    ok = (tcodes >= 0) & (scodes >= 0) & (vcodes >= 0) & np.isfinite(values)
+
+    # dense (time, site) key of every row, then the keys with data, in order
+    nsite = max(len(sites), 1)
+    key = np.where((tcodes >= 0) & (scodes >= 0), tcodes * nsite + scodes, -1)
+    nkey = len(times) * nsite
+    if nkey <= 4 * key.size:
+        lookup = np.full(nkey + 1, -1)  # last slot for key -1
+        used = np.flatnonzero(np.bincount(key[ok], minlength=nkey))
+        lookup[used] = np.arange(used.size)
+        row = lookup[key]
+    else:
+        used = np.unique(key[ok])
+        row = np.searchsorted(used, key)
+        row[(key < 0) | (row >= used.size) | (used.take(row, mode="clip") != key)] = -1
+    nvar = len(variables)
+    cell = row[ok] * nvar + vcodes[ok]
+    total = np.bincount(cell, weights=values[ok], minlength=used.size * nvar)
+    count = np.bincount(cell, minlength=used.size * nvar)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wide = (total / count).reshape(used.size, nvar)
+
+    out = {"time": times.take(used // nsite), "siteid": sites.take(used % nsite)}
+    for j, name in enumerate(variables):
+        out[name] = wide[:, j]
+    w = pd.DataFrame(out)
+    units = {}
+    if "units" in df:
+        # first row of each variable (reversed, so the first write wins)
+        labelled = np.flatnonzero(vcodes >= 0)[::-1]
+        first = np.empty(len(variables), dtype=np.int64)
+        first[vcodes[labelled]] = labelled
+        units = dict(zip(variables, df["units"].take(first).tolist()))
+    w.attrs["units"] = units
+    if not merge:
+        return w
+
+    for name in variables:
+        w[name + "_unit"] = units.get(name)
+    # every row of df next to the wide row of its key, keys in wide order
+    rows = np.flatnonzero(row >= 0)
+    rows = rows[np.argsort(row[rows], kind="stable")]
+    left = w.take(row[rows]).reset_index(drop=True)
+    right = df.drop(columns=["time", "siteid"]).take(rows).reset_index(drop=True)
+    out = pd.concat([left, right], axis=1)
+    out.attrs["units"] = units
+    return out
+
+
+def long_to_cube(
+    df,
+    value="obs",
+    variable="variable",
+    site="siteid",
+    time="time",
+    freq=None,
+    site_coords=("latitude", "longitude"),
+):
+    """Dense, NaN-padded (variable, site, time) cube of a long observation frame.
+
+    Every row is scattered once into the cube by integer codes, so temporal
+    aggregations can run as array reductions (e.g. ``cube.resample(time="1D")``
+    or a reshape) instead of ``groupby("siteid")`` and merges.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Long frame, one row per variable, site and time.
+    value : str
+        Value column.
+    variable : str or None
+        Variable column; None for a frame of a single variable (the cube
+        then has one variable, named `value`).
+    site : str
+        Site column.
+    time : str
+        Time column.
+    freq : str or pandas.Timedelta, optional
+        Regular time step of the time axis (e.g. ``"h"``), which then spans
+        the first to the last time without gaps; by default the axis is the
+        sorted distinct times.
+    site_coords : list of str
+        Per-site columns kept as coordinates along `site` (when present).
+        A ``units`` column is kept along the variable dimension.
+
+    Returns
+    -------
+    xarray.DataArray
+        Dimensions ``(variable, site, time)`` named after the columns.
+
+    See Also
+    --------
+    cube_to_long : the inverse conversion.
+    """
+    import pandas as pd
+    import xarray as xr
+
+    vdim = variable or "variable"
+    if variable is None:
+        vcodes, variables = np.zeros(len(df), dtype=np.int64), pd.Index([value])
+    else:
+        vcodes, variables = pd.factorize(df[variable], sort=True)
+    scodes, sites = pd.factorize(df[site], sort=True)
+    times = pd.to_datetime(df[time]).to_numpy()
+    if freq is None:
+        tcodes, taxis = pd.factorize(times, sort=True)
+    else:
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq)).to_timedelta64()
+        missing = np.isnat(times)
+        t0 = times[~missing].min()
+        tcodes = np.where(missing, -1, (np.where(missing, t0, times) - t0) // step)
+        taxis = t0 + np.arange(tcodes.max() + 1) * step
+    keep = (vcodes >= 0) & (scodes >= 0) & (tcodes >= 0)
+    cube = np.full((len(variables), len(sites), len(taxis)), np.nan)
+    cube[vcodes[keep], scodes[keep], tcodes[keep]] = df[value].to_numpy(
+        dtype=float, na_value=np.nan
+    )[keep]
+
+    coords = {vdim: np.asarray(variables), site: np.asarray(sites), time: np.asarray(taxis)}
+    extra = [(c, site, scodes) for c in site_coords if c in df]
+    if variable is not None and "units" in df:
+        extra.append(("units", vdim, vcodes))
+    for name, dim, codes in extra:
+        col = df[name].to_numpy()
+        arr = np.empty(len(coords[dim]), dtype=col.dtype)
+        seen = np.zeros(len(arr), dtype=bool)
+        arr[codes[keep]] = col[keep]
+        seen[codes[keep]] = True
+        if not seen.all():
+            # entries without a valid row: int columns become float, bool ones object
+            if arr.dtype.kind in "iu":
+                arr = arr.astype(float)
+            elif arr.dtype.kind not in "fmM":
+                arr = arr.astype(object)
+            if arr.dtype.kind in "mM":
+                arr[~seen] = np.array("NaT", dtype=arr.dtype)
+            else:
+                arr[~seen] = np.nan if arr.dtype.kind == "f" else None
+        coords[name] = (dim, arr)
+    return xr.DataArray(cube, coords=coords, dims=[vdim, site, time], name=value)
+
 
-    w = df.pivot_table(values="obs", index=["time", "siteid"], columns="variable").reset_index()
-    g = df.groupby("variable")
-    for name, group in g:
-        w[name + "_unit"] = group.units.unique()[0]
-    return merge(w, df, on=["siteid", "time"])
+def cube_to_long(cube):
+    """Long frame of the valid (non-NaN) values of a cube, see :func:`long_to_cube`.
+
+    Parameters
+    ----------
+    cube : xarray.DataArray
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per valid value, with a column per dimension, per 1-D
+        coordinate (e.g. ``latitude``, ``units``) and the values (named
+        after the cube, default ``"obs"``).
+    """
+    import pandas as pd
+
+    index = np.nonzero(np.isfinite(cube.values))
+    out = {dim: cube[dim].values[i] for dim, i in zip(cube.dims, index)}
+    for name, coord in cube.coords.items():
+        if name not in cube.dims and coord.ndim == 1:
+            out[name] = coord.values[index[cube.dims.index(coord.dims[0])]]
+    out[cube.name or "obs"] = cube.values[index]
+    return pd.DataFrame(out)
 
 
 def calc_8hr_rolling_max(df, col=None, window=None):
@@ -117,6 +539,96 @@ def calc_8hr_rolling_max(df, col=None, window=None):
     return df.merge(df_rolling_max, on=["siteid", "time_local"])
 
 
+def mda8(values, min_hours=6, min_windows=18):
+    """Daily maximum 8-hour average (MDA8) of hourly data.
+
+    The 8-hour means are differences of a cumulative sum, so the cost does
+    not depend on the window; the daily maxima come from a reshape.
+
+    Parameters
+    ----------
+    values : array-like
+        Hourly values, ``(..., hour)``, with the hour axis starting at local
+        midnight and NaN for missing hours. A trailing partial day is padded
+        with NaN.
+    min_hours : int
+        Valid hours needed for an 8-hour mean (EPA: 6 of 8).
+    min_windows : int
+        Valid 8-hour means needed for a daily maximum (EPA: 18 of 24).
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(..., day)`` MDA8, NaN where the day is incomplete. Each day's
+        windows start at hours 0--23, so they reach 7 hours into the next day.
+
+    Notes
+    -----
+    The EPA rules that keep incomplete averages when they exceed the
+    standard (substituting missing hours) are not applied.
+    """
+    x = np.asarray(values, dtype=float)
+    nday = -(-x.shape[-1] // 24)
+    pad = [(0, 0)] * (x.ndim - 1) + [(0, nday * 24 + 7 - x.shape[-1])]
+    x = np.pad(x, pad, constant_values=np.nan)
+    valid = np.isfinite(x)
+    zero = np.zeros(x.shape[:-1] + (1,))
+    total = np.concatenate([zero, np.cumsum(np.where(valid, x, 0.0), axis=-1)], axis=-1)
+    count = np.concatenate([zero, np.cumsum(valid, axis=-1)], axis=-1)
+    n = nday * 24
+    window_count = count[..., 8 : n + 8] - count[..., :n]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (total[..., 8 : n + 8] - total[..., :n]) / window_count
+    means[window_count < min_hours] = np.nan
+    means = means.reshape(means.shape[:-1] + (nday, 24))
+    ok = np.isfinite(means)
+    daily = np.where(ok, means, -np.inf).max(axis=-1)
+    return np.where(ok.sum(axis=-1) >= min_windows, daily, np.nan)
+
+
+def calc_mda8(df, col, site="siteid", time="time_local", min_hours=6, min_windows=18):
+    """MDA8 of every site of a long hourly frame, see :func:`mda8`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Hourly values, one row per site and hour.
+    col : str
+        Value column.
+    site : str
+        Site column.
+    time : str
+        Local time column (days start at its midnight).
+    min_hours, min_windows : int
+        Completeness rules of :func:`mda8`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per site and complete day, with the columns `site`,
+        `time` (the day) and `col` (the MDA8). `df` is not modified.
+    """
+    import pandas as pd
+
+    codes, sites = pd.factorize(df[site])
+    hours = pd.to_datetime(df[time]).to_numpy().astype("datetime64[h]")
+    keep = (codes >= 0) & ~np.isnat(hours)
+    day0 = hours[keep].min().astype("datetime64[D]")
+    hour = (hours[keep] - day0).astype(np.int64)
+    dense = np.full((sites.size, hour.max() + 1), np.nan)
+    dense[codes[keep], hour] = df[col].to_numpy(dtype=float, na_value=np.nan)[keep]
+
+    out = mda8(dense, min_hours=min_hours, min_windows=min_windows)
+    isite, iday = np.nonzero(np.isfinite(out))
+    return pd.DataFrame(
+        {
+            site: sites.take(isite),
+            time: day0 + iday.astype("timedelta64[D]"),
+            col: out[isite, iday],
+        }
+    )
+
+
 def calc_24hr_ave(df, col=None):
     df.index = df.time_local
     df_24hr_ave = df.groupby("siteid")[col].resample("D").mean().reset_index()
@@ -138,7 +650,9 @@ def calc_annual_ave(df, col=None):
     return df.merge(df_annual_ave, on=["siteid", "time_local"])
 
 
-def get_giorgi_region_bounds(index=None, acronym=None):
+@functools.lru_cache(maxsize=None)
+def _giorgi_region_table():
+    """Giorgi region bounds, built once."""
     import pandas as pd
 
     i = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22]
@@ -266,6 +780,11 @@ def get_giorgi_region_bounds(index=None, acronym=None):
         {"latmin": latmin, "lonmin": lonmin, "latmax": latmax, "lonmax": lonmax, "acronym": acro},
         index=i,
     )
+    return df
+
+
+def get_giorgi_region_bounds(index=None, acronym=None):
+    df = _giorgi_region_table()
     try:
         if index is None and acronym is None:
             print("either index or acronym needs to be supplied")
@@ -280,22 +799,22 @@ def get_giorgi_region_bounds(index=None, acronym=None):
 
 
 def get_giorgi_region_df(df):
-    df.loc[:, "GIORGI_INDEX"] = None
-    df.loc[:, "GIORGI_ACRO"] = None
-    for i in range(22):
-        latmin, lonmin, latmax, lonmax, acro = get_giorgi_region_bounds(index=int(i + 1))
-        con = (
-            (df.longitude <= lonmax)
-            & (df.longitude >= lonmin)
-            & (df.latitude <= latmax)
-            & (df.latitude >= latmin)
-        )
-        df.loc[con, "GIORGI_INDEX"] = i + 1
-        df.loc[con, "GIORGI_ACRO"] = acro
+    """Tag the rows of `df` with their Giorgi region.
+
+    Adds the columns ``GIORGI_INDEX`` (nullable integer) and ``GIORGI_ACRO``
+    (categorical), missing outside every region. Where regions overlap,
+    the one with the highest index wins.
+    """
+    index = _region_index("giorgi")
+    codes = index.codes(df.latitude.values, df.longitude.values)
+    df["GIORGI_INDEX"] = index.labels(codes)
+    df["GIORGI_ACRO"] = index.categorical(codes)
     return df
 
 
-def get_epa_region_bounds(index=None, acronym=None):
+@functools.lru_cache(maxsize=None)
+def _epa_region_table():
+    """EPA region bounds, built once."""
     import pandas as pd
 
     i = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
@@ -364,6 +883,11 @@ def get_epa_region_bounds(index=None, acronym=None):
         {"latmin": latmin, "lonmin": lonmin, "latmax": latmax, "lonmax": lonmax, "acronym": acro},
         index=i,
     )
+    return df
+
+
+def get_epa_region_bounds(index=None, acronym=None):
+    df = _epa_region_table()
     try:
         if index is None and acronym is None:
             print("either index or acronym needs to be supplied")
@@ -381,16 +905,152 @@ def get_epa_region_bounds(index=None, acronym=None):
 
 
 def get_epa_region_df(df):
-    df.loc[:, "EPA_INDEX"] = None
-    df.loc[:, "EPA_ACRO"] = None
-    for i in range(13):
-        latmin, lonmin, latmax, lonmax, acro = get_epa_region_bounds(index=int(i + 1))
-        con = (
-            (df.longitude <= lonmax)
-            & (df.longitude >= lonmin)
-            & (df.latitude <= latmax)
-            & (df.latitude >= latmin)
-        )
-        df.loc[con, "EPA_INDEX"] = i + 1
-        df.loc[con, "EPA_ACRO"] = acro
+    """Tag the rows of `df` with their EPA region.
+
+    Adds the columns ``EPA_INDEX`` (nullable integer) and ``EPA_ACRO``
+    (categorical), missing outside every region. Where regions overlap,
+    the one with the highest index wins.
+    """
+    index = _region_index("epa")
+    codes = index.codes(df.latitude.values, df.longitude.values)
+    df["EPA_INDEX"] = index.labels(codes)
+    df["EPA_ACRO"] = index.categorical(codes)
     return df
+
+
+class RegionIndex:
+    """Assign points to regions in one vectorized pass.
+
+    Regions are either lat/lon boxes (bounds inclusive) or arbitrary
+    polygons (e.g. states, HUCs or climate regions as shapely geometries).
+    The index is built once and reused; points are classified per unique
+    location, so long observation frames with many rows per site cost
+    little more than their site list. Where regions overlap, the last one
+    wins.
+
+    Parameters
+    ----------
+    names : array-like
+        Name of each region.
+    bounds : array-like, optional
+        ``(nregions, 4)`` array of ``latmin, lonmin, latmax, lonmax``.
+    geometries : array-like of shapely.Geometry, optional
+        Region polygons in lon/lat.
+    index : array-like of int, optional
+        Label of each region for :meth:`labels` (default ``1, 2, ...``).
+    """
+
+    def __init__(self, names, bounds=None, geometries=None, index=None):
+        if (bounds is None) == (geometries is None):
+            raise ValueError("give exactly one of `bounds` and `geometries`")
+        self.names = np.asarray(names, dtype=object)
+        self.index = (
+            np.arange(1, self.names.size + 1) if index is None else np.asarray(index, dtype=int)
+        )
+        self.bounds = None
+        self.tree = None
+        if bounds is not None:
+            self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        else:
+            import shapely
+
+            self.tree = shapely.STRtree(np.asarray(geometries, dtype=object))
+        if len(self) != self.names.size or self.index.size != self.names.size:
+            raise ValueError("`names`, `index` and the regions must have the same length")
+
+    def __len__(self):
+        return len(self.bounds) if self.bounds is not None else len(self.tree.geometries)
+
+    def __repr__(self):
+        kind = "boxes" if self.bounds is not None else "polygons"
+        return f"{type(self).__name__}({len(self)} {kind})"
+
+    @classmethod
+    def from_table(cls, table):
+        """Index of the boxes of a bounds table such as ``_giorgi_region_table()``."""
+        return cls(
+            table["acronym"].values,
+            bounds=table[["latmin", "lonmin", "latmax", "lonmax"]].values,
+            index=table.index.values,
+        )
+
+    @classmethod
+    def from_geodataframe(cls, gdf, name):
+        """Index of the polygons of a GeoDataFrame, named by its column `name`."""
+        return cls(gdf[name].values, geometries=gdf.geometry.values)
+
+    def _classify(self, lat, lon):
+        """Region code of each (finite) point."""
+        codes = np.full(lat.size, -1, dtype=np.int64)
+        if self.bounds is not None:
+            latmin, lonmin, latmax, lonmax = (b[None, :] for b in self.bounds.T)
+            k = len(self)
+            for start in range(0, lat.size, 2**16):
+                y = lat[start : start + 2**16, None]
+                x = lon[start : start + 2**16, None]
+                inside = (x >= lonmin) & (x <= lonmax) & (y >= latmin) & (y <= latmax)
+                last = k - 1 - np.argmax(inside[:, ::-1], axis=1)
+                codes[start : start + 2**16] = np.where(inside.any(axis=1), last, -1)
+        else:
+            import shapely
+
+            points = shapely.points(lon, lat)
+            ipoint, iregion = self.tree.query(points, predicate="intersects")
+            np.maximum.at(codes, ipoint, iregion)
+        return codes
+
+    def codes(self, lat, lon):
+        """Region code (position in `names`) of each point, -1 outside every region.
+
+        Parameters
+        ----------
+        lat, lon : array-like
+            Point coordinates; NaN coordinates are outside every region.
+
+        Returns
+        -------
+        numpy.ndarray of int
+        """
+        import pandas as pd
+
+        lat = np.asarray(lat, dtype=float).ravel()
+        lon = np.asarray(lon, dtype=float).ravel()
+        if lat.shape != lon.shape:
+            raise ValueError("`lat` and `lon` must have the same size")
+        # classify each distinct location once
+        ilat, ulat = pd.factorize(lat)
+        ilon, ulon = pd.factorize(lon)
+        pair = np.where((ilat < 0) | (ilon < 0), -1, ilat * max(ulon.size, 1) + ilon)
+        ipair, upair = pd.factorize(pair)
+        known = upair >= 0
+        ucodes = np.full(upair.size, -1, dtype=np.int64)
+        ucodes[known] = self._classify(
+            ulat[upair[known] // max(ulon.size, 1)], ulon[upair[known] % max(ulon.size, 1)]
+        )
+        return ucodes[ipair]
+
+    def categorical(self, codes):
+        """Region names of `codes` as a :class:`pandas.Categorical` (NaN outside)."""
+        import pandas as pd
+
+        inverse, categories = pd.factorize(self.names)
+        return pd.Categorical.from_codes(np.where(codes >= 0, inverse[codes], -1), categories)
+
+    def labels(self, codes):
+        """Region index labels of `codes` as a nullable integer array (NA outside)."""
+        import pandas as pd
+
+        outside = codes < 0
+        values = np.where(outside, 0, self.index[codes]).astype(np.int64)
+        return pd.arrays.IntegerArray(values, outside)
+
+    def assign(self, lat, lon):
+        """Region names of the points as a :class:`pandas.Categorical`."""
+        return self.categorical(self.codes(lat, lon))
+
+
+@functools.lru_cache(maxsize=None)
+def _region_index(kind):
+    """Cached :class:`RegionIndex` of the built-in ``"giorgi"`` or ``"epa"`` regions."""
+    table = {"giorgi": _giorgi_region_table, "epa": _epa_region_table}[kind]()
+    return RegionIndex.from_table(table)
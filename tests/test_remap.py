@@ -108,3 +108,564 @@ def test_combine_da_da():
     assert a.shape == (model.dims["z"], n), "model levels but obs grid points"
     assert (np.diff(a.mean(axis=0)) >= 0).all(), "obs profile goes S"
     assert np.isclose(np.diff(a.mean(axis=1)), 1, atol=1e-15, rtol=0).all(), "obs profile goes U"
+
+
+def test_nearest_remap_plan(tmp_path):
+    from monet.util.resample import NearestRemapPlan
+
+    lon, lat = np.meshgrid(np.linspace(-100, -90, 11), np.linspace(30, 40, 9))
+    source = xr.Dataset(
+        data_vars={
+            "o3": (("time", "y", "x"), np.random.rand(3, 9, 11)),
+            "no2": (("time", "y", "x"), np.random.rand(3, 9, 11)),
+        },
+        coords={
+            "time": np.arange(3),
+            "latitude": (("y", "x"), lat),
+            "longitude": (("y", "x"), lon),
+        },
+    )
+    target = xr.DataArray(
+        np.zeros((1, 4)),
+        dims=("y", "x"),
+        coords={
+            "latitude": (("y", "x"), [[31.2, 35.0, 38.6, 10.0]]),
+            "longitude": (("y", "x"), [[-98.7, -95.0, -91.4, -95.0]]),
+        },
+    )
+
+    plan = target.monet.nearest_remap_plan(source, radius_of_influence=1e5)
+    assert plan.valid.tolist() == [[True, True, True, False]]
+
+    expected = target.monet.remap_nearest(source.o3, radius_of_influence=1e5).compute()
+    result = target.monet.remap_nearest(source.o3, plan=plan)
+    assert result.dims == expected.dims == ("time", "y", "x")
+    np.testing.assert_array_equal(result.values, expected.values)
+
+    plan.save(tmp_path / "plan.npz")
+    loaded = NearestRemapPlan.load(tmp_path / "plan.npz")
+    ds = loaded.apply(source.chunk({"time": 1}))
+    assert set(ds.data_vars) == {"o3", "no2"}
+    np.testing.assert_array_equal(ds.o3.values, expected.values)
+    assert np.isnan(ds.no2.values[:, 0, 3]).all()
+
+    with pytest.raises(ValueError, match="source grid shape"):
+        plan.apply(source.o3.isel(x=slice(0, 5)))
+
+
+def test_remap_nearest_unstructured():
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    ncell = 500
+    model = xr.Dataset(
+        data_vars={"o3": (("time", "z", "ncell"), rng.random((2, 3, ncell)))},
+        coords={
+            "time": pd.date_range("2020-01-01", periods=2, freq="h"),
+            "latitude": ("ncell", rng.uniform(-60, 60, ncell)),
+            "longitude": ("ncell", rng.uniform(-180, 180, ncell)),
+        },
+        attrs={"mio_has_unstructured_grid": True},
+    )
+    # a site on the far side of the dateline from its nearest cell
+    model["longitude"][0], model["latitude"][0] = 179.9, 0.0
+    sites = pd.DataFrame(
+        {
+            "siteid": ["a", "b", "c"],
+            "latitude": [0.0, 10.0, -20.0],
+            "longitude": [-179.95, 20.0, -45.0],
+        }
+    )
+    target = sites.monet._df_to_da()
+
+    out = target.monet.remap_nearest_unstructured(model)
+    assert out.o3.dims == ("time", "z", "y", "x")
+    assert out.o3.shape == (2, 3, 1, 3)
+    np.testing.assert_array_equal(out.o3.values[:, :, 0, 0], model.o3.values[:, :, 0])
+
+    # brute-force great-circle nearest cells
+    lat0, lon0 = np.deg2rad(sites.latitude.values), np.deg2rad(sites.longitude.values)
+    lat1, lon1 = np.deg2rad(model.latitude.values), np.deg2rad(model.longitude.values)
+    cosd = np.sin(lat0[:, None]) * np.sin(lat1) + np.cos(lat0[:, None]) * np.cos(lat1) * np.cos(
+        lon0[:, None] - lon1
+    )
+    idx = cosd.argmax(axis=1)
+    np.testing.assert_array_equal(out.o3.values[0, 0, 0], model.o3.values[0, 0, idx])
+
+    idw = target.monet.remap_nearest_unstructured(model, k=4)
+    assert idw.o3.shape == (2, 3, 1, 3)
+    assert np.all(idw.o3.values >= model.o3.values.min())
+    assert np.all(idw.o3.values <= model.o3.values.max())
+
+    far = target.monet.remap_nearest_unstructured(model, radius_of_influence=1.0)
+    assert np.isnan(far.o3.values[:, :, 0, 1:]).all()
+
+
+def _make_grid_and_sites(ntime=10):
+    import pandas as pd
+
+    lon, lat = np.meshgrid(np.linspace(-100, -90, 11), np.linspace(30, 40, 9))
+    da = xr.DataArray(
+        np.random.rand(ntime, 9, 11),
+        dims=("time", "y", "x"),
+        coords={
+            "time": pd.date_range("2020-01-01", periods=ntime, freq="h"),
+            "latitude": (("y", "x"), lat),
+            "longitude": (("y", "x"), lon),
+        },
+        name="o3",
+    )
+    sites = pd.DataFrame(
+        {"siteid": ["a", "b", "c"], "latitude": [31.0, 35, 38], "longitude": [-98.0, -95, -91]}
+    )
+    times = pd.DataFrame({"time": pd.date_range("2019-12-31 23:00", periods=ntime + 3, freq="h")})
+    df = sites.merge(times, how="cross")
+    df["obs"] = np.arange(len(df), dtype=float)
+    return da, df
+
+
+def test_combine_da_to_df_chunks(tmp_path):
+    import pandas as pd
+
+    from monet.util.combinetool import (
+        combine_da_to_df,
+        combine_da_to_df_chunks,
+        write_combine_da_to_df,
+    )
+
+    da, df = _make_grid_and_sites()
+    expected = combine_da_to_df(da, df, radius_of_influence=1e5)
+    expected = expected.sort_values(["time", "siteid"]).reset_index(drop=True)
+
+    parts = list(
+        combine_da_to_df_chunks(da.chunk({"time": 2}), df, time_chunk=4, radius_of_influence=1e5)
+    )
+    assert len(parts) == 3
+    result = pd.concat(parts).sort_values(["time", "siteid"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+    files = write_combine_da_to_df(
+        da, df, tmp_path, fmt="netcdf", time_chunk=4, radius_of_influence=1e5
+    )
+    assert [f.name for f in files] == ["part-00000.nc", "part-00001.nc", "part-00002.nc"]
+    with xr.open_dataset(files[1]) as ds:
+        assert ds.sizes["index"] == 12
+
+
+def test_combine_da_to_df_chunks_no_time(monkeypatch):
+    import pandas as pd
+
+    from monet.util import combinetool
+
+    da, df = _make_grid_and_sites()
+    static = da.isel(time=0, drop=True)
+    expected = combinetool.combine_da_to_df(static, df, radius_of_influence=1e5)
+
+    calls = []
+    remap = combinetool._remap_da_to_sites
+
+    def counting_remap(*args, **kwargs):
+        calls.append(1)
+        return remap(*args, **kwargs)
+
+    monkeypatch.setattr(combinetool, "_remap_da_to_sites", counting_remap)
+    parts = list(combinetool.combine_da_to_df_chunks(static, df, radius_of_influence=1e5))
+    assert len(parts) == 1
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(parts[0], expected)
+
+
+def test_combine_da_to_df_time_match():
+    import pandas as pd
+
+    from monet.util.combinetool import _interped_to_df, _remap_da_to_sites, combine_da_to_df
+
+    da, df = _make_grid_and_sites(ntime=4)
+    df = df.sample(frac=1, random_state=0)
+    target_da, da_interped = _remap_da_to_sites(da, df, radius_of_influence=1e5)
+    long_df = _interped_to_df(da_interped.compute(), target_da, da, df)
+    expected = df.reset_index(drop=True).merge(long_df, on=["time", "siteid"], how="left")
+    result = combine_da_to_df(da, df, radius_of_influence=1e5)
+    pd.testing.assert_frame_equal(result, expected)
+
+    # half-hour obs times
+    df["time"] = df["time"] + pd.Timedelta("30min")
+    exact = combine_da_to_df(da, df, radius_of_influence=1e5)
+    assert exact["o3"].isna().all()
+    lookup = long_df.set_index(["siteid", "time"])["o3"]
+    near = combine_da_to_df(
+        da, df, time_match="nearest", tolerance="30min", radius_of_influence=1e5
+    )
+    lin = combine_da_to_df(da, df, time_match="linear", radius_of_influence=1e5)
+    for row in lin.itertuples():
+        t0, t1 = row.time - pd.Timedelta("30min"), row.time + pd.Timedelta("30min")
+        if t0 < da.time.values[0] or t1 > da.time.values[-1]:
+            assert np.isnan(row.o3)
+        else:
+            expect = 0.5 * (lookup[row.siteid, t0] + lookup[row.siteid, t1])
+            np.testing.assert_allclose(row.o3, expect)
+    assert near["o3"].notna().sum() == 3 * 5
+    near_tight = combine_da_to_df(
+        da, df, time_match="nearest", tolerance="10min", radius_of_influence=1e5
+    )
+    assert near_tight["o3"].isna().all()
+
+
+@pytest.mark.parametrize("time_match", ["nearest", "linear"])
+def test_combine_da_to_df_chunks_time_match(time_match):
+    import pandas as pd
+
+    from monet.util.combinetool import combine_da_to_df, combine_da_to_df_chunks
+
+    da, df = _make_grid_and_sites()
+    # nearest model time is the next hour, which may be in the next block
+    df["time"] = df["time"] + pd.Timedelta("40min")
+    kwargs = dict(time_match=time_match, tolerance="30min", radius_of_influence=1e5)
+    if time_match == "linear":
+        del kwargs["tolerance"]
+    expected = combine_da_to_df(da, df, **kwargs)
+    expected = expected.sort_values(["time", "siteid"]).reset_index(drop=True)
+    parts = list(combine_da_to_df_chunks(da.chunk({"time": 2}), df, time_chunk=4, **kwargs))
+    result = pd.concat(parts).sort_values(["time", "siteid"]).reset_index(drop=True)
+    # obs between two blocks are matched too
+    assert result["o3"].notna().sum() == expected["o3"].notna().sum() > 0
+    pd.testing.assert_frame_equal(result, expected)
+
+    with pytest.raises(ValueError):
+        next(combine_da_to_df_chunks(da, df, time_match="closest", radius_of_influence=1e5))
+
+
+def test_combine_files_to_df(tmp_path):
+    import pandas as pd
+
+    from monet.util.combinetool import combine_da_to_df, combine_files_to_df
+
+    da, df = _make_grid_and_sites(ntime=9)
+    ds = da.to_dataset()
+    for i, start in enumerate([6, 0, 3]):
+        ds.isel(time=slice(start, start + 3)).to_netcdf(tmp_path / f"model_{i}.nc")
+    expected = combine_da_to_df(da, df, radius_of_influence=1e5)
+    expected = expected.sort_values(["time", "siteid"]).reset_index(drop=True)
+
+    result = combine_files_to_df(
+        str(tmp_path / "model_*.nc"), df, radius_of_influence=1e5, max_workers=2
+    )
+    # rows come back in file time order
+    assert result["time"].iloc[:12].max() < pd.Timestamp("2020-01-01 03:00")
+    result = result.sort_values(["time", "siteid"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+    files = combine_files_to_df(
+        sorted(tmp_path.glob("model_*.nc")),
+        df,
+        radius_of_influence=1e5,
+        max_workers=1,
+        path=tmp_path / "out",
+    )
+    assert [f.name for f in files] == [f"part-{i:05d}.parquet" for i in range(3)]
+    result = pd.read_parquet(tmp_path / "out")
+    assert len(result) == len(df)
+
+    # every file the workers open is closed again
+    opened, closed = [], []
+
+    def tracking_opener(fname):
+        ds = xr.open_dataset(fname)
+        close = ds._close
+        opened.append(fname)
+        ds.set_close(lambda: (closed.append(fname), close()))
+        return ds
+
+    combine_files_to_df(
+        sorted(tmp_path.glob("model_*.nc")),
+        df,
+        opener=tracking_opener,
+        radius_of_influence=1e5,
+        max_workers=1,
+    )
+    assert len(opened) == 6
+    assert sorted(closed) == sorted(opened)
+
+
+@pytest.mark.parametrize("chunk", [False, True])
+def test_remap_nearest_dataset_fused(chunk):
+    from pyresample import kd_tree
+
+    da, _ = _make_grid_and_sites(ntime=4)
+    source = xr.Dataset({f"v{i}": da * i for i in range(5)})
+    source["t"] = da.transpose("y", "x", "time").astype("float32")
+    target = da.isel(time=0, y=[2], x=slice(1, 8)).reset_coords(drop=False)
+    if chunk:
+        source = source.chunk({"time": 1})
+
+    result = target.monet.remap_nearest(source, radius_of_influence=1e5, num_threads=2)
+
+    r = kd_tree.XArrayResamplerNN(
+        target.monet._get_CoordinateDefinition(source),
+        target.monet._get_CoordinateDefinition(target),
+        radius_of_influence=1e5,
+    )
+    r.get_neighbour_info()
+    for name in source.data_vars:
+        expected = r.get_sample_from_neighbour_info(source[name])
+        assert result[name].dims == expected.dims
+        assert result[name].dtype == expected.dtype
+        np.testing.assert_array_equal(result[name].values, expected.values)
+
+
+def test_grid_fingerprint_and_weight_file_lru(tmp_path):
+    import os
+    import time
+
+    from monet.util.resample import _trim_weight_files, grid_fingerprint
+
+    lat = np.linspace(0, 10, 5)
+    lon = np.linspace(0, 20, 6)
+    a = xr.Dataset({"v": (("lat", "lon"), np.zeros((5, 6)))}, coords={"lat": lat, "lon": lon})
+    b = xr.Dataset({"w": (("lat", "lon"), np.ones((5, 6)))}, coords={"lat": lat, "lon": lon})
+    c = a.assign_coords(lon=lon + 1)
+    assert grid_fingerprint(a) == grid_fingerprint(b) == grid_fingerprint(a.v)
+    assert grid_fingerprint(a) != grid_fingerprint(c)
+
+    for i in range(5):
+        (tmp_path / f"monet_xesmf_{i}.nc").touch()
+        t = time.time() - 100 + i
+        os.utime(tmp_path / f"monet_xesmf_{i}.nc", (t, t))
+    (tmp_path / "other.nc").touch()
+    _trim_weight_files(tmp_path, 2)
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        "monet_xesmf_3.nc",
+        "monet_xesmf_4.nc",
+        "other.nc",
+    ]
+
+
+class _FakeRegridder:
+    """Stands in for ``xesmf.Regridder``; records how it was built."""
+
+    built = []
+    fail_write = False
+
+    def __init__(self, source, target, method, weights=None, **kwargs):
+        if weights is not None:
+            with open(weights) as f:
+                assert f.read() == "weights"
+        self.weights = weights
+        self.built.append(weights)
+
+    def to_netcdf(self, path):
+        with open(path, "w") as f:
+            f.write("partial" if self.fail_write else "weights")
+        if self.fail_write:
+            raise OSError("disk full")
+
+
+@pytest.fixture
+def fake_xesmf(monkeypatch, tmp_path):
+    import sys
+    import types
+
+    from monet.util import resample
+
+    monkeypatch.setitem(sys.modules, "xesmf", types.SimpleNamespace(Regridder=_FakeRegridder))
+    monkeypatch.setattr(_FakeRegridder, "built", [])
+    monkeypatch.setitem(resample.xesmf_cache_options, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(resample.xesmf_cache_options, "max_files", 2)
+    resample.clear_xesmf_cache()
+    yield resample
+    resample.clear_xesmf_cache()
+
+
+def _grid(shift=0.0):
+    lat = np.linspace(0, 10, 5)
+    lon = np.linspace(0, 20, 6) + shift
+    return xr.Dataset({"v": (("lat", "lon"), np.zeros((5, 6)))}, coords={"lat": lat, "lon": lon})
+
+
+def test_get_regridder_cache(fake_xesmf, tmp_path):
+    resample = fake_xesmf
+    cache = tmp_path / "cache"
+    source, target = _grid(), _grid(0.5)
+
+    first = resample.get_regridder(source, target)
+    assert _FakeRegridder.built == [None]
+    files = [f.name for f in cache.iterdir()]
+    assert len(files) == 1 and files[0].startswith("monet_xesmf_")  # no temporary left
+
+    # memoized in this process
+    assert resample.get_regridder(source.v, target) is first
+    assert len(_FakeRegridder.built) == 1
+
+    # a new process (empty memo) reads the weight file
+    resample.clear_xesmf_cache()
+    again = resample.get_regridder(source, target)
+    assert again is not first
+    assert again.weights == str(cache / files[0])
+
+    # other options or grids get their own files, the oldest are trimmed
+    resample.get_regridder(source, target, method="conservative")
+    resample.get_regridder(source, _grid(1.0))
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_get_regridder_failed_write(fake_xesmf, tmp_path):
+    resample = fake_xesmf
+    _FakeRegridder.fail_write = True
+    try:
+        with pytest.raises(OSError):
+            resample.get_regridder(_grid(), _grid(0.5))
+    finally:
+        _FakeRegridder.fail_write = False
+    # neither a partial weight file nor the temporary is left behind
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_get_regridder_without_disk_cache(fake_xesmf, monkeypatch, tmp_path):
+    resample = fake_xesmf
+    monkeypatch.setitem(resample.xesmf_cache_options, "cache_dir", None)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    resample.get_regridder(_grid(), _grid(0.5))
+    assert _FakeRegridder.built == [None]
+    assert not (tmp_path / "cache").exists()
+    assert not (tmp_path / "home").exists() and not (tmp_path / "xdg").exists()
+
+
+class _CallableRegridder:
+    """Maps (..., lat, lon) data to `target` by its spatial mean; records the calls."""
+
+    def __init__(self, target):
+        self.target = target
+        self.calls = []
+
+    def __call__(self, da):
+        self.calls.append(da.dims)
+        out = da.mean(["lat", "lon"])  # drops the attrs, like some xESMF versions
+        out = out.expand_dims(lat=self.target.lat.values, lon=self.target.lon.values)
+        return out.transpose(..., "lat", "lon")
+
+
+def _dataset_to_regrid():
+    src = _grid()
+    times = np.arange(3)
+    return xr.Dataset(
+        {
+            "a": (("time", "lat", "lon"), np.ones((3, 5, 6)), {"units": "ppb"}),
+            "b": (("time", "lat", "lon"), 2 * np.ones((3, 5, 6)), {"units": "ug/m3"}),
+            "c": (("lat", "lon"), 3 * np.ones((5, 6)), {"units": "m"}),
+            "time_bnds": (("time",), times + 0.5, {"long_name": "bounds"}),
+        },
+        coords={"time": times, "lat": src.lat, "lon": src.lon},
+        attrs={"title": "model"},
+    )
+
+
+@pytest.mark.parametrize("stack", [True, False])
+def test_regrid_dataset(stack):
+    from monet.util.resample import regrid_dataset
+
+    ds = _dataset_to_regrid()
+    target = _grid(0.5).isel(lat=slice(0, 3))
+    regridder = _CallableRegridder(target)
+    out = regrid_dataset(regridder, ds, stack=stack)
+
+    # a and b share dims and dtype: one call when stacked
+    assert len(regridder.calls) == (2 if stack else 3)
+    assert list(out.data_vars) == ["a", "b", "c", "time_bnds"]
+    assert out.attrs == {"title": "model"}
+    for name in ["a", "b", "c"]:
+        assert out[name].name == name
+        assert out[name].attrs == ds[name].attrs
+        assert out[name].sizes["lat"] == 3
+    np.testing.assert_allclose(out["b"].values, 2.0)
+    # not on the grid: passed through as is
+    xr.testing.assert_identical(out["time_bnds"], ds["time_bnds"])
+
+
+def test_remap_xesmf_dataset(monkeypatch):
+    from monet.util import resample
+
+    ds = _dataset_to_regrid()
+    target = _grid(0.5).rename(v="a")
+    regridder = _CallableRegridder(target)
+    monkeypatch.setattr(resample, "get_regridder", lambda *args, **kwargs: regridder)
+
+    out = target.monet._remap_xesmf_dataset(ds)
+    assert len(regridder.calls) == 2
+    # names clashing with the target get a suffix
+    assert set(out.data_vars) == {"a_y", "b", "c", "time_bnds"}
+    assert out["a_y"].attrs == {"units": "ppb"}
+    np.testing.assert_allclose(target["a_y"].values, 1.0)
+    assert "b" in target.data_vars
+
+
+def test_nearest_ij_batch():
+    from pyresample import utils
+
+    from monet.util.interp_util import lonlat_to_swathdefinition as llsd
+    from monet.util.interp_util import nearest_point_swathdefinition as npsd
+
+    da, df = _make_grid_and_sites()
+    lats = np.array([30.4, 33.3, 36.8, 39.9, 0.0])
+    lons = np.array([-99.6, -97.1, -90.2, -94.5, 0.0])
+
+    x, y = da.monet.nearest_ij(lat=lats, lon=lons)
+    tree = da.monet._kdtree
+    assert x[-1] == y[-1] == -1
+    swath = llsd(longitude=da.longitude.values, latitude=da.latitude.values)
+    for i in range(len(lats) - 1):
+        pswath = npsd(longitude=float(lons[i]), latitude=float(lats[i]))
+        row, col = utils.generate_nearest_neighbour_linesample_arrays(swath, pswath, float(1e6))
+        assert (x[i], y[i]) == (col[0][0], row[0][0])
+        assert da.monet.nearest_ij(lat=lats[i], lon=lons[i]) == (x[i], y[i])
+    assert da.monet._kdtree is tree, "grid index should be built once"
+
+    points = da.to_dataset().monet.extract_points(lat=lats, lon=lons, siteid=list("abcde"))
+    assert points.o3.dims == ("time", "site")
+    assert list(points.siteid.values) == list("abcde")
+    np.testing.assert_array_equal(points.o3.values[:, 1], da.values[:, y[1], x[1]])
+    assert np.isnan(points.o3.values[:, -1]).all()
+
+
+def test_weighted_remap_plan(tmp_path):
+    import pandas as pd
+
+    from monet.util.resample import WeightedRemapPlan
+
+    # sheared, rotated curvilinear grid; field linear in the grid indices
+    jj, ii = np.meshgrid(np.arange(40), np.arange(50), indexing="ij")
+
+    def grid_lonlat(i, j):
+        return -100 + 0.2 * i + 0.05 * j, 30 + 0.15 * j - 0.03 * i + 0.0005 * i * j
+
+    lon, lat = grid_lonlat(ii, jj)
+    f = 2.0 * ii + 3.0 * jj
+    da = xr.DataArray(
+        np.stack([f, 2 * f]),
+        dims=("time", "y", "x"),
+        coords={"time": [0, 1], "latitude": (("y", "x"), lat), "longitude": (("y", "x"), lon)},
+        name="o3",
+    )
+    pi = np.array([3.3, 10.7, 25.25, 48.9])
+    pj = np.array([2.5, 30.1, 17.75, 0.2])
+    plon, plat = grid_lonlat(pi, pj)
+    sites = pd.DataFrame({"siteid": list("abcd"), "latitude": plat, "longitude": plon})
+    target = sites.monet._df_to_da()
+
+    plan = WeightedRemapPlan.from_data(da, target, method="bilinear")
+    out = plan.apply(da.chunk({"time": 1}))
+    assert out.dims == ("time", "y", "x")
+    np.testing.assert_allclose(out.values[:, 0], [2 * pi + 3 * pj, 4 * pi + 6 * pj])
+
+    plan.save(tmp_path / "w.npz")
+    loaded = WeightedRemapPlan.load(tmp_path / "w.npz")
+    masked = da.where(~((da.x == 3) & (da.y == 2)))
+    assert np.isfinite(loaded.apply(masked).values).all(), "NaN cells are left out"
+
+    for method in ["idw", "gaussian"]:
+        out = WeightedRemapPlan.from_data(da, target, method=method).apply(da)
+        np.testing.assert_allclose(out.values[0, 0], 2 * pi + 3 * pj, atol=1.0)
+
+    df = sites.merge(pd.DataFrame({"time": [0, 1]}), how="cross")
+    paired = da.monet.combine_point(df, method="bilinear")
+    np.testing.assert_allclose(paired.o3.values[::2], 2 * pi + 3 * pj)
@@ -0,0 +1,368 @@
+import numpy as np
+import pytest
+
+from monet.util import stats
+from monet.util.fusedstats import METRICS, compute_stats, stats_from_sufficient, sufficient_stats
+
+
+def _pairs(seed=0, n=5000):
+    rng = np.random.default_rng(seed)
+    obs = rng.gamma(4, 10, size=n)
+    mod = 0.8 * obs + rng.normal(0, 8, size=n) + 5
+    obs[::37] = np.nan
+    mod[::53] = np.nan
+    return obs, mod
+
+
+def test_compute_stats_matches_stats():
+    obs, mod = _pairs()
+    obs_m, mod_m = stats.matchmasks(np.ma.masked_invalid(obs), np.ma.masked_invalid(mod))
+    result = compute_stats(obs, mod)
+    blocked = stats_from_sufficient(sufficient_stats(obs, mod, block_size=777))
+    for name in METRICS:
+        if name == "R":
+            expected = np.sqrt(stats.R2(obs_m, mod_m))
+        else:
+            expected = getattr(stats, name)(obs_m, mod_m)
+        np.testing.assert_allclose(result[name], expected, rtol=1e-10, err_msg=name)
+        np.testing.assert_allclose(blocked[name], expected, rtol=1e-10, err_msg=name)
+
+
+def test_sufficient_stats_blocks_float_inputs():
+    import tracemalloc
+
+    obs, mod = _pairs(n=2_000_000)
+    tracemalloc.start()
+    sufficient_stats(obs, mod, ["MB", "RMSE", "NMB"], block_size=10_000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # a masked copy of either input alone would take 16 MB
+    assert peak < obs.nbytes / 4
+
+
+@pytest.mark.parametrize("name", ["MB", "MdnB", "IOA", "AC", "WDMB", "WDRMSE", "WDIOA", "WDAC"])
+def test_compute_stats_axis(name):
+    rng = np.random.default_rng(1)
+    obs = rng.uniform(0, 360, (30, 200))
+    mod = (obs + rng.normal(0, 40, obs.shape)) % 360
+    result = compute_stats(obs, mod, [name], axis=1)[name]
+    assert result.shape == (30,)
+    expected = getattr(stats, name)(np.ma.asarray(obs), np.ma.asarray(mod), axis=1)
+    np.testing.assert_allclose(result, expected)
+
+
+def test_compute_stats_unknown():
+    with pytest.raises(ValueError, match="unknown metrics"):
+        compute_stats([1.0], [2.0], ["XYZ"])
+
+
+def test_grouped_stats():
+    import pandas as pd
+
+    from monet.util.fusedstats import grouped_stats
+
+    obs, mod = _pairs(n=3000)
+    rng = np.random.default_rng(2)
+    site = pd.Series(rng.choice(["s1", "s2", "s3", "s4"], size=obs.size), name="siteid")
+    hour = rng.integers(0, 3, size=obs.size)
+    obs[(site == "s4").values & (hour == 2)] = np.nan  # group without valid pairs
+
+    result = grouped_stats(obs, mod, [site, hour])
+    assert list(result.columns[:2]) == ["siteid", "group1"]
+    assert len(result) == 12
+    for row in result.itertuples(index=False):
+        sel = (site == row.siteid).values & (hour == row.group1)
+        expected = compute_stats(obs[sel], mod[sel])
+        for name in METRICS:
+            np.testing.assert_allclose(getattr(row, name), expected[name], err_msg=name)
+
+
+def test_stats_accumulator():
+    import pickle
+
+    from monet.util.fusedstats import StatsAccumulator
+
+    obs, mod = _pairs(n=20000)
+    expected = compute_stats(obs, mod)
+    chunks = np.array_split(np.arange(obs.size), 7)
+
+    a, b = StatsAccumulator(), StatsAccumulator()
+    for i, c in enumerate(chunks):
+        (a if i % 2 else b).update(obs[c], mod[c])
+    a = pickle.loads(pickle.dumps(a)).merge(b)
+    assert a.needs_second_pass
+    with pytest.raises(ValueError, match="second pass"):
+        a.finalize()
+
+    a2, b2 = a.second_pass(), a.second_pass()
+    for i, c in enumerate(chunks):
+        (a2 if i % 2 else b2).update(obs[c], mod[c])
+    result = a2.merge(b2).finalize()
+    for name in METRICS:
+        if "Mdn" in name and name != "NMdnGE":
+            # both medians of a ratio are within 1%
+            np.testing.assert_allclose(result[name], expected[name], rtol=0.021, err_msg=name)
+        else:
+            np.testing.assert_allclose(result[name], expected[name], rtol=1e-9, err_msg=name)
+
+
+def test_quantile_sketch():
+    from monet.util.fusedstats import QuantileSketch
+
+    rng = np.random.default_rng(3)
+    x = rng.normal(5, 10, size=10001)
+    a = QuantileSketch(0.005).update(x[:4000])
+    b = QuantileSketch(0.005).update(x[4000:])
+    sketch = a.merge(b)
+    assert sketch.count == x.size
+    for q in [0.01, 0.25, 0.5, 0.9]:
+        exact = np.quantile(x, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.005 * abs(exact) + 1e-12
+
+
+@pytest.mark.parametrize("axis", [0, 1])
+def test_regression_metrics_axis(axis):
+    from scipy.stats import linregress
+
+    rng = np.random.default_rng(4)
+    obs = np.ma.masked_invalid(rng.gamma(4, 10, size=(40, 25)))
+    mod = 0.7 * obs + rng.normal(0, 5, size=obs.shape)
+    mod[rng.random(obs.shape) < 0.1] = np.ma.masked
+    r2, rmses, rmseu = (f(obs, mod, axis=axis) for f in (stats.R2, stats.RMSEs, stats.RMSEu))
+    slope, intercept, r = stats.ols(obs, mod, axis=axis)
+    for i in range(obs.shape[1 - axis]):
+        o, m = (np.take(x, i, axis=1 - axis) for x in (obs, mod))
+        o, m = stats.matchmasks(o, m)
+        fit = linregress(o.compressed(), m.compressed())
+        np.testing.assert_allclose([slope[i], intercept[i], r[i]], fit[:3])
+        np.testing.assert_allclose(r2[i], stats.R2(o, m))
+        assert np.isclose(rmses[i], stats.RMSEs(o.compressed(), m.compressed()))
+        assert np.isclose(rmseu[i], stats.RMSEu(o.compressed(), m.compressed()))
+        mod_hat = fit.intercept + fit.slope * o.compressed()
+        assert np.isclose(rmses[i], stats.RMSE(o.compressed(), mod_hat))
+        assert np.isclose(rmseu[i], stats.RMSE(mod_hat, m.compressed()))
+
+
+@pytest.mark.parametrize("name", ["MB", "NMB", "MdnB", "IOA", "d1", "E1", "R2", "WDAC", "NO"])
+def test_stats_xarray_dim(name):
+    import xarray as xr
+
+    rng = np.random.default_rng(5)
+    obs = rng.gamma(4, 10, size=(12, 4, 5))
+    mod = 0.8 * obs + rng.normal(0, 5, size=obs.shape)
+    obs[rng.random(obs.shape) < 0.1] = np.nan
+    dims = ("time", "y", "x")
+    obs_da = xr.DataArray(obs, dims=dims).chunk({"time": 4, "x": 2})
+    mod_da = xr.DataArray(mod, dims=dims).chunk({"time": 4, "x": 2})
+
+    func = getattr(stats, name)
+    result = func(obs_da, mod_da, dim="time")
+    assert result.chunks is not None  # lazy
+    assert result.dims == ("y", "x")
+    expected = func(np.ma.masked_invalid(obs), np.ma.masked_invalid(mod), axis=0)
+    np.testing.assert_allclose(result.values, np.ma.filled(expected, np.nan))
+
+    total = func(obs_da, mod_da).compute()
+    assert total.ndim == 0
+    np.testing.assert_allclose(
+        total, func(np.ma.masked_invalid(obs.ravel()), np.ma.masked_invalid(mod.ravel()))
+    )
+
+
+@pytest.mark.parametrize("name", ["PSUTMNPB", "PSUTMdnNPE", "PSUTNMPB", "PSUTNMdnPE"])
+def test_peak_stats_xarray_dim(name):
+    import xarray as xr
+
+    rng = np.random.default_rng(7)
+    obs = rng.gamma(4, 10, size=(3, 24, 5))
+    mod = 0.8 * obs + rng.normal(0, 5, size=obs.shape)
+    obs[rng.random(obs.shape) < 0.1] = np.nan
+    obs_da = xr.DataArray(obs, dims=("y", "time", "x")).chunk({"x": 2})
+    mod_da = xr.DataArray(mod, dims=("y", "time", "x")).chunk({"x": 2})
+
+    func = getattr(stats, name)
+    result = func(obs_da, mod_da, dim="time")
+    assert result.chunks is not None  # lazy
+    assert result.ndim == 0
+    # time first, the space dimensions flattened
+    o = np.ma.masked_invalid(obs.transpose(1, 0, 2).reshape(24, -1))
+    m = np.ma.masked_invalid(mod.transpose(1, 0, 2).reshape(24, -1))
+    np.testing.assert_allclose(result.values, func(o, m))
+
+
+@pytest.mark.parametrize("engine", ["numpy", "numba"])
+def test_wind_direction_stats(engine):
+    from monet.util.fusedstats import WD_METRICS, wind_direction_stats
+
+    if engine == "numba":
+        pytest.importorskip("numba")
+    rng = np.random.default_rng(6)
+    obs = rng.uniform(0, 360, size=(20, 300))
+    mod = (obs + rng.normal(0, 40, size=obs.shape)) % 360
+    obs[rng.random(obs.shape) < 0.05] = np.nan
+    obs_m, mod_m = stats.matchmasks(np.ma.masked_invalid(obs), np.ma.masked_invalid(mod))
+    for axis in [None, 1]:
+        result = wind_direction_stats(obs, mod, axis=axis, engine=engine)
+        for name in WD_METRICS:
+            expected = getattr(stats, name)(obs_m, mod_m, axis=axis)
+            np.testing.assert_allclose(result[name], expected, err_msg=name)
+
+    # the pure-Python reference kernel is left as it is
+    from monet.util import fusedstats
+
+    assert not hasattr(fusedstats._cb, "py_func")  # not a numba dispatcher
+    out = np.empty((obs.shape[0], len(WD_METRICS)))
+    fusedstats._wd_rows(obs, mod, out)
+    for j, name in enumerate(WD_METRICS):
+        expected = getattr(stats, name)(obs_m, mod_m, axis=1)
+        np.testing.assert_allclose(out[:, j], expected, err_msg=name)
+
+
+def test_wind_direction_stats_without_numba(monkeypatch):
+    import sys
+
+    from monet.util import fusedstats
+
+    rng = np.random.default_rng(6)
+    obs = rng.uniform(0, 360, size=(4, 50))
+    mod = (obs + rng.normal(0, 40, size=obs.shape)) % 360
+    monkeypatch.setitem(sys.modules, "numba", None)
+    monkeypatch.delitem(sys.modules, "monet.util._wd_kernel", raising=False)
+    fusedstats._wd_rows_jit.cache_clear()
+    try:
+        result = fusedstats.wind_direction_stats(obs, mod, axis=1)
+        with pytest.raises(ImportError):
+            fusedstats.wind_direction_stats(obs, mod, engine="numba")
+    finally:
+        fusedstats._wd_rows_jit.cache_clear()
+    expected = compute_stats(obs, mod, fusedstats.WD_METRICS, axis=1)
+    for name in fusedstats.WD_METRICS:
+        np.testing.assert_allclose(result[name], expected[name])
+
+
+def test_categorical_scores():
+    from monet.util.categorical import SCORES, categorical_scores
+
+    obs, mod = _pairs(n=4000)
+    thresholds = [60.0, 20.0, 40.0]
+    site = np.arange(obs.size) % 3
+    result = categorical_scores(obs, mod, thresholds, groups=site)
+    assert len(result) == 9
+    valid = np.isfinite(obs) & np.isfinite(mod)
+    for row in result.itertuples(index=False):
+        sel = valid & (site == row.group)
+        o, m = obs[sel], mod[sel]
+        a, b, c, d = stats.scores(o, m, row.threshold, np.inf)
+        assert (row.hits, row.misses, row.false_alarms, row.correct_negatives) == (a, b, c, d)
+        np.testing.assert_allclose(row.POD, a / (a + b))
+        np.testing.assert_allclose(row.CSI, stats.CSI(o, m, row.threshold, np.inf))
+        np.testing.assert_allclose(row.ETS, stats.ETS(o, m, row.threshold, np.inf))
+        np.testing.assert_allclose(row.HSS, stats.HSS(o, m, row.threshold, np.inf))
+    assert set(SCORES) <= set(result.columns)
+
+    ungrouped = categorical_scores(obs, mod, thresholds)
+    assert list(ungrouped.threshold) == thresholds
+    assert ungrouped.hits.sum() == result.hits.sum()
+
+
+@pytest.mark.parametrize("method", ["percentile", "bca"])
+def test_bootstrap_ci(method):
+    from monet.util.fusedstats import bootstrap_ci
+
+    obs, mod = _pairs(n=2000)
+    site = np.repeat(["a", "b"], 1000)
+    kwargs = dict(groups=site, n_boot=300, block_length=24, method=method, seed=7)
+    result = bootstrap_ci(obs, mod, **kwargs)
+    assert list(result.columns) == ["group", "metric", "estimate", "lower", "upper"]
+    assert len(result) == 8
+    assert (result.lower < result.estimate).all() and (result.estimate < result.upper).all()
+    for row in result.itertuples(index=False):
+        sel = site == row.group
+        expected = compute_stats(obs[sel], mod[sel], [row.metric])[row.metric]
+        np.testing.assert_allclose(row.estimate, expected)
+    # reproducible, independent of the number of workers
+    parallel = bootstrap_ci(obs, mod, max_workers=2, **kwargs)
+    np.testing.assert_array_equal(parallel[["lower", "upper"]], result[["lower", "upper"]])
+
+    with pytest.raises(ValueError, match="from sums"):
+        bootstrap_ci(obs, mod, ["IOA"])
+
+
+def test_stats_report():
+    import pandas as pd
+
+    from monet.util.fusedstats import stats_report
+
+    obs, mod = _pairs(n=2000)
+    df = pd.DataFrame(
+        {"Obs": obs, "CMAQ": mod, "CAMx": mod + 1.0, "site": np.repeat(["a", "b"], 1000)}
+    )
+    metrics = ["MB", "NMB", "R", "IOA"]
+    out = stats_report(
+        df, obs="Obs", mod=["CMAQ", "CAMx"], metrics=metrics, by="site", thresholds=[50, 70]
+    )
+    assert list(out.columns[:4]) == ["site", "model", "N", "MB"]
+    assert {"POD_50", "FAR_70", "CSI_70"} <= set(out.columns)
+    assert len(out) == 4
+    row = out[(out.site == "b") & (out.model == "CAMx")].iloc[0]
+    ref = compute_stats(obs[1000:], mod[1000:] + 1.0, metrics)
+    for name in metrics:
+        np.testing.assert_allclose(row[name], ref[name])
+
+    dd = stats.stats(df, 70, 1000)
+    np.testing.assert_allclose(dd["R"], compute_stats(obs, mod, ["R"])["R"])
+    # unpaired column means, as before stats() used stats_report
+    np.testing.assert_allclose(dd["Obs"], np.nanmean(obs))
+    np.testing.assert_allclose(dd["Mod"], np.nanmean(mod))
+    np.testing.assert_allclose(dd["MB"], compute_stats(obs, mod, ["MB"])["MB"])
+
+    # R is |r|, as sqrt(R2) always was, also for anticorrelated data
+    anti = pd.DataFrame({"Obs": obs, "CMAQ": 100.0 - mod})
+    r = compute_stats(obs, 100.0 - mod, ["R"])["R"]
+    assert r < 0
+    np.testing.assert_allclose(stats.stats(anti, 70, 1000)["R"], -r)
+
+
+def test_peak_stats_windows():
+    import pandas as pd
+    import xarray as xr
+
+    rng = np.random.default_rng(2)
+    times = pd.date_range("2020-07-01", periods=24 * 10, freq="h")
+    obs = xr.DataArray(
+        rng.gamma(4, 10, (240, 3)),
+        coords={"time": times, "site": ["a", "b", "c"]},
+        dims=["time", "site"],
+    )
+    mod = obs * 0.9 + rng.normal(0, 3, obs.shape)
+
+    # daily peaks match the (day, hour, site) reshape of paxis
+    out = stats.peak_stats(obs, mod, metrics=["MNPB", "NMdnPE"])
+    blocks = [np.ma.asarray(x.values.reshape(10, 24, 3)) for x in (obs, mod)]
+    np.testing.assert_allclose(out["MNPB"].values, stats.MNPB(*blocks, paxis=1, axis=0))
+    np.testing.assert_allclose(out["NMdnPE"].values, stats.NMdnPE(*blocks, paxis=1, axis=0))
+
+    # local days, one offset per site
+    offset = pd.Series([-5, -5, -8], index=pd.Index(["a", "b", "c"], name="site"))
+    peaks = stats.window_peaks(obs.to_pandas(), gmt_offset=offset)
+    local = obs.sel(site="c").values[8 : 8 + 24 * 9].reshape(9, 24).max(axis=1)
+    np.testing.assert_allclose(peaks.sel(site="c").values[1:10], local)
+
+    # 8-h running means (>= 6 valid hours), by the day of their first hour;
+    # the last windows of the record are partial
+    gappy = obs.copy()
+    gappy[-20:-16, 0] = np.nan
+    gappy[-6:, 0] = 500.0  # the peak is in the partial windows at the end
+    x = gappy.values[:, 0]
+    means = np.full(x.size, np.nan)
+    for i in range(x.size):
+        w = x[i : i + 8]
+        if np.isfinite(w).sum() >= 6:
+            means[i] = np.nanmean(w)
+    peaks = stats.window_peaks(gappy, window="8h")
+    expected = [np.nanmax(means[d * 24 : (d + 1) * 24]) for d in range(10)]
+    np.testing.assert_allclose(peaks.sel(site="a").values, expected)
+    assert expected[-1] == 500.0
+
+    with pytest.raises(ValueError):
+        stats.peak_stats(obs, mod, metrics=["RMSE"])
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from monet.util import tools
+
+
+def test_region_df_matches_bounds():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "latitude": rng.uniform(-60, 85, n).round(0),
+            "longitude": rng.uniform(-180, 180, n).round(0),
+        }
+    )
+    df.loc[0, "latitude"] = np.nan
+    # last region containing the point, as in the per-region loop
+    expected = np.zeros(n, dtype=int)
+    for i in range(22):
+        latmin, lonmin, latmax, lonmax, _ = tools.get_giorgi_region_bounds(index=i + 1)
+        inside = df.longitude.between(lonmin, lonmax) & df.latitude.between(latmin, latmax)
+        expected[inside.values] = i + 1
+
+    out = tools.get_giorgi_region_df(df.copy())
+    assert isinstance(out["GIORGI_ACRO"].dtype, pd.CategoricalDtype)
+    np.testing.assert_array_equal(out["GIORGI_INDEX"].fillna(0).to_numpy(dtype=int), expected)
+    assert out["GIORGI_INDEX"].isna().iloc[0]
+
+    out = tools.get_epa_region_df(pd.DataFrame({"latitude": [40.7], "longitude": [-74.0]}))
+    assert out["EPA_ACRO"].iloc[0] == "R2"
+
+
+def test_region_index_polygons():
+    shapely = pytest.importorskip("shapely")
+
+    polygons = [shapely.box(-100, 30, -90, 40), shapely.box(-95, 35, -80, 45)]
+    index = tools.RegionIndex(["A", "B"], geometries=polygons)
+    out = index.assign([32, 37, 44, 10], [-99, -92, -81, 0])
+    np.testing.assert_array_equal(out.codes, [0, 1, 1, -1])
+
+
+def test_mda8_completeness():
+    rng = np.random.default_rng(1)
+    x = rng.gamma(4, 10, (3, 24 * 5))
+    x[rng.random(x.shape) < 0.2] = np.nan
+    padded = np.concatenate([x, np.full((3, 7), np.nan)], axis=1)
+    expected = np.full((3, 5), np.nan)
+    for s in range(3):
+        for d in range(5):
+            means = []
+            for h in range(24):
+                w = padded[s, d * 24 + h : d * 24 + h + 8]
+                means.append(np.nanmean(w) if np.isfinite(w).sum() >= 6 else np.nan)
+            if np.isfinite(means).sum() >= 18:
+                expected[s, d] = np.nanmax(means)
+    np.testing.assert_allclose(tools.mda8(x), expected)
+
+
+def test_calc_mda8_frame():
+    times = pd.date_range("2020-07-01", periods=48, freq="h")
+    df = pd.DataFrame(
+        {
+            "siteid": np.repeat(["a", "b"], 48),
+            "time_local": np.tile(times, 2),
+            "OZONE": np.concatenate([np.arange(48.0), np.full(48, 40.0)]),
+        }
+    )
+    out = tools.calc_mda8(df, "OZONE")
+    assert list(out.columns) == ["siteid", "time_local", "OZONE"]
+    # site a: the window starting at 23:00 on day one, 23..30
+    np.testing.assert_allclose(out.loc[out.siteid == "a", "OZONE"].iloc[0], 26.5)
+    np.testing.assert_allclose(out.loc[out.siteid == "b", "OZONE"], 40.0)
+
+
+def test_long_to_cube_roundtrip():
+    rng = np.random.default_rng(2)
+    times = pd.date_range("2020-01-01", periods=72, freq="h")
+    df = pd.DataFrame(
+        {
+            "siteid": np.repeat(["s1", "s2", "s3"], 144),
+            "variable": np.tile(np.repeat(["OZONE", "PM25"], 72), 3),
+            "time": np.tile(times, 6),
+            "obs": rng.random(432),
+        }
+    )
+    df["units"] = np.where(df.variable == "OZONE", "ppb", "ug/m3")
+    df["latitude"] = df.siteid.map({"s1": 1.0, "s2": 2.0, "s3": 3.0})
+    df["longitude"] = df.siteid.map({"s1": -100, "s2": -90, "s3": -80})
+    df = df.drop(index=np.arange(0, 432, 5)).sample(frac=1, random_state=0)
+
+    cube = tools.long_to_cube(df, freq="h")
+    assert cube.dims == ("variable", "siteid", "time")
+    assert cube.sizes["time"] == 72
+    assert list(cube.units.values) == ["ppb", "ug/m3"]
+    assert cube.longitude.dtype.kind == "i"
+    assert list(cube.longitude.values) == [-100, -90, -80]
+
+    # a site without a valid time gets NaN for its integer coordinate
+    bad = pd.DataFrame(
+        {"siteid": ["s4"], "variable": ["OZONE"], "time": [pd.NaT], "obs": [1.0]}
+    ).assign(units="ppb", latitude=4.0, longitude=-70)
+    partial = tools.long_to_cube(pd.concat([df, bad]), freq="h")
+    np.testing.assert_array_equal(partial.longitude.values, [-100, -90, -80, np.nan])
+
+    daily = cube.resample(time="1D").mean()
+    expected = df.groupby(["variable", "siteid", df.time.dt.floor("D")]).obs.mean()
+    np.testing.assert_allclose(daily.values.ravel(), expected.values)
+
+    back = tools.cube_to_long(cube)
+    assert len(back) == len(df)
+    merged = df.merge(back, on=["variable", "siteid", "time"])
+    np.testing.assert_allclose(merged.obs_x, merged.obs_y)
+    assert (merged.units_x == merged.units_y).all()
+
+
+@pytest.mark.parametrize("window", [15, 4])
+def test_kz_filter_matches_rolling(window):
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=(4, 400)).cumsum(axis=1)
+    x[:, 50:60] = np.nan
+    x[rng.random(x.shape) < 0.1] = np.nan
+    expected = pd.DataFrame(x.T)
+    for _ in range(3):
+        expected = expected.rolling(window, center=True, min_periods=1).mean()
+    np.testing.assert_allclose(tools.kz_filter(x, window, 3), expected.values.T)
+    np.testing.assert_allclose(tools.kz_filter(x, window, 3, max_workers=2), expected.values.T)
+
+    expected = pd.DataFrame(x.T).rolling(window, center=True, min_periods=4).mean()
+    np.testing.assert_allclose(tools.kz_filter(x, window, 1, min_periods=4), expected.values.T)
+
+
+def test_kz_decompose_and_kza():
+    rng = np.random.default_rng(4)
+    x = rng.normal(size=(3, 1000))
+    parts = tools.kz_decompose(x, short=(15, 5), long=(101, 3))
+    np.testing.assert_allclose(parts["baseline"] + parts["seasonal"] + parts["short_term"], x)
+
+    # the adaptive filter keeps a step sharper than KZ
+    step = np.r_[np.zeros(200), np.ones(200)]
+    y = step + rng.normal(0, 0.1, 400)
+    kz_error = np.abs(tools.kz_filter(y, 41, 3) - step)[190:210].mean()
+    kza_error = np.abs(tools.kza_filter(y, 41, 3) - step)[190:210].mean()
+    assert kza_error < kz_error / 2
+
+
+def test_kolmogorov_zurbenko_filter_gaps():
+    from monet import util
+
+    times = pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-10", "2020-01-11"])
+    values = [1.0, 3.0, 10.0, 20.0]
+    # the window spans days, not rows: no averaging across the gap
+    expected = [2.0, 2.0, 15.0, 15.0]
+
+    df = pd.DataFrame(
+        {
+            "siteid": np.repeat(["a", "b"], 4),
+            "time_local": np.tile(times, 2),
+            "obs": values + [2 * v for v in values],
+        }
+    ).iloc[::-1]
+    out = tools.kolmogorov_zurbenko_filter(df, "obs", 3, 1).sort_values(["siteid", "time_local"])
+    np.testing.assert_allclose(out.obs_y, expected + [2 * v for v in expected])
+    hourly = tools.kolmogorov_zurbenko_filter(df, "obs", 3, 1, freq="h")
+    np.testing.assert_allclose(hourly.obs_y, hourly.obs_x)
+
+    series = util.kolmogorov_zurbenko_filter(pd.Series(values, index=times), 3, 1)
+    np.testing.assert_allclose(series.values, expected)
+    assert series.index.equals(times)
+
+
+def test_long_to_wide_matches_pivot():
+    rng = np.random.default_rng(5)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "time": pd.Timestamp("2020") + pd.to_timedelta(rng.integers(0, 20, n), "h"),
+            "siteid": rng.choice(list("abcde"), n),
+            "variable": rng.choice(["OZONE", "PM25", "NO2"], n),
+            "obs": rng.random(n),
+            "latitude": 1.0,
+        }
+    )
+    df["units"] = df.variable.map({"OZONE": "ppb", "PM25": "ug/m3", "NO2": "ppb"})
+    df.loc[rng.random(n) < 0.2, "obs"] = np.nan
+
+    pivot = df.pivot_table(values="obs", index=["time", "siteid"], columns="variable")
+    wide = tools.long_to_wide(df, merge=False)
+    assert wide.attrs["units"] == {"NO2": "ppb", "OZONE": "ppb", "PM25": "ug/m3"}
+    np.testing.assert_allclose(wide[pivot.columns].values, pivot.values)
+    assert (wide.time.values == pivot.index.get_level_values("time").values).all()
+
+    merged = tools.long_to_wide(df)
+    expected = pd.merge(pivot.reset_index(), df, on=["siteid", "time"])
+    assert len(merged) == len(expected)
+    assert (merged.PM25_unit == "ug/m3").all()
+    np.testing.assert_allclose(merged.OZONE, expected.OZONE)
+    np.testing.assert_allclose(merged.obs, expected.obs)